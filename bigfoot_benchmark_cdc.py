@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+# Content-defined chunking check: chunk sizes, throughput and chunk reuse after a small edit near the
+# start of a file, on random bytes and on templated STEP/DXF-like text. Runs offline, no AWS calls.
+# Exits non-zero if an edit invalidates more chunks than it should. Usage: python bigfoot_benchmark_cdc.py [MB ...]
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import bigfoot_constants as constants
+from bigfoot_classes import create_chunk_list_for_file
+
+
+def make_step_text(size, seed=1):
+
+    rnd = random.Random(seed)
+    lines = []
+    total = 0
+    i = 1
+
+    while total < size:
+        kind = rnd.random()
+        if kind < 0.5:
+            line = f"#{i}=CARTESIAN_POINT('',({rnd.uniform(-500, 500):.6f},{rnd.uniform(-500, 500):.6f},{rnd.uniform(-500, 500):.6f}));\n"
+        elif kind < 0.8:
+            line = f"#{i}=DIRECTION('',(0.,0.,1.));\n"
+        else:
+            line = f"#{i}=AXIS2_PLACEMENT_3D('',#{i - 3},#{i - 2},#{i - 1});\n"
+        lines.append(line)
+        total += len(line)
+        i += 1
+
+    return ''.join(lines).encode()[:size]
+
+
+def make_dxf_text(size, seed=2):
+
+    rnd = random.Random(seed)
+    records = []
+    total = 0
+
+    while total < size:
+        record = b'  0\nLINE\n  8\n0\n 10\n%d.0\n 20\n%d.0\n 11\n%d.0\n 21\n%d.0\n' % tuple(rnd.randrange(100) for _ in range(4))
+        records.append(record)
+        total += len(record)
+
+    return b''.join(records)[:size]
+
+
+def chunk_bytes(data, filepath):
+
+    with open(filepath, 'wb') as f:
+        f.write(data)
+
+    started_at = time.monotonic()
+    sha256, chunks = create_chunk_list_for_file(filepath)
+
+    return chunks, time.monotonic() - started_at
+
+
+if __name__ == '__main__':
+
+    size = int(float(sys.argv[1]) * 1024 * 1024) if sys.argv[1:] else 32 * 1024 * 1024
+    inputs = [('random', os.urandom(size)), ('STEP-like', make_step_text(size)), ('DXF-like', make_dxf_text(size))]
+    failed = False
+
+    print(f"{'input':>10}  {'MB':>6}  {'chunks':>6}  {'at max':>6}  {'MB/s':>6}  {'reused after insert':>20}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filepath = os.path.join(tmp_dir, 'cdc.bin')
+
+        for name, data in inputs:
+            chunks, elapsed = chunk_bytes(data, filepath)
+            edited_chunks, _ = chunk_bytes(data[:1000] + b'EDITED' + data[1000:], filepath)
+
+            reused = len({chunk[2] for chunk in chunks} & {chunk[2] for chunk in edited_chunks})
+            at_max = sum(1 for offset, length, sha256 in chunks if length == constants.CDC_MAX_CHUNK_SIZE)
+
+            print(f"{name:>10}  {len(data) / (1024 * 1024):>6.1f}  {len(chunks):>6}  {at_max:>6}  "
+                  f"{len(data) / elapsed / (1024 * 1024):>6.1f}  {reused:>12}/{len(chunks)}")
+
+            # A 6-byte insert should only touch the first chunk or two.
+            if reused < len(chunks) - 2:
+                failed = True
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+# Microbenchmark: DynamoDB item (de)serialization, old JSON round trip vs. the direct path.
+# Runs offline, no AWS calls. Usage: python bigfoot_benchmark_dynamodb.py [files per item ...]
+
+import json
+import sys
+import timeit
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from bigfoot_classes import serialize_DynamoDB_item, deserialize_DynamoDB_item
+
+
+def make_activity_item(n_files):
+
+    return {
+                "action": 'UPLOAD',
+                "utc_time": '1700000000',
+                "user_name": 'Bench Mark',
+                "user_email": 'bench@example.com',
+                "upload_comment": 'Benchmark upload ' * 8,
+                "ratio": 0.731,
+                "files_uploaded": [f'project/assemblies/sub_{i // 100:04d}/part_{i:06d}.SLDPRT' for i in range(n_files)]
+           }
+
+
+def serialize_json_round_trip(item):
+
+    # The previous put_item_to_DynamoDB_table path: JSON round trip, then the resource layer's serializer.
+    ddb_data = json.loads(json.dumps(item), parse_float=Decimal)
+    serializer = TypeSerializer()
+    return {k: serializer.serialize(v) for k, v in ddb_data.items()}
+
+
+def deserialize_type_deserializer(item):
+
+    # The previous get_item_from_DynamoDB_table path: a new TypeDeserializer per call.
+    deserializer = TypeDeserializer()
+    return {k: deserializer.deserialize(v) for k, v in item.items()}
+
+
+def time_call(fn, arg, number, repeat=5):
+
+    # Best of `repeat` runs, seconds per call.
+    return min(timeit.repeat(lambda: fn(arg), number=number, repeat=repeat)) / number
+
+
+if __name__ == '__main__':
+
+    sizes = [int(n) for n in sys.argv[1:]] or [10, 1000, 10000, 50000]
+
+    print(f"{'files':>8}  {'json+TypeSerializer':>20}  {'direct serialize':>17}  {'speedup':>8}  "
+          f"{'TypeDeserializer':>17}  {'direct deserialize':>19}  {'speedup':>8}")
+
+    for n_files in sizes:
+        item = make_activity_item(n_files)
+        wire_item = serialize_DynamoDB_item(item)
+
+        assert wire_item == serialize_json_round_trip(item)
+        assert deserialize_DynamoDB_item(wire_item) == deserialize_type_deserializer(wire_item)
+
+        number = max(1, 20000 // n_files)
+        old_put = time_call(serialize_json_round_trip, item, number)
+        new_put = time_call(serialize_DynamoDB_item, item, number)
+        old_get = time_call(deserialize_type_deserializer, wire_item, number)
+        new_get = time_call(deserialize_DynamoDB_item, wire_item, number)
+
+        print(f"{n_files:>8}  {old_put * 1e3:>17.3f} ms  {new_put * 1e3:>14.3f} ms  {old_put / new_put:>7.1f}x  "
+              f"{old_get * 1e3:>14.3f} ms  {new_get * 1e3:>16.3f} ms  {old_get / new_get:>7.1f}x")
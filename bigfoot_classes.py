@@ -1,17 +1,29 @@
 #!/usr/bin/env python3
 
 
+import base64
+import collections
+import concurrent.futures
+import copy
 from decimal import Decimal
+import email.utils
+import gzip
 import hashlib
+import heapq
+import itertools
 import json
+import mmap
 import os
 import platform
+import re
 import shutil
 import sys
+import tempfile
 import threading
 import time
 import traceback
-from dateutil import parser
+import uuid
+import zlib
 from typing import Any, List, Union
 from datetime import datetime, timezone
 from pathlib import Path
@@ -21,7 +33,10 @@ from PyQt6.QtCore import *
 from PyQt6.QtGui import *
 
 import boto3
-from botocore.exceptions import ClientError
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
 
 import qtawesome as qta
@@ -35,28 +50,431 @@ self.setStyle(QStyleFactory.create('fusion')) in the subclass init.
 https://matiascodesal.com/blog/spice-your-qt-python-font-awesome-icons/
 """
 
+
+class AWSClientRegistry:
+    """Process-wide boto3 clients keyed by (service, credentials, region).
+    Clients are thread-safe and shared; resources are not, so each thread keeps its own in thread-local storage."""
+
+    sessions = dict()
+    clients = dict()
+    local = threading.local()
+    lock = threading.RLock()
+
+    @staticmethod
+    def get_config():
+        return Config(max_pool_connections=constants.AWS_MAX_POOL_CONNECTIONS,
+                      tcp_keepalive=constants.AWS_TCP_KEEPALIVE,
+                      connect_timeout=constants.AWS_CONNECT_TIMEOUT_SEC,
+                      read_timeout=constants.AWS_READ_TIMEOUT_SEC,
+                      retries={'max_attempts': constants.AWS_MAX_RETRY_ATTEMPTS, 'mode': 'standard'})
+
+    @classmethod
+    def get_session(cls, access_key_id, secret_access_key, region_name=None):
+        key = (access_key_id, secret_access_key, region_name)
+
+        with cls.lock:
+            if key not in cls.sessions:
+                cls.sessions[key] = boto3.session.Session(aws_access_key_id=access_key_id,
+                                                          aws_secret_access_key=secret_access_key,
+                                                          region_name=region_name)
+            return cls.sessions[key]
+
+    @classmethod
+    def get_client(cls, service, access_key_id, secret_access_key, region_name=None):
+        key = (service, access_key_id, secret_access_key, region_name)
+
+        with cls.lock:
+            if key not in cls.clients:
+                session = cls.get_session(access_key_id, secret_access_key, region_name)
+                cls.clients[key] = session.client(service, config=cls.get_config())
+            return cls.clients[key]
+
+    @classmethod
+    def get_thread_resources(cls):
+
+        # Stored on a threading.local so a worker's resources are released when the thread exits.
+        resources = getattr(cls.local, 'resources', None)
+        if resources is None:
+            resources = cls.local.resources = dict()
+
+        return resources
+
+    @classmethod
+    def get_resource(cls, service, access_key_id, secret_access_key, region_name=None):
+        key = (service, access_key_id, secret_access_key, region_name)
+        resources = cls.get_thread_resources()
+
+        if key not in resources:
+            with cls.lock:
+                session = cls.get_session(access_key_id, secret_access_key, region_name)
+                resources[key] = session.resource(service, config=cls.get_config())
+        return resources[key]
+
+    @classmethod
+    def clear(cls):
+
+        # Other threads' resources cannot be reached; replacing the local drops them along with their threads.
+        with cls.lock:
+            for client in cls.clients.values():
+                client.close()
+            for resource in cls.get_thread_resources().values():
+                resource.meta.client.close()
+            cls.sessions.clear()
+            cls.clients.clear()
+            cls.local = threading.local()
+
+        return None
+
+    @classmethod
+    def stats(cls):
+        with cls.lock:
+            stats = {
+                        'sessions': len(cls.sessions),
+                        'clients': len(cls.clients),
+                        'thread_resources': len(cls.get_thread_resources()),
+                        'max_pool_connections': constants.AWS_MAX_POOL_CONNECTIONS
+                    }
+
+        return stats
+
+
 def create_sha256_hash_for_file(filepath):
 
-    BUF_SIZE = 65536
-    
+    # hashlib releases the GIL for large buffers, so big reads let hashing threads run in parallel.
     sha256 = hashlib.sha256()
+    size = os.path.getsize(filepath)
+    
+    with open(filepath, 'rb') as f:
+        if size >= constants.HASH_MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    for offset in range(0, len(view), constants.HASH_BUF_SIZE):
+                        sha256.update(view[offset:offset + constants.HASH_BUF_SIZE])
+        else:
+            buf = bytearray(constants.HASH_BUF_SIZE)
+            with memoryview(buf) as view:
+                while True:
+                    n = f.readinto(buf)
+                    if not n:
+                        break
+                    sha256.update(view[:n])
+
+    return sha256.hexdigest()
+
+
+def hash_files_parallel(filepaths, hash_cache=None, max_workers=None, io_concurrency=None):
+
+    # filepaths: [(filepath, os.stat_result or None), ...]. Returns {filepath: sha256}.
+    # Cache hits are answered inline; misses are hashed on a worker pool, with small files
+    # batched into one task and at most io_concurrency files being read at any time
+    # (use 1-2 for spinning disks, leave it at the worker count for NVMe).
+    max_workers = max_workers or constants.HASH_MAX_WORKERS or os.cpu_count() or 4
+    io_semaphore = threading.BoundedSemaphore(io_concurrency or constants.HASH_IO_CONCURRENCY or max_workers)
+    
+    hashes = dict()
+    small_batches = [[]]
+    small_batch_bytes = 0
+    large_files = []
+
+    for filepath, st in filepaths:
+        if st is None:
+            st = os.stat(filepath)
+            
+        if hash_cache is not None:
+            sha256 = hash_cache.lookup(filepath, st)
+            if sha256:
+                hashes[filepath] = sha256
+                continue
+
+        if st.st_size >= constants.HASH_SMALL_FILE_SIZE:
+            large_files.append((filepath, st))
+        else:
+            if len(small_batches[-1]) >= constants.HASH_SMALL_BATCH_FILES or small_batch_bytes >= constants.HASH_SMALL_FILE_SIZE:
+                small_batches.append([])
+                small_batch_bytes = 0
+            small_batches[-1].append((filepath, st))
+            small_batch_bytes += st.st_size
+
+    def _hash_batch(batch):
+        batch_hashes = dict()
+        with io_semaphore:
+            for filepath, st in batch:
+                hash_started_ns = time.time_ns()
+                batch_hashes[filepath] = create_sha256_hash_for_file(filepath)
+                if hash_cache is not None:
+                    hash_cache.store(filepath, st, batch_hashes[filepath], hash_started_ns)
+        return batch_hashes
+
+    # Largest files first so they don't end up as the long tail of the pool.
+    large_files.sort(key=lambda file_stat: file_stat[1].st_size, reverse=True)
+    tasks = [[file_stat] for file_stat in large_files] + [batch for batch in small_batches if batch]
+
+    if tasks:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for batch_hashes in executor.map(_hash_batch, tasks):
+                hashes.update(batch_hashes)
+
+    return hashes
+
+
+def get_cdc_bit_table(salt=b''):
+
+    # Maps every byte value to b'0' or b'1', fixed via sha256 so every client cuts identically.
+    return bytes.maketrans(bytes(range(256)), bytes(ord('01'[hashlib.sha256(salt + bytes([i])).digest()[0] & 1]) for i in range(256)))
+
+
+def get_cdc_pattern(bits):
+
+    # A fixed, non-uniform bit string; runs of identical bytes (zero padding) never match it.
+    pattern = ''.join(format(b, '08b') for b in hashlib.sha256(b'bigfoot-cdc').digest())
+
+    return pattern[-bits:].encode()
+
+
+CDC_BIT_TABLES = [get_cdc_bit_table(), get_cdc_bit_table(b'\x01')]
+CDC_CANDIDATE_PATTERN = get_cdc_pattern(constants.CDC_CANDIDATE_BITS)
+CDC_MASK_BITS = constants.CDC_AVG_CHUNK_SIZE.bit_length() - 1 - constants.CDC_CANDIDATE_BITS
+CDC_MASK_STRICT = (1 << (CDC_MASK_BITS + 2)) - 1
+CDC_MASK_LOOSE = (1 << (CDC_MASK_BITS - 2)) - 1
+
+
+def get_cdc_candidate_bits(data):
+
+    # One b'0'/b'1' per byte of data, each a hash of that byte and the one before it (one table
+    # per offset, XORed). Done as big-int shifts and XORs so it runs in C, not per byte in Python.
+    if not data:
+        return b''
+
+    acc = 0
+    for offset, table in enumerate(CDC_BIT_TABLES):
+        acc ^= int(data.translate(table), 2) >> offset
+
+    return format(acc, '0%db' % len(data)).encode()
+
+
+def find_cdc_cut_point(data, bits, start, end):
+
+    # Content-defined chunking: a chunk ends where the CRC-32 (a Rabin-style fingerprint) of the
+    # CDC_WINDOW_SIZE bytes before it has its low bits clear, so a boundary depends only on nearby
+    # content and an insert early in a file only changes the chunks around the edit. The window
+    # is wide enough to take in the varying fields of templated text (STEP, DXF), where a few
+    # bytes of context repeat line after line. Only positions where the candidate bits spell
+    # CDC_CANDIDATE_PATTERN are fingerprinted; bytes.find() skips to them in C. As in FastCDC,
+    # the minimum size is skipped and a stricter mask is used before the average size and a
+    # looser one after it, keeping sizes close to the average.
+    n = end - start
+    if n <= constants.CDC_MIN_CHUNK_SIZE:
+        return n
     
+    n = min(n, constants.CDC_MAX_CHUNK_SIZE)
+    normal = min(constants.CDC_AVG_CHUNK_SIZE, n)
+    mask = CDC_MASK_STRICT
+
+    found = bits.find(CDC_CANDIDATE_PATTERN, start + constants.CDC_MIN_CHUNK_SIZE - len(CDC_CANDIDATE_PATTERN), start + n)
+    while found >= 0:
+        cut = found + len(CDC_CANDIDATE_PATTERN)
+        if cut > start + normal:
+            mask = CDC_MASK_LOOSE
+        if not zlib.crc32(data[cut - constants.CDC_WINDOW_SIZE:cut]) & mask:
+            return cut - start
+        found = bits.find(CDC_CANDIDATE_PATTERN, found + 1, start + n)
+
+    return n
+
+
+def create_chunk_list_for_file(filepath):
+
+    # Returns (sha256 of the whole file, [[offset, length, chunk sha256], ...]) from a single read.
+    sha256 = hashlib.sha256()
+    chunks = []
+    offset = 0
+    buf = b''
+
     with open(filepath, 'rb') as f:
         while True:
-            data = f.read(BUF_SIZE)
+            data = f.read(constants.CDC_READ_SIZE)
+            if data:
+                sha256.update(data)
+                buf = buf + data if buf else data
+
+            # Only cut once a full maximum-size chunk is buffered, or at end of file.
+            bits = get_cdc_candidate_bits(buf)
+            pos = 0
+            while len(buf) - pos >= constants.CDC_MAX_CHUNK_SIZE or (not data and pos < len(buf)):
+                cut = find_cdc_cut_point(buf, bits, pos, len(buf))
+                chunks.append([offset, cut, hashlib.sha256(memoryview(buf)[pos:pos + cut]).hexdigest()])
+                offset += cut
+                pos += cut
+
+            buf = buf[pos:]
             if not data:
                 break
-            sha256.update(data)
 
-    return sha256.hexdigest()
+    return sha256.hexdigest(), chunks
+
+
+def get_file_chunk_list(filepath, st=None, hash_cache=None):
+
+    if hash_cache is not None:
+        return hash_cache.get_chunks(filepath, st)
+
+    return create_chunk_list_for_file(filepath)
+
+
+class LocalHashCache:
+    """Persistent sha256 cache for one projects directory, validated by each file's stat signature."""
+
+    caches = dict()
+    caches_lock = threading.Lock()
+
+    @classmethod
+    def for_directory(cls, projects_directory):
+        with cls.caches_lock:
+            if projects_directory not in cls.caches:
+                cls.caches[projects_directory] = cls(projects_directory)
+            return cls.caches[projects_directory]
+
+    def __init__(self, projects_directory):
+        self.projects_directory = projects_directory
+        self.cache_filepath = os.path.join(projects_directory, constants.HASH_CACHE_FILENAME)
+        self.entries = dict()
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.dirty = False
+        self.load()
+        return None
+
+    def load(self):
+        try:
+            with open(self.cache_filepath, 'r') as cache_file:
+                cache_data = json.load(cache_file)
+            if cache_data.get('format') == constants.HASH_CACHE_FORMAT_VERSION:
+                self.entries = cache_data['entries']
+        except (OSError, ValueError, KeyError):
+            self.entries = dict()
+        return None
+
+    def save(self):
+        # Saves run one at a time, so an older snapshot can never replace a newer one; lookups
+        # and stores only wait for the snapshot, not the write. A failed save is reported and
+        # retried by the next one: the cache is an optimisation, never a reason to fail a transfer.
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return None
+                cache_data = {'format': constants.HASH_CACHE_FORMAT_VERSION, 'entries': dict(self.entries)}
+                self.dirty = False
+
+            # Write-then-rename so a crash never leaves a truncated cache behind.
+            tmp_filepath = None
+            try:
+                with tempfile.NamedTemporaryFile('w', dir=self.projects_directory, prefix=constants.HASH_CACHE_FILENAME,
+                                                 suffix='.tmp', delete=False) as cache_file:
+                    tmp_filepath = cache_file.name
+                    json.dump(cache_data, cache_file, separators=(',', ':'))
+                os.replace(tmp_filepath, self.cache_filepath)
+            except OSError as e:
+                print(f"Unexpected error:  {e}")
+                with self.lock:
+                    self.dirty = True
+                if tmp_filepath:
+                    try:
+                        os.remove(tmp_filepath)
+                    except OSError:
+                        pass
+
+        return None
+
+    def get_key(self, filepath):
+        return os.path.relpath(filepath, self.projects_directory).replace(os.sep, '/')
+
+    def get_current_entry(self, filepath, st):
+        with self.lock:
+            entry = self.entries.get(self.get_key(filepath))
+
+        if (entry and not entry['racy'] and entry['size'] == st.st_size
+                and entry['mtime_ns'] == st.st_mtime_ns and entry['ino'] == st.st_ino):
+            return entry
+
+        return None
+
+    def lookup(self, filepath, st):
+        entry = self.get_current_entry(filepath, st)
+
+        return entry['sha256'] if entry else None
+
+    def store(self, filepath, st, sha256, hash_started_ns, chunks=None):
+        st_after = os.stat(filepath)
+
+        # Changed while we were reading it: the digest is valid for nobody, don't keep it.
+        if st_after.st_size != st.st_size or st_after.st_mtime_ns != st.st_mtime_ns:
+            return None
+
+        # A file modified within one timestamp tick of being hashed could change again
+        # without its mtime moving, so such an entry is always rehashed on the next lookup.
+        racy = st.st_mtime_ns + constants.HASH_CACHE_MTIME_GRANULARITY_NS >= hash_started_ns
+
+        with self.lock:
+            self.entries[self.get_key(filepath)] = {
+                                                        'size': st.st_size,
+                                                        'mtime_ns': st.st_mtime_ns,
+                                                        'ino': st.st_ino,
+                                                        'racy': racy,
+                                                        'sha256': sha256
+                                                   }
+            if chunks is not None:
+                self.entries[self.get_key(filepath)]['chunks'] = chunks
+                self.entries[self.get_key(filepath)]['chunks_format'] = constants.DELTA_CHUNK_LIST_FORMAT_VERSION
+            self.dirty = True
+
+        return None
+
+    def get_sha256(self, filepath, st=None):
+        if st is None:
+            st = os.stat(filepath)
+
+        sha256 = self.lookup(filepath, st)
+        
+        if not sha256:
+            hash_started_ns = time.time_ns()
+            sha256 = create_sha256_hash_for_file(filepath)
+            self.store(filepath, st, sha256, hash_started_ns)
+
+        return sha256
+
+    def get_chunks(self, filepath, st=None):
+        if st is None:
+            st = os.stat(filepath)
+
+        entry = self.get_current_entry(filepath, st)
+
+        # Chunks cut by an older chunker would never match current chunk lists.
+        if entry and entry.get('chunks_format') == constants.DELTA_CHUNK_LIST_FORMAT_VERSION:
+            return entry['sha256'], entry['chunks']
+
+        hash_started_ns = time.time_ns()
+        sha256, chunks = create_chunk_list_for_file(filepath)
+        self.store(filepath, st, sha256, hash_started_ns, chunks)
+
+        return sha256, chunks
+
+    def prune(self, project, present_keys):
+        present_keys = set(present_keys)
+
+        with self.lock:
+            for key in [k for k in self.entries if k.startswith(project + '/') and k not in present_keys]:
+                del self.entries[key]
+                self.dirty = True
+
+        return None
 
 
 def create_DynamoDB_table(access_key_id, secret_access_key, table_name, attribute_name):
 
     try:
         # Get the service client.
-        dynamodb = boto3.resource('dynamodb', aws_access_key_id=access_key_id,
-                aws_secret_access_key=secret_access_key, region_name='us-west-2')
+        dynamodb = AWSClientRegistry.get_resource('dynamodb', access_key_id,
+                secret_access_key, region_name='us-west-2')
 
         # Create the DynamoDB table.
         table = dynamodb.create_table(
@@ -95,13 +513,15 @@ def delete_DynamoDB_table(access_key_id, secret_access_key, table_name):
 
     try:
         # Get the service client.
-        dynamodb = boto3.client('dynamodb', aws_access_key_id=access_key_id,
-                aws_secret_access_key=secret_access_key, region_name='us-west-2')
+        dynamodb = AWSClientRegistry.get_client('dynamodb', access_key_id,
+                secret_access_key, region_name='us-west-2')
 
         # Delete the DynamoDB table.
         table = dynamodb.delete_table(
             TableName = f"{table_name}",
         )
+        
+        DynamoDBItemCache.invalidate(table_name)
 
     except ClientError as err:
         # logger.error(
@@ -112,13 +532,141 @@ def delete_DynamoDB_table(access_key_id, secret_access_key, table_name):
     return None
 
 
-def get_item_from_DynamoDB_table(table_name, email):
+# Shared, stateless (de)serializers for the values the fast paths below hand off.
+DDB_SERIALIZER = TypeSerializer()
+DDB_DESERIALIZER = TypeDeserializer()
+DDB_MAX_FAST_INT = 10 ** 38
+
+
+def serialize_DynamoDB_value(value):
+
+    # Low-level AttributeValue for one Python value. Strings, ints, bools, None, lists and
+    # dicts - nearly everything in our items - are built directly; floats become Decimals
+    # (as the old JSON round trip did) and the rest goes through TypeSerializer's checks.
+    if isinstance(value, str):
+        return {'S': value}
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, int) and -DDB_MAX_FAST_INT < value < DDB_MAX_FAST_INT:
+        return {'N': str(value)}
+    if isinstance(value, dict):
+        return {'M': {str(k): serialize_DynamoDB_value(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {'L': [serialize_DynamoDB_value(v) for v in value]}
+    if value is None:
+        return {'NULL': True}
+    if isinstance(value, float):
+        return DDB_SERIALIZER.serialize(Decimal(repr(value)))
+    return DDB_SERIALIZER.serialize(value)
+
+
+def serialize_DynamoDB_item(item):
+
+    return {str(k): serialize_DynamoDB_value(v) for k, v in item.items()}
+
+
+def deserialize_DynamoDB_value(value):
+
+    # Inverse of serialize_DynamoDB_value; numbers come back as Decimal, like TypeDeserializer.
+    if 'S' in value:
+        return value['S']
+    if 'M' in value:
+        return {k: deserialize_DynamoDB_value(v) for k, v in value['M'].items()}
+    if 'L' in value:
+        return [deserialize_DynamoDB_value(v) for v in value['L']]
+    if 'BOOL' in value:
+        return value['BOOL']
+    if 'NULL' in value:
+        return None
+    return DDB_DESERIALIZER.deserialize(value)
+
+
+def deserialize_DynamoDB_item(item):
+
+    return {k: deserialize_DynamoDB_value(v) for k, v in item.items()}
+
+
+class DynamoDBItemCache:
+    """Short-TTL cache of items read from DynamoDB, keyed by (table, email).
+
+    Concurrent gets for the same item share one request: the first caller fetches, the
+    others wait on its future. Callers always get their own deep copy, so editing a
+    returned item never edits the cache. Writes go through invalidate(), and a fetch that
+    was already in flight when its item was invalidated is not cached.
+    """
+
+    items = dict()
+    inflight = dict()
+    generations = dict()
+    lock = threading.Lock()
+
+    @classmethod
+    def get(cls, table_name, email, fetch):
+        key = (table_name, email)
+        
+        with cls.lock:
+            cached = cls.items.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                return copy.deepcopy(cached[1])
+                
+            future = cls.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                cls.inflight[key] = future
+                generation = cls.generations.get(key, 0)
+
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            item = fetch(table_name, email)
+        except BaseException as e:
+            with cls.lock:
+                cls.inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with cls.lock:
+            cls.inflight.pop(key, None)
+            if constants.DYNAMODB_ITEM_CACHE_TTL_SEC and cls.generations.get(key, 0) == generation:
+                cls.items[key] = (time.monotonic() + constants.DYNAMODB_ITEM_CACHE_TTL_SEC, item)
+                
+        future.set_result(item)
+
+        return copy.deepcopy(item)
+
+    @classmethod
+    def invalidate(cls, table_name, email=None):
+        # email=None drops every cached item of the table.
+        with cls.lock:
+            if email is None:
+                keys = [k for k in set(cls.items) | set(cls.inflight) if k[0] == table_name]
+            else:
+                keys = [(table_name, email)]
+                
+            for key in keys:
+                cls.items.pop(key, None)
+                cls.generations[key] = cls.generations.get(key, 0) + 1
+        return None
+
+
+def get_item_from_DynamoDB_table(table_name, email, use_cache=True):
+
+    # Cached for DYNAMODB_ITEM_CACHE_TTL_SEC; pass use_cache=False for a guaranteed fresh read.
+    if not use_cache:
+        DynamoDBItemCache.invalidate(table_name, email)
+        
+    return DynamoDBItemCache.get(table_name, email, fetch_item_from_DynamoDB_table)
+
+
+def fetch_item_from_DynamoDB_table(table_name, email):
 
     try:
         # Get the service resource.
-        dynamodb = boto3.client('dynamodb', 
-            aws_access_key_id=constants.AWS_ROOT_ACCESS_KEY_ID,
-            aws_secret_access_key=constants.AWS_ROOT_SECRET_ACCESS_KEY, 
+        dynamodb = AWSClientRegistry.get_client('dynamodb', 
+            constants.AWS_ROOT_ACCESS_KEY_ID,
+            constants.AWS_ROOT_SECRET_ACCESS_KEY, 
             region_name=constants.AWS_REGION)
         
         response = dynamodb.get_item(
@@ -134,12 +682,7 @@ def get_item_from_DynamoDB_table(table_name, email):
             return dict()
             
         else:
-            python_data = dict()
-        
-            deserializer = TypeDeserializer()
-            python_data = {k: deserializer.deserialize(v) for k,v in response['Item'].items()}
-        
-            return python_data
+            return deserialize_DynamoDB_item(response['Item'])
         
     except ClientError as err:
         # logger.error(
@@ -151,17 +694,14 @@ def get_item_from_DynamoDB_table(table_name, email):
 def put_item_to_DynamoDB_table(table_name, data):
 
     try:
-        ddb_data = json.loads(json.dumps(data), parse_float=Decimal)
-
-        # Get the service resource.
-        dynamodb = boto3.resource('dynamodb', aws_access_key_id=constants.AWS_ROOT_ACCESS_KEY_ID,
-                                  aws_secret_access_key=constants.AWS_ROOT_SECRET_ACCESS_KEY, 
-                                  region_name=constants.AWS_REGION)
-
-        table = dynamodb.Table(table_name)
-
-        response = table.put_item(
-                Item = ddb_data
+        # Serialized straight to the low-level wire format: no JSON round trip, no resource layer.
+        dynamodb = AWSClientRegistry.get_client('dynamodb', constants.AWS_ROOT_ACCESS_KEY_ID,
+                                                constants.AWS_ROOT_SECRET_ACCESS_KEY, 
+                                                region_name=constants.AWS_REGION)
+
+        dynamodb.put_item(
+                TableName = table_name,
+                Item = serialize_DynamoDB_item(data)
         )
 
     except ClientError as err:
@@ -169,189 +709,2945 @@ def put_item_to_DynamoDB_table(table_name, data):
         #     f'{table_name}, {email}, {err.response["Error"]["Code"]}, {err.response["Error"]["Message"]}'
         # )
         raise err
+    
+    finally:
+        # Whether or not the write landed, our cached copy can no longer be trusted.
+        DynamoDBItemCache.invalidate(table_name, data.get('email'))
+
+
+def set_user_project_in_DynamoDB_table(table_name, email, project_name, project_entry, overwrite=False):
+
+    # One UpdateItem on projects.<project_name>: the request carries only this project's
+    # entry, and concurrent edits to other projects of the same user can't be lost.
+    # Raises ConditionalCheckFailedException if the user is missing or, unless overwrite
+    # is set, the project is already there.
+    dynamodb = AWSClientRegistry.get_client('dynamodb', constants.AWS_ROOT_ACCESS_KEY_ID,
+                                            constants.AWS_ROOT_SECRET_ACCESS_KEY,
+                                            region_name=constants.AWS_REGION)
+
+    condition = 'attribute_exists(email)' if overwrite else 'attribute_exists(email) AND attribute_not_exists(#projects.#project)'
+    update_args = {
+        'TableName': table_name,
+        'Key': {'email': {'S': email}},
+        'UpdateExpression': 'SET #projects.#project = :project',
+        'ConditionExpression': condition,
+        'ExpressionAttributeNames': {'#projects': 'projects', '#project': project_name},
+        'ExpressionAttributeValues': {':project': serialize_DynamoDB_value(project_entry)}
+    }
 
+    try:
+        try:
+            dynamodb.update_item(**update_args)
+        except ClientError as err:
+            if err.response['Error']['Code'] != 'ValidationException':
+                raise
+            # Users without a 'projects' map yet: the nested path doesn't exist, create the map.
+            dynamodb.update_item(
+                TableName = table_name,
+                Key = {'email': {'S': email}},
+                UpdateExpression = 'SET #projects = if_not_exists(#projects, :empty)',
+                ConditionExpression = 'attribute_exists(email)',
+                ExpressionAttributeNames = {'#projects': 'projects'},
+                ExpressionAttributeValues = {':empty': {'M': {}}}
+            )
+            dynamodb.update_item(**update_args)
+            
+    finally:
+        DynamoDBItemCache.invalidate(table_name, email)
 
-def add_s3_bucket_policy(access_key_id, secret_access_key, bucket_name, project_name, user):
+    return None
 
-    policy_dict = {
-                    "Version": "2012-10-17",
-                    "Statement": [
-                        {
-                            "Sid": "AllowStatement3",
-                            "Action": [
-                                "s3:ListBucket"
-                            ],
-                            "Effect": "Allow",
-                            "Resource": [
-                                f"arn:aws:s3:::{bucket_name}"
-                            ],
-                            "Condition": {
-                                "StringLike": {
-                                    "s3:prefix": [
-                                        f"{project_name}/*"
-                                    ]
-                                }
-                            }
-                        },
-                        {
-                            "Sid": "AllowStatement4A",
-                            "Effect": "Allow",
-                            "Action": [
-                                "s3:*"
-                            ],
-                            "Resource": [
-                                f"arn:aws:s3:::{bucket_name}/{project_name}/*"
-                            ]
-                        }
-                    ]
-                }
 
-    try:
-        s3 = boto3.client('s3', aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key)
+def remove_user_project_from_DynamoDB_table(table_name, email, project_name):
 
-        s3.put_bucket_policy(
-            Bucket = bucket_name,
-            Policy = json.dumps(policy_dict)
+    # One UpdateItem REMOVE on projects.<project_name>. Returns False if there was nothing to remove.
+    dynamodb = AWSClientRegistry.get_client('dynamodb', constants.AWS_ROOT_ACCESS_KEY_ID,
+                                            constants.AWS_ROOT_SECRET_ACCESS_KEY,
+                                            region_name=constants.AWS_REGION)
+
+    try:
+        dynamodb.update_item(
+            TableName = table_name,
+            Key = {'email': {'S': email}},
+            UpdateExpression = 'REMOVE #projects.#project',
+            ConditionExpression = 'attribute_exists(#projects.#project)',
+            ExpressionAttributeNames = {'#projects': 'projects', '#project': project_name}
         )
+        
+    except ClientError as err:
+        if err.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        raise err
+    
+    finally:
+        DynamoDBItemCache.invalidate(table_name, email)
 
-    except ClientError as e:
-        print(f"Unexpected error:  {e}")
+    return True
 
-    return None
 
+def get_activity_log_project_key(bucket_name, project):
 
-def get_rmt_object_to_loc(access_key_id, secret_access_key, bucket_name, obj, filepath):
+    return bucket_name + '#' + project
 
-    try:
-        s3 = boto3.resource('s3', aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key)
-    
-        response = s3.meta.client.download_file(bucket_name, obj, filepath)
-    
-    except ClientError as e:
-        print(f"Unexpected error:  {e}")
 
-    return response
+def get_activity_log_event_key(utc_time_ms, unique=None):
 
+    # Zero-padded milliseconds sort in time order as strings; the suffix keeps
+    # events logged in the same millisecond apart. unique='' gives the lowest key for that millisecond.
+    return f'{int(utc_time_ms):015d}#' + (uuid.uuid4().hex[:12] if unique is None else unique)
 
-def put_loc_object_to_rmt(access_key_id, secret_access_key, filepath, bucket_name, obj, sha256=''):
 
-    try:
-        s3 = boto3.client('s3', aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key)
-    
-        response = s3.upload_file(filepath, bucket_name, obj,
-            ExtraArgs={
-                "Metadata": {
-                    "ChecksumSHA256": sha256
-                }
-            }
-        )
-    
-    except ClientError as e:
-        print(f"Unexpected error:  {e}")
+def get_legacy_activity_log_table(bucket_name, project):
 
-    return response
+    return bucket_name + '_' + project
 
 
-def list_s3_bucket_contents(access_key_id, secret_access_key, bucket_name):
+def get_legacy_activity_log_event_key(wire_item):
 
-    try:
-        s3 = boto3.client('s3', aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key)
+    # Legacy items have no event_key; derive a stable one from utc_time and content.
+    utc_time = int(deserialize_DynamoDB_value(wire_item.get('utc_time', {'N': '0'})))
+    digest = hashlib.sha256(json.dumps(wire_item, sort_keys=True).encode()).hexdigest()[:12]
     
-        bucket_contents = s3.list_objects(
-            Bucket = bucket_name,
-        )
-        
-    except ClientError as e:
-        print(f"Unexpected error:  {e}")
+    return get_activity_log_event_key(utc_time * 1000, digest)
 
-    return bucket_contents
 
+def ensure_activity_log_table():
 
-def list_s3_bucket_contents_with_prefix(access_key_id, secret_access_key, bucket_name, prefix):
+    # Created on first use, once per deployment: on-demand billing, no capacity to manage.
+    if getattr(ensure_activity_log_table, 'ready', False):
+        return None
+        
+    dynamodb = AWSClientRegistry.get_client('dynamodb', constants.AWS_ROOT_ACCESS_KEY_ID,
+                                            constants.AWS_ROOT_SECRET_ACCESS_KEY,
+                                            region_name=constants.AWS_REGION)
 
     try:
-        s3 = boto3.client('s3', aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key)
-    
-        bucket_contents = s3.list_objects(
-            Bucket = bucket_name,
-            Prefix = prefix
-        )
+        dynamodb.describe_table(TableName = constants.ACTIVITY_LOG_TABLE)
         
-    except ClientError as e:
-        print(f"Unexpected error:  {e}")
+    except ClientError as err:
+        if err.response['Error']['Code'] != 'ResourceNotFoundException':
+            raise err
+        
+        try:
+            dynamodb.create_table(
+                TableName = constants.ACTIVITY_LOG_TABLE,
+                KeySchema = [
+                    {'AttributeName': 'project_key', 'KeyType': 'HASH'},
+                    {'AttributeName': 'event_key', 'KeyType': 'RANGE'}
+                ],
+                AttributeDefinitions = [
+                    {'AttributeName': 'project_key', 'AttributeType': 'S'},
+                    {'AttributeName': 'event_key', 'AttributeType': 'S'}
+                ],
+                BillingMode = 'PAY_PER_REQUEST'
+            )
+        except ClientError as err:
+            if err.response['Error']['Code'] != 'ResourceInUseException':
+                raise err
+            
+        dynamodb.get_waiter('table_exists').wait(TableName = constants.ACTIVITY_LOG_TABLE)
 
-    return bucket_contents
+    ensure_activity_log_table.ready = True
 
+    return None
 
-def delete_s3_bucket_content_list(access_key_id, secret_access_key, bucket_name, content_list=None):
 
-    try:
-        s3 = boto3.client('s3', aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key)
-    
-        response = s3.delete_objects(
-                Bucket = bucket_name,
-                Delete = {"Objects": [{"Key": key} for key in content_list]}
-            )
-        
-    except ClientError as e:
-        print(f"Unexpected error:  {e}")
+def get_rmt_activity_files_key(project, sha256):
 
-    return None
+    return project + '/' + constants.MANIFEST_DIR + '/' + constants.ACTIVITY_FILES_DIR + '/' + sha256 + '.json.gz'
 
 
-def does_object_exist_in_s3_bucket(access_key_id, secret_access_key, bucket_name, object_name):
+def spill_activity_log_files(access_key_id, secret_access_key, bucket_name, project, entry):
 
-    bucket_contents = list_s3_bucket_contents(access_key_id, secret_access_key, bucket_name)
-        
-    for obj in bucket_contents['Contents']:
-        if str(object_name) ==  str(obj['Key']):
-            return True
+    # A files_uploaded list too big for the item goes to a gzipped, content-addressed object in
+    # the project's .bigfoot prefix; the item keeps a reference, the count and the digest.
+    files = entry.get('files_uploaded', [])
+    files_json = json.dumps(files, separators=(',', ':')).encode()
     
-    return False
+    if len(files_json) <= constants.ACTIVITY_FILES_INLINE_MAX_BYTES:
+        return entry
 
+    sha256 = hashlib.sha256(files_json).hexdigest()
+    files_key = get_rmt_activity_files_key(project, sha256)
 
-def get_rmt_project_object_versions(access_key_id, secret_access_key, bucket_name, project):
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+    s3.put_object(
+        Bucket = bucket_name,
+        Key = files_key,
+        Body = gzip.compress(files_json, compresslevel=constants.COMPRESSION_LEVEL),
+        ContentType = 'application/json',
+        ContentEncoding = 'gzip'
+    )
 
-    try:
-        s3 = boto3.client('s3', aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key)
+    return dict(entry, files_uploaded=[], files_ref=files_key, files_count=len(files), files_sha256=sha256)
+
+
+def get_activity_log_files(access_key_id, secret_access_key, bucket_name, entry):
+
+    # The event's file list, fetched from S3 if it was spilled. Raises ValueError on a digest mismatch.
+    if 'files_ref' not in entry:
+        return entry.get('files_uploaded', [])
+
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+    files_json = gzip.decompress(s3.get_object(Bucket = bucket_name, Key = entry['files_ref'])['Body'].read())
     
-        obj_versions = s3.list_object_versions(
-                Bucket = bucket_name,
-                Prefix = project
-        )
-        
-    except ClientError as e:
-        print(f"Unexpected error:  {e}")
+    if hashlib.sha256(files_json).hexdigest() != entry['files_sha256']:
+        raise ValueError(f"{entry['files_ref']} does not match its activity log entry")
 
-    return obj_versions['Versions']
+    return json.loads(files_json)
 
 
-def get_last_modified_time_for_remote_project(access_key_id, secret_access_key, bucket_name, project):
+def put_activity_log_entry(access_key_id, secret_access_key, bucket_name, project, entry):
 
-    try:
-        s3 = boto3.client('s3', aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key)
+    # One put into the shared table (or the project's legacy table), large file lists spilled
+    # to S3 first. Returns the stored item.
+    entry = spill_activity_log_files(access_key_id, secret_access_key, bucket_name, project, entry)
     
-        bucket_contents = s3.list_objects(
-            Bucket = bucket_name,
-            Prefix = project
-        )
-        
-        latest_modified = 0
-        
-        if 'Contents' in bucket_contents:
-            for obj in bucket_contents['Contents']:
-                if int(obj['LastModified'].timestamp()) > latest_modified:
-                    latest_modified = int(obj['LastModified'].timestamp())
+    if not constants.ACTIVITY_LOG_SHARED_TABLE_ENABLED:
+        put_item_to_DynamoDB_table(get_legacy_activity_log_table(bucket_name, project), entry)
+        return entry
 
-            return str(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(latest_modified)))
+    ensure_activity_log_table()
+    
+    item = dict(entry, project_key=get_activity_log_project_key(bucket_name, project),
+                event_key=get_activity_log_event_key(time.time() * 1000))
+    
+    put_item_to_DynamoDB_table(constants.ACTIVITY_LOG_TABLE, item)
+
+    return item
+
+
+def iter_activity_log_entries(bucket_name, project, newest_first=True):
+
+    # Shared table: a Query on the project's partition, already in event_key order.
+    # Legacy tables can only be scanned, so they're read whole and sorted by utc_time.
+    dynamodb = AWSClientRegistry.get_client('dynamodb', constants.AWS_ROOT_ACCESS_KEY_ID,
+                                            constants.AWS_ROOT_SECRET_ACCESS_KEY,
+                                            region_name=constants.AWS_REGION)
+
+    if not constants.ACTIVITY_LOG_SHARED_TABLE_ENABLED:
+        items = []
+        for page in dynamodb.get_paginator('scan').paginate(TableName = get_legacy_activity_log_table(bucket_name, project)):
+            items.extend(dict(deserialize_DynamoDB_item(item), event_key=get_legacy_activity_log_event_key(item)) for item in page.get('Items', []))
+        items.sort(key=lambda item: item['event_key'], reverse=newest_first)
+        yield from items
+        return None
+
+    def _query():
+        return dynamodb.get_paginator('query').paginate(
+            TableName = constants.ACTIVITY_LOG_TABLE,
+            KeyConditionExpression = 'project_key = :project_key',
+            ExpressionAttributeValues = {':project_key': {'S': get_activity_log_project_key(bucket_name, project)}},
+            ScanIndexForward = not newest_first
+        )
+    
+    LegacyActivityLogMigrations.ensure(bucket_name, project)
+    
+    for page in _query():
+        for item in page.get('Items', []):
+            yield deserialize_DynamoDB_item(item)
+
+    return None
+
+
+def get_activity_log_page(bucket_name, project, cursor=None, limit=None):
+
+    # One page of a project's activity, newest first, starting just older than the cursor
+    # (an event_key; None for the newest page). Returns (entries, cursor for the next
+    # older page), the cursor being None once the oldest event has been returned.
+    limit = limit or constants.ACTIVITY_HISTORY_PAGE_SIZE
+    
+    if not constants.ACTIVITY_LOG_SHARED_TABLE_ENABLED:
+        entries = [entry for entry in iter_activity_log_entries(bucket_name, project) if cursor is None or entry['event_key'] < cursor]
+        return entries[:limit], entries[limit - 1]['event_key'] if len(entries) > limit else None
+
+    dynamodb = AWSClientRegistry.get_client('dynamodb', constants.AWS_ROOT_ACCESS_KEY_ID,
+                                            constants.AWS_ROOT_SECRET_ACCESS_KEY,
+                                            region_name=constants.AWS_REGION)
+
+    query_args = {
+        'TableName': constants.ACTIVITY_LOG_TABLE,
+        'KeyConditionExpression': 'project_key = :project_key',
+        'ExpressionAttributeValues': {':project_key': {'S': get_activity_log_project_key(bucket_name, project)}},
+        'ScanIndexForward': False,
+        'Limit': limit
+    }
+    
+    if cursor is not None:
+        query_args['KeyConditionExpression'] += ' AND event_key < :cursor'
+        query_args['ExpressionAttributeValues'][':cursor'] = {'S': cursor}
+
+    LegacyActivityLogMigrations.ensure(bucket_name, project)
+    
+    response = dynamodb.query(**query_args)
+        
+    entries = [deserialize_DynamoDB_item(item) for item in response.get('Items', [])]
+    
+    return entries, entries[-1]['event_key'] if entries and 'LastEvaluatedKey' in response else None
+
+
+def get_activity_log_entries_since(bucket_name, project, event_key):
+
+    # Every event newer than event_key, newest first: what a refresh of a cached history needs.
+    if not constants.ACTIVITY_LOG_SHARED_TABLE_ENABLED:
+        return list(itertools.takewhile(lambda entry: entry['event_key'] > event_key, iter_activity_log_entries(bucket_name, project)))
+
+    dynamodb = AWSClientRegistry.get_client('dynamodb', constants.AWS_ROOT_ACCESS_KEY_ID,
+                                            constants.AWS_ROOT_SECRET_ACCESS_KEY,
+                                            region_name=constants.AWS_REGION)
+
+    LegacyActivityLogMigrations.ensure(bucket_name, project)
+    
+    pages = dynamodb.get_paginator('query').paginate(
+        TableName = constants.ACTIVITY_LOG_TABLE,
+        KeyConditionExpression = 'project_key = :project_key AND event_key > :event_key',
+        ExpressionAttributeValues = {':project_key': {'S': get_activity_log_project_key(bucket_name, project)},
+                                     ':event_key': {'S': event_key}},
+        ScanIndexForward = False
+    )
+
+    return [deserialize_DynamoDB_item(item) for page in pages for item in page.get('Items', [])]
+
+
+class ActivityHistoryCache:
+    """Local copy of the newest part of a project's activity log, fetched a page at a time.
+
+    Entries are kept newest first in '<projects_directory>/.bigfoot_activity_cache/'. Opening
+    the history shows the cached entries straight away; refresh() then adds only the events
+    logged since shortly before the newest cached one, and load_older() extends the cache one
+    Query page back.
+    """
+
+    caches = dict()
+    caches_lock = threading.Lock()
+
+    @classmethod
+    def for_project(cls, projects_directory, bucket_name, project):
+        with cls.caches_lock:
+            key = (projects_directory, bucket_name, project)
+            if key not in cls.caches:
+                cls.caches[key] = cls(projects_directory, bucket_name, project)
+            return cls.caches[key]
+
+    @classmethod
+    def discard(cls, projects_directory, bucket_name, project):
+        # For a deleted project: forget the in-memory cache and remove its file.
+        with cls.caches_lock:
+            cls.caches.pop((projects_directory, bucket_name, project), None)
+            
+        try:
+            os.remove(os.path.join(projects_directory, constants.ACTIVITY_HISTORY_CACHE_DIR,
+                                   get_activity_log_project_key(bucket_name, project) + '.json.gz'))
+        except FileNotFoundError:
+            pass
+            
+        return None
+
+    def __init__(self, projects_directory, bucket_name, project):
+        self.bucket_name = bucket_name
+        self.project = project
+        self.cache_filepath = os.path.join(projects_directory, constants.ACTIVITY_HISTORY_CACHE_DIR,
+                                           get_activity_log_project_key(bucket_name, project) + '.json.gz')
+        self.entries = []
+        self.complete = False
+        self.lock = threading.Lock()
+        self.load()
+        return None
+
+    def load(self):
+        try:
+            with gzip.open(self.cache_filepath, 'rt') as cache_file:
+                cache_data = json.load(cache_file)
+            if cache_data.get('format') == constants.ACTIVITY_HISTORY_CACHE_FORMAT_VERSION:
+                self.entries = cache_data['entries']
+                self.complete = cache_data['complete']
+        except (OSError, ValueError, KeyError):
+            self.entries, self.complete = [], False
+        return None
+
+    def save(self):
+        cache_data = {'format': constants.ACTIVITY_HISTORY_CACHE_FORMAT_VERSION, 'complete': self.complete, 'entries': self.entries}
+        
+        # DynamoDB numbers come back as Decimal.
+        def _default(value):
+            return int(value) if value == value.to_integral_value() else float(value)
+
+        Path(self.cache_filepath).parent.mkdir(parents=True, exist_ok=True)
+        tmp_filepath = self.cache_filepath + '.tmp'
+        with gzip.open(tmp_filepath, 'wt') as cache_file:
+            json.dump(cache_data, cache_file, separators=(',', ':'), default=_default)
+        os.replace(tmp_filepath, self.cache_filepath)
+
+        return None
+
+    def cached_entries(self, start=0, count=None):
+        with self.lock:
+            return self.entries[start:None if count is None else start + count]
+
+    def refresh(self):
+        # Returns the number of new events.
+        with self.lock:
+            # Migrated legacy events are older than anything cached, so the cache starts over.
+            if constants.ACTIVITY_LOG_SHARED_TABLE_ENABLED and LegacyActivityLogMigrations.ensure(self.bucket_name, self.project):
+                self.entries, self.complete = [], False
+                
+            if not self.entries:
+                entries, cursor = get_activity_log_page(self.bucket_name, self.project)
+                self.entries, self.complete = entries, cursor is None
+                new_entries = entries
+            else:
+                # Event keys come from each writer's clock, so an event can land just behind the
+                # newest cached one; re-read an overlap window and keep only the unseen events.
+                newest_ms = int(self.entries[0]['event_key'].split('#')[0])
+                since_key = get_activity_log_event_key(max(newest_ms - constants.ACTIVITY_HISTORY_REFRESH_OVERLAP_SEC * 1000, 0), '')
+                
+                cached_keys = {entry['event_key'] for entry in self.entries}
+                new_entries = [entry for entry in get_activity_log_entries_since(self.bucket_name, self.project, since_key)
+                               if entry['event_key'] not in cached_keys]
+                
+                if new_entries:
+                    self.entries = sorted(new_entries + self.entries, key=lambda entry: entry['event_key'], reverse=True)
+                
+            if new_entries:
+                self.save()
+                
+            return len(new_entries)
+
+    def load_older(self):
+        # Fetches the page just older than the oldest cached event. Returns the entries added.
+        with self.lock:
+            if self.complete:
+                return []
+                
+            entries, cursor = get_activity_log_page(self.bucket_name, self.project, self.entries[-1]['event_key'] if self.entries else None)
+            self.entries.extend(entries)
+            self.complete = cursor is None
+            self.save()
+            
+            return entries
+
+
+def batch_write_activity_log_requests(dynamodb, requests):
+
+    # BatchWriteItem in chunks of ACTIVITY_LOG_BATCH_WRITE_SIZE, re-sending unprocessed items with backoff.
+    for i in range(0, len(requests), constants.ACTIVITY_LOG_BATCH_WRITE_SIZE):
+        pending = {constants.ACTIVITY_LOG_TABLE: requests[i:i + constants.ACTIVITY_LOG_BATCH_WRITE_SIZE]}
+        attempt = 0
+        
+        while pending:
+            pending = dynamodb.batch_write_item(RequestItems = pending).get('UnprocessedItems')
+            if pending:
+                attempt += 1
+                time.sleep(min(2 ** attempt * 0.05, 2.0))
+
+    return None
+
+
+def delete_activity_log(bucket_name, project):
+
+    # Drops the project's partition from the shared table and its legacy table, if any.
+    dynamodb = AWSClientRegistry.get_client('dynamodb', constants.AWS_ROOT_ACCESS_KEY_ID,
+                                            constants.AWS_ROOT_SECRET_ACCESS_KEY,
+                                            region_name=constants.AWS_REGION)
+
+    if constants.ACTIVITY_LOG_SHARED_TABLE_ENABLED:
+        ensure_activity_log_table()
+        
+        requests = []
+        pages = dynamodb.get_paginator('query').paginate(
+            TableName = constants.ACTIVITY_LOG_TABLE,
+            KeyConditionExpression = 'project_key = :project_key',
+            ExpressionAttributeValues = {':project_key': {'S': get_activity_log_project_key(bucket_name, project)}},
+            ProjectionExpression = 'project_key, event_key'
+        )
+        for page in pages:
+            requests.extend({'DeleteRequest': {'Key': item}} for item in page.get('Items', []))
+            
+        requests.append({'DeleteRequest': {'Key': {'project_key': {'S': get_activity_log_project_key(bucket_name, project) + constants.ACTIVITY_LOG_MIGRATION_MARKER_SUFFIX},
+                                                   'event_key': {'S': 'legacy'}}}})
+        batch_write_activity_log_requests(dynamodb, requests)
+        LegacyActivityLogMigrations.checked.discard((bucket_name, project))
+
+    try:
+        delete_DynamoDB_table(constants.AWS_ROOT_ACCESS_KEY_ID, constants.AWS_ROOT_SECRET_ACCESS_KEY,
+                              get_legacy_activity_log_table(bucket_name, project))
+    except ClientError as err:
+        if err.response['Error']['Code'] != 'ResourceNotFoundException':
+            raise err
+
+    return None
+
+
+def migrate_activity_log_to_shared_table(bucket_name, project, delete_legacy_table=False):
+
+    # Copies every event of a project's legacy '<bucket>_<project>' table into the shared table.
+    # Event keys are derived from each item's utc_time and content, so re-running the migration
+    # overwrites instead of duplicating. Returns the number of events copied.
+    dynamodb = AWSClientRegistry.get_client('dynamodb', constants.AWS_ROOT_ACCESS_KEY_ID,
+                                            constants.AWS_ROOT_SECRET_ACCESS_KEY,
+                                            region_name=constants.AWS_REGION)
+    
+    ensure_activity_log_table()
+    
+    legacy_table = get_legacy_activity_log_table(bucket_name, project)
+    project_key = get_activity_log_project_key(bucket_name, project)
+    requests = []
+
+    for page in dynamodb.get_paginator('scan').paginate(TableName = legacy_table):
+        for item in page.get('Items', []):
+            requests.append({'PutRequest': {'Item': dict(item,
+                                                         project_key={'S': project_key},
+                                                         event_key={'S': get_legacy_activity_log_event_key(item)})}})
+
+    batch_write_activity_log_requests(dynamodb, requests)
+    
+    if delete_legacy_table:
+        delete_DynamoDB_table(constants.AWS_ROOT_ACCESS_KEY_ID, constants.AWS_ROOT_SECRET_ACCESS_KEY, legacy_table)
+
+    print(f'Migrated {len(requests)} activity log events of {project} to {constants.ACTIVITY_LOG_TABLE}')
+
+    return len(requests)
+
+
+class LegacyActivityLogMigrations:
+    """Migrates each project's legacy activity table into the shared table, once per project.
+
+    The first read of a project's activity copies the legacy '<bucket>_<project>' table over if
+    there is one, then stores a marker item in the shared table, so later sessions and other
+    workstations skip it with one GetItem. Writes never migrate; uploads don't wait on it.
+    The legacy table is left in place.
+    """
+
+    checked = set()
+    locks = dict()
+    lock = threading.Lock()
+
+    @classmethod
+    def ensure(cls, bucket_name, project):
+        # Returns True if events were migrated just now.
+        with cls.lock:
+            project_lock = cls.locks.setdefault((bucket_name, project), threading.Lock())
+            
+        with project_lock:
+            if (bucket_name, project) in cls.checked:
+                return False
+                
+            dynamodb = AWSClientRegistry.get_client('dynamodb', constants.AWS_ROOT_ACCESS_KEY_ID,
+                                                    constants.AWS_ROOT_SECRET_ACCESS_KEY,
+                                                    region_name=constants.AWS_REGION)
+            ensure_activity_log_table()
+            
+            marker_key = {'project_key': {'S': get_activity_log_project_key(bucket_name, project) + constants.ACTIVITY_LOG_MIGRATION_MARKER_SUFFIX},
+                          'event_key': {'S': 'legacy'}}
+            migrated = 0
+            
+            if 'Item' not in dynamodb.get_item(TableName = constants.ACTIVITY_LOG_TABLE, Key = marker_key, ConsistentRead = True):
+                try:
+                    migrated = migrate_activity_log_to_shared_table(bucket_name, project)
+                except ClientError as err:
+                    if err.response['Error']['Code'] != 'ResourceNotFoundException':
+                        raise err
+                        
+                dynamodb.put_item(TableName = constants.ACTIVITY_LOG_TABLE,
+                                  Item = dict(marker_key, migrated={'N': str(migrated)}, utc_time={'S': str(int(time.time()))}))
+                
+            cls.checked.add((bucket_name, project))
+            
+            return migrated > 0
+
+
+def migrate_activity_logs_to_shared_table(user_info, delete_legacy_tables=False):
+
+    # Migrates the legacy tables of every project the user owns; projects without one are skipped.
+    migrated = dict()
+    
+    for project, project_info in user_info.get('projects', {}).items():
+        if project_info.get('status') != 'owner':
+            continue
+        try:
+            migrated[project] = migrate_activity_log_to_shared_table(project_info['bucket'], project, delete_legacy_tables)
+        except ClientError as err:
+            if err.response['Error']['Code'] != 'ResourceNotFoundException':
+                raise err
+
+    return migrated
+
+
+def add_s3_bucket_policy(access_key_id, secret_access_key, bucket_name, project_name, user):
+
+    policy_dict = {
+                    "Version": "2012-10-17",
+                    "Statement": [
+                        {
+                            "Sid": "AllowStatement3",
+                            "Action": [
+                                "s3:ListBucket"
+                            ],
+                            "Effect": "Allow",
+                            "Resource": [
+                                f"arn:aws:s3:::{bucket_name}"
+                            ],
+                            "Condition": {
+                                "StringLike": {
+                                    "s3:prefix": [
+                                        f"{project_name}/*",
+                                        f"{constants.CAS_BLOBS_PREFIX}/*"
+                                    ]
+                                }
+                            }
+                        },
+                        {
+                            "Sid": "AllowStatement4A",
+                            "Effect": "Allow",
+                            "Action": [
+                                "s3:*"
+                            ],
+                            "Resource": [
+                                f"arn:aws:s3:::{bucket_name}/{project_name}/*"
+                            ]
+                        },
+                        {
+                            "Sid": "AllowStatement4B",
+                            "Effect": "Allow",
+                            "Action": [
+                                "s3:GetObject",
+                                "s3:GetObjectAttributes",
+                                "s3:GetObjectTagging",
+                                "s3:PutObject",
+                                "s3:PutObjectTagging"
+                            ],
+                            "Resource": [
+                                f"arn:aws:s3:::{bucket_name}/{constants.CAS_BLOBS_PREFIX}/*"
+                            ]
+                        }
+                    ]
+                }
+
+    try:
+        s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+
+        s3.put_bucket_policy(
+            Bucket = bucket_name,
+            Policy = json.dumps(policy_dict)
+        )
+
+    except ClientError as e:
+        print(f"Unexpected error:  {e}")
+
+    return None
+
+
+class TransferJournal:
+    """Append-only JSON-lines journal of unfinished transfers for one projects directory.
+
+    Records that must survive a crash (queued files, multipart upload IDs, completed parts)
+    are fsync'd before the transfer moves on; completions are only flushed, since redoing a
+    finished file is harmless. On load the log is replayed, a torn last line is ignored, and
+    the file is compacted to one 'state' record per unfinished transfer.
+
+    The journal also remembers each upload batch's activity log entry until the whole batch
+    is on REMOTE, and every multipart upload ID it started until that upload is known to be
+    completed or aborted, so only this client's orphaned uploads are ever aborted.
+    """
+
+    journals = dict()
+    journals_lock = threading.Lock()
+
+    @classmethod
+    def for_directory(cls, projects_directory):
+        with cls.journals_lock:
+            if projects_directory not in cls.journals:
+                cls.journals[projects_directory] = cls(projects_directory)
+            return cls.journals[projects_directory]
+
+    def __init__(self, projects_directory):
+        self.journal_filepath = os.path.join(projects_directory, constants.TRANSFER_JOURNAL_FILENAME)
+        self.entries = dict()
+        self.batches = dict()
+        self.uploads = dict()
+        self.lock = threading.Lock()
+        self.journal_file = None
+        self.load()
+        return None
+
+    @staticmethod
+    def get_key(direction, bucket_name, obj):
+        return direction + ':' + bucket_name + ':' + obj
+
+    def load(self):
+        try:
+            with open(self.journal_filepath, 'r') as journal_file:
+                for line in journal_file:
+                    try:
+                        self.apply(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            pass
+
+        self.compact()
+        return None
+
+    def apply(self, record):
+        op, key = record['op'], record['key']
+        fields = {name: value for name, value in record.items() if name not in ('op', 'key')}
+        entry = self.entries.get(key)
+
+        if op == 'state':
+            self.entries[key] = fields['state']
+        elif op == 'queued':
+            entry = self.entries.setdefault(key, {'parts': dict(), 'attempts': 0})
+            entry.update(fields)
+            entry['attempts'] += 1
+        elif op in ('done', 'abandoned'):
+            self.entries.pop(key, None)
+            # A batch with an abandoned file never makes it to REMOTE in full.
+            if op == 'abandoned' and entry is not None and entry.get('batch') in self.batches:
+                self.batches[entry['batch']]['failed'] = True
+        elif op == 'batch':
+            self.batches[key] = fields
+        elif op == 'batch_done':
+            self.batches.pop(key, None)
+        elif op == 'mpu_created':
+            self.uploads[fields['upload_id']] = {'bucket': fields['bucket'], 'obj': fields['obj']}
+        elif op == 'mpu_forgotten':
+            self.uploads.pop(fields['upload_id'], None)
+        elif entry is not None:
+            if op == 'mpu':
+                entry['parts'] = dict()
+                self.uploads[fields['upload_id']] = {'bucket': entry.get('bucket'), 'obj': entry.get('obj')}
+            elif op == 'part':
+                entry['parts'][str(fields.pop('part'))] = fields.pop('etag')
+            entry.update(fields)
+
+        return None
+
+    def compact(self):
+        with self.lock:
+            tmp_filepath = self.journal_filepath + '.tmp'
+            try:
+                with open(tmp_filepath, 'w') as journal_file:
+                    for key, entry in self.entries.items():
+                        journal_file.write(json.dumps({'op': 'state', 'key': key, 'state': entry}, separators=(',', ':')) + '\n')
+                    for key, batch in self.batches.items():
+                        journal_file.write(json.dumps(dict(batch, op='batch', key=key), separators=(',', ':')) + '\n')
+                    for upload_id, upload in self.uploads.items():
+                        journal_file.write(json.dumps(dict(upload, op='mpu_created', key='', upload_id=upload_id), separators=(',', ':')) + '\n')
+                    journal_file.flush()
+                    os.fsync(journal_file.fileno())
+                os.replace(tmp_filepath, self.journal_filepath)
+            except OSError as e:
+                print(f"Unexpected error:  {e}")
+
+        return None
+
+    def record_many(self, records, durable=True):
+        # records: [(op, key, {field: value}), ...], written and applied as one unit.
+        with self.lock:
+            if self.journal_file is None:
+                self.journal_file = open(self.journal_filepath, 'a')
+
+            for op, key, fields in records:
+                record = dict(fields, op=op, key=key)
+                self.journal_file.write(json.dumps(record, separators=(',', ':')) + '\n')
+                self.apply(record)
+
+            self.journal_file.flush()
+            if durable:
+                os.fsync(self.journal_file.fileno())
+
+        return None
+
+    def record(self, op, key, durable=True, **fields):
+        return self.record_many([(op, key, fields)], durable)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return dict(entry, parts=dict(entry['parts'])) if entry else None
+
+    def pending(self, bucket_name):
+        with self.lock:
+            return [(key, dict(entry)) for key, entry in self.entries.items() if entry.get('bucket') == bucket_name]
+
+    def pending_batches(self, bucket_name):
+        with self.lock:
+            return [(key, dict(batch)) for key, batch in self.batches.items() if batch.get('bucket') == bucket_name]
+
+    def created_uploads(self, bucket_name):
+        # {upload ID: object key} for the multipart uploads this journal started and hasn't seen finish.
+        with self.lock:
+            return {upload_id: upload['obj'] for upload_id, upload in self.uploads.items() if upload['bucket'] == bucket_name}
+
+
+class TokenBucket:
+    """Thread-safe byte-rate limiter; consume() sleeps just long enough to keep callers under the rate."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = rate or 0  # <--- one second of burst
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+        return None
+
+    def consume(self, nbytes):
+        # boto3 reports retried bytes as negative progress; those were already paid for.
+        if not self.rate or nbytes <= 0:
+            return None
+
+        # Tokens may go negative: each caller reserves its bytes and sleeps off its own debt,
+        # so concurrent transfers share the rate instead of racing for it.
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= nbytes
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return None
+
+
+class TransferScheduler:
+    """Process-wide transfer queue: every upload and download job runs on its workers.
+
+    Jobs wait in two lanes. Interactive jobs (single-file fetches, project images) are taken
+    before any queued bulk job and also have TRANSFER_INTERACTIVE_WORKERS workers of their
+    own, so they never wait behind a running multi-GB sync. Within a lane the largest job
+    runs first, so big multipart transfers start early and small files fill in around them.
+    get_throttle() hands out the global and per-project bandwidth caps as a callable that
+    transfer loops and boto3 Callbacks call with every chunk they move.
+    """
+
+    PRIORITY_INTERACTIVE = 0
+    PRIORITY_BULK = 1
+
+    instance = None
+    instance_lock = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        with cls.instance_lock:
+            if cls.instance is None:
+                cls.instance = cls()
+            return cls.instance
+
+    def __init__(self, bulk_workers=None, interactive_workers=None):
+        self.condition = threading.Condition()
+        self.queues = {self.PRIORITY_INTERACTIVE: [], self.PRIORITY_BULK: []}
+        self.sequence = itertools.count()
+        self.global_bucket = TokenBucket(constants.TRANSFER_GLOBAL_MAX_BYTES_PER_SEC)
+        self.project_buckets = dict()
+        self.workers = []
+
+        lanes = [(self.PRIORITY_INTERACTIVE, self.PRIORITY_BULK)] * (bulk_workers or constants.TRANSFER_MAX_WORKERS)
+        lanes += [(self.PRIORITY_INTERACTIVE,)] * (interactive_workers or constants.TRANSFER_INTERACTIVE_WORKERS)
+
+        for priorities in lanes:
+            worker = threading.Thread(target=self.run_worker, args=(priorities,), daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+        return None
+
+    def submit(self, fn, *args, priority=PRIORITY_BULK, size=0, **kwargs):
+        future = concurrent.futures.Future()
+
+        with self.condition:
+            heapq.heappush(self.queues[priority], (-size, next(self.sequence), future, fn, args, kwargs))
+            self.condition.notify_all()
+
+        return future
+
+    def run_worker(self, priorities):
+        while True:
+            with self.condition:
+                while not any(self.queues[priority] for priority in priorities):
+                    self.condition.wait()
+                    
+                for priority in priorities:
+                    if self.queues[priority]:
+                        _, _, future, fn, args, kwargs = heapq.heappop(self.queues[priority])
+                        break
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def get_project_bucket(self, project):
+        with self.condition:
+            if project not in self.project_buckets:
+                rate = constants.TRANSFER_PROJECT_MAX_BYTES_PER_SEC.get(project, constants.TRANSFER_DEFAULT_PROJECT_MAX_BYTES_PER_SEC)
+                self.project_buckets[project] = TokenBucket(rate)
+            return self.project_buckets[project]
+
+    def get_throttle(self, project, priority=PRIORITY_BULK):
+        # Interactive fetches only answer to the global cap. Returns None when nothing is capped.
+        buckets = [self.global_bucket]
+        if priority == self.PRIORITY_BULK:
+            buckets.append(self.get_project_bucket(project))
+
+        buckets = [bucket for bucket in buckets if bucket.rate]
+        
+        if not buckets:
+            return None
+
+        def _throttle(nbytes):
+            for bucket in buckets:
+                bucket.consume(nbytes)
+            return None
+
+        return _throttle
+
+
+class TransferProgress:
+    """Thread-safe byte and file counters for one transfer batch.
+
+    Transfer threads call get_callback()/finish_file() as bytes move, which only takes a lock
+    and bumps counters. The UI polls snapshot() from a QTimer, so the Qt event loop sees a
+    few updates a second however many thousand callbacks the transfers produce.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.file_sizes = dict()
+        self.file_bytes = dict()
+        self.file_states = dict()
+        self.changed_files = set()
+        self.bytes_total = 0
+        self.bytes_done = 0
+        self.files_total = 0
+        self.files_done = 0
+        self.files_failed = 0
+        self.rate_samples = collections.deque()
+        return None
+
+    def add_files(self, file_sizes):
+        # file_sizes: {object key: size in bytes}; unknown sizes (0) grow as bytes arrive.
+        with self.lock:
+            for obj, size in file_sizes.items():
+                if obj in self.file_sizes:
+                    continue
+                self.file_sizes[obj] = size
+                self.file_bytes[obj] = 0
+                self.bytes_total += size
+                self.files_total += 1
+        return None
+
+    def add_bytes(self, obj, nbytes):
+        with self.lock:
+            done = self.file_bytes.get(obj, 0) + nbytes
+            self.file_bytes[obj] = done
+            self.bytes_done += nbytes
+            if done > self.file_sizes.get(obj, 0):
+                self.bytes_total += done - self.file_sizes.get(obj, 0)
+                self.file_sizes[obj] = done
+            self.changed_files.add(obj)
+        return None
+
+    def get_callback(self, obj, throttle=None):
+        # Byte callback for one file, chained behind the scheduler's bandwidth throttle.
+        def _callback(nbytes):
+            if throttle:
+                throttle(nbytes)
+            self.add_bytes(obj, nbytes)
+            return None
+
+        return _callback
+
+    def finish_file(self, obj, ok):
+        # Byte counts are squared up here: copied, resumed or compressed transfers don't move
+        # exactly file-size bytes, and a failed file shouldn't keep the ETA waiting for it.
+        with self.lock:
+            size, done = self.file_sizes.get(obj, 0), self.file_bytes.get(obj, 0)
+            if ok:
+                self.bytes_done += size - done
+                self.file_bytes[obj] = size
+            else:
+                self.bytes_done -= done
+                self.bytes_total -= size
+                self.files_failed += 1
+            self.file_states[obj] = ok
+            self.files_done += 1
+            self.changed_files.add(obj)
+        return None
+
+    def snapshot(self):
+        # Totals plus progress text for the files that changed since the previous snapshot.
+        now = time.monotonic()
+        
+        with self.lock:
+            changed = dict()
+            for obj in self.changed_files:
+                if obj in self.file_states:
+                    changed[obj] = 'done' if self.file_states[obj] else 'FAILED'
+                elif self.file_sizes[obj]:
+                    changed[obj] = f'{100 * self.file_bytes[obj] // self.file_sizes[obj]}%'
+            self.changed_files = set()
+            
+            snapshot = {
+                'bytes_done': self.bytes_done,
+                'bytes_total': self.bytes_total,
+                'files_done': self.files_done,
+                'files_total': self.files_total,
+                'files_failed': self.files_failed,
+                'files': changed
+            }
+
+        self.rate_samples.append((now, snapshot['bytes_done']))
+        while len(self.rate_samples) > 2 and now - self.rate_samples[0][0] > constants.TRANSFER_PROGRESS_RATE_WINDOW_SEC:
+            self.rate_samples.popleft()
+
+        elapsed = now - self.rate_samples[0][0]
+        snapshot['rate'] = (snapshot['bytes_done'] - self.rate_samples[0][1]) / elapsed if elapsed > 0 else 0.0
+        remaining = snapshot['bytes_total'] - snapshot['bytes_done']
+        snapshot['eta'] = remaining / snapshot['rate'] if snapshot['rate'] > 0 else None
+        
+        return snapshot
+
+
+def format_transfer_progress(snapshot):
+
+    mb = 1024 * 1024
+    text = (f"{snapshot['files_done']}/{snapshot['files_total']} files, "
+            f"{snapshot['bytes_done'] / mb:.1f}/{snapshot['bytes_total'] / mb:.1f} MB, "
+            f"{snapshot['rate'] / mb:.2f} MB/s")
+    
+    if snapshot['eta'] is not None and snapshot['files_done'] < snapshot['files_total']:
+        text += f", ETA {int(snapshot['eta']) // 60}:{int(snapshot['eta']) % 60:02d}"
+        
+    if snapshot['files_failed']:
+        text += f", {snapshot['files_failed']} failed"
+        
+    return text
+
+
+def plan_transfer_jobs(sized_items):
+
+    # sized_items: [(size, item), ...]. Returns [(total size, [item, ...]), ...]: every large
+    # item is a job of its own, small ones are packed together so per-job overhead and
+    # queueing don't dominate transfers of thousands of tiny files.
+    jobs = []
+    pack, pack_bytes = [], 0
+
+    for size, item in sorted(sized_items, key=lambda sized_item: sized_item[0], reverse=True):
+        if size >= constants.TRANSFER_SMALL_FILE_SIZE:
+            jobs.append((size, [item]))
+            continue
+            
+        if len(pack) >= constants.TRANSFER_SMALL_PACK_FILES or pack_bytes >= constants.TRANSFER_SMALL_PACK_BYTES:
+            jobs.append((pack_bytes, pack))
+            pack, pack_bytes = [], 0
+            
+        pack.append(item)
+        pack_bytes += size
+
+    if pack:
+        jobs.append((pack_bytes, pack))
+
+    return jobs
+
+
+def get_rmt_object_to_loc(access_key_id, secret_access_key, bucket_name, obj, filepath):
+
+    # Small one-off fetches (user and project images): interactive lane, caller waits.
+    try:
+        s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+        scheduler = TransferScheduler.get()
+    
+        response = scheduler.submit(s3.download_file, bucket_name, obj, filepath,
+                                    Callback=scheduler.get_throttle(obj.split('/')[0], TransferScheduler.PRIORITY_INTERACTIVE),
+                                    priority=TransferScheduler.PRIORITY_INTERACTIVE).result()
+    
+    except ClientError as e:
+        print(f"Unexpected error:  {e}")
+
+    return response
+
+
+def get_download_temp_filepath(filepath):
+
+    # Dot-prefixed so partially downloaded files never show up in the LOCAL tree.
+    head, tail = os.path.split(str(filepath))
+    
+    return os.path.join(head, '.' + tail + constants.DOWNLOAD_TEMP_SUFFIX)
+
+
+def get_rmt_object_to_loc_verified(access_key_id, secret_access_key, bucket_name, obj, filepath, cancel_event=None, throttle=None, journal=None, journal_key=None,
+                                   expected_sha256=None, version_id=None):
+
+    # expected_sha256: the checksum to verify against when the caller knows it independently
+    # (a blob's key); otherwise it comes from the object's metadata or checksum tag.
+    # version_id: download that version of obj instead of the current one.
+
+    def _check_cancelled():
+        if cancel_event is not None and cancel_event.is_set():
+            raise RuntimeError('Download cancelled')
+
+    _check_cancelled()
+    
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+
+    head_args = {'Bucket': bucket_name, 'Key': obj}
+    if version_id:
+        head_args['VersionId'] = version_id
+
+    head = s3.head_object(**head_args)
+    
+    size = head['ContentLength']
+    if expected_sha256 is None:
+        expected_sha256 = get_rmt_object_sha256(s3, bucket_name, obj, head)
+        
+    # No stored checksum (e.g. a streamed upload whose tag isn't written yet): the download
+    # goes ahead, but is reported as unverified rather than ok.
+    if not expected_sha256:
+        print(f'Download {obj}: no checksum stored on REMOTE, not verified')
+    
+    # Compressed objects are inflated on the fly; their sha256 is that of the original bytes.
+    encoding = head.get('Metadata', {}).get(constants.COMPRESSION_ENCODING_METADATA, '')
+    decompressor = zlib.decompressobj(31) if encoding == 'gzip' else None
+    
+    # Pin every ranged GET to the version we just looked at.
+    get_args = {'Bucket': bucket_name, 'Key': obj}
+    if head.get('VersionId'):
+        get_args['VersionId'] = head['VersionId']
+
+    def _get_range(start, end):
+        _check_cancelled()
+        data = s3.get_object(Range = f'bytes={start}-{end}', **get_args)['Body'].read()
+        if throttle:
+            throttle(len(data))
+        return data
+
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+    tmp_filepath = get_download_temp_filepath(filepath)
+    sha256 = hashlib.sha256()
+    written = 0
+    
+    # Large, unencoded downloads are journaled part by part: a retry or restart that finds
+    # the same object version and its temp file carries on after the last part written.
+    resumable = journal is not None and size >= constants.TRANSFER_MULTIPART_THRESHOLD and decompressor is None
+    resume_offset = 0
+    
+    if resumable:
+        state = journal.get(journal_key) or dict()
+        if state.get('etag') == head['ETag'] and state.get('size') == size and os.path.isfile(tmp_filepath):
+            resume_offset = min(state.get('offset', 0), os.path.getsize(tmp_filepath))
+            resume_offset -= resume_offset % constants.DOWNLOAD_PART_SIZE
+        journal.record('progress', journal_key, etag=head['ETag'], size=size, offset=resume_offset)
+
+    try:
+        with open(tmp_filepath, 'r+b' if resume_offset else 'wb') as f:
+            if resume_offset:
+                # Rebuild the digest of what is already on disk, then continue from there.
+                while written < resume_offset:
+                    data = f.read(min(constants.HASH_BUF_SIZE, resume_offset - written))
+                    sha256.update(data)
+                    written += len(data)
+                f.truncate(resume_offset)
+                print(f'Resuming download {obj} at byte {resume_offset}')
+            
+            def _write(data):
+                nonlocal written
+                if decompressor is not None:
+                    data = decompressor.decompress(data)
+                sha256.update(data)
+                f.write(data)
+                written += len(data)
+                
+            if size < constants.TRANSFER_MULTIPART_THRESHOLD:
+                body = s3.get_object(**get_args)['Body']
+                for chunk in body.iter_chunks(constants.DOWNLOAD_STREAM_CHUNK_SIZE):
+                    _check_cancelled()
+                    if throttle:
+                        throttle(len(chunk))
+                    _write(chunk)
+            
+            else:
+                # Parts are fetched concurrently but hashed and written strictly in order,
+                # with at most TRANSFER_MAX_CONCURRENCY parts buffered at a time.
+                part_size = constants.DOWNLOAD_PART_SIZE
+                ranges = iter([(start, min(start + part_size, size) - 1) for start in range(resume_offset, size, part_size)])
+                
+                with concurrent.futures.ThreadPoolExecutor(max_workers=constants.TRANSFER_MAX_CONCURRENCY) as executor:
+                    pending = collections.deque()
+                    
+                    for start, end in ranges:
+                        pending.append(executor.submit(_get_range, start, end))
+                        if len(pending) >= constants.TRANSFER_MAX_CONCURRENCY:
+                            break
+                    
+                    while pending:
+                        _write(pending.popleft().result())
+                        if resumable:
+                            journal.record('progress', journal_key, durable=False, offset=written)
+                        
+                        next_range = next(ranges, None)
+                        if next_range:
+                            pending.append(executor.submit(_get_range, *next_range))
+
+            if decompressor is not None:
+                tail = decompressor.flush()
+                sha256.update(tail)
+                f.write(tail)
+                written += len(tail)
+                if not decompressor.eof:
+                    raise ValueError(f'Truncated {encoding} stream for {obj}')
+
+        if expected_sha256 and sha256.hexdigest() != expected_sha256:
+            raise ValueError(f'Checksum mismatch for {obj}')
+            
+        os.replace(tmp_filepath, filepath)
+        
+    except BaseException as e:
+        # A partial download is kept for the next attempt unless it is corrupt or was cancelled.
+        if not resumable or isinstance(e, ValueError) or (cancel_event is not None and cancel_event.is_set()):
+            try:
+                os.remove(tmp_filepath)
+            except OSError:
+                pass
+        raise
+
+    if decompressor is not None:
+        print(f'Download {obj}: {size} bytes transferred for {written} bytes ({written / max(size, 1):.1f}x {encoding})')
+
+    return {'bytes': size, 'sha256': sha256.hexdigest(), 'verified': bool(expected_sha256)}
+
+
+def download_files_to_loc(access_key_id, secret_access_key, bucket_name, file_pairs, on_file_done=None, cancel_event=None, hash_cache=None, priority=None, journal=None,
+                          progress=None, version_ids=None):
+
+    # file_pairs: [(object key, local filepath), ...]. Returns {object key: result}.
+    # version_ids: {object key: VersionId} for keys wanted at an older version than the current one.
+    # Jobs go through the TransferScheduler; a single file is an interactive fetch by default.
+    results = dict()
+    version_ids = version_ids or dict()
+    scheduler = TransferScheduler.get()
+    
+    if priority is None:
+        priority = TransferScheduler.PRIORITY_INTERACTIVE if len(file_pairs) == 1 else TransferScheduler.PRIORITY_BULK
+        
+    manifest_entries = get_rmt_manifest_entries(access_key_id, secret_access_key, bucket_name, [obj for obj, filepath in file_pairs])
+
+    journal_keys = {obj: TransferJournal.get_key('download', bucket_name, obj) for obj, filepath in file_pairs}
+    
+    if journal is not None:
+        journal.record_many([('queued', journal_keys[obj], {'direction': 'download', 'bucket': bucket_name, 'obj': obj, 'filepath': str(filepath),
+                                                             'version_id': version_ids.get(obj, '')})
+                             for obj, filepath in file_pairs])
+
+    def _download_one(obj, filepath):
+        throttle = scheduler.get_throttle(obj.split('/')[0], priority)
+        if progress is not None:
+            throttle = progress.get_callback(obj, throttle)
+        blob_key = manifest_entries.get(obj, {}).get('blob')
+        
+        # An older version is fetched as stored: the manifest's blob and chunk list describe the current one.
+        if version_ids.get(obj):
+            return get_rmt_object_to_loc_verified(access_key_id, secret_access_key, bucket_name, obj, filepath, cancel_event, throttle,
+                                                  journal, journal_keys[obj], version_id=version_ids[obj])
+        
+        # A blob's key is its sha256, which doesn't depend on metadata anyone could have rewritten.
+        if blob_key:
+            return get_rmt_object_to_loc_verified(access_key_id, secret_access_key, bucket_name, blob_key, filepath, cancel_event, throttle,
+                                                  journal, journal_keys[obj], blob_key.rsplit('/', 1)[-1])
+
+        # Large files we already have a copy of are patched in place from their chunk lists.
+        if constants.DELTA_SYNC_ENABLED and os.path.isfile(filepath) and os.path.getsize(filepath) >= constants.DELTA_SYNC_MIN_FILE_SIZE:
+            return get_rmt_object_to_loc_delta(access_key_id, secret_access_key, bucket_name, obj, filepath, hash_cache, cancel_event, throttle)
+            
+        return get_rmt_object_to_loc_verified(access_key_id, secret_access_key, bucket_name, obj, filepath, cancel_event, throttle,
+                                              journal, journal_keys[obj])
+
+    def _download_pack(pack):
+        outcomes = []
+        for obj, filepath in pack:
+            try:
+                outcomes.append((obj, _download_one(obj, filepath), None))
+            except (BotoCoreError, ClientError, OSError, RuntimeError, ValueError, zlib.error) as e:
+                outcomes.append((obj, None, e))
+        return outcomes
+
+    # Objects missing from the manifest are treated as large: one job each, scheduled first.
+    sized_pairs = [(manifest_entries[obj]['size'] if obj in manifest_entries else constants.TRANSFER_SMALL_FILE_SIZE, (obj, filepath))
+                   for obj, filepath in file_pairs]
+    
+    if progress is not None:
+        progress.add_files({obj: manifest_entries[obj]['size'] if obj in manifest_entries else 0 for obj, filepath in file_pairs})
+        
+    futures = [scheduler.submit(_download_pack, pack, priority=priority, size=size) for size, pack in plan_transfer_jobs(sized_pairs)]
+
+    for future in concurrent.futures.as_completed(futures):
+        for obj, downloaded, error in future.result():
+            if error is None:
+                results[obj] = {'ok': True, 'bytes': downloaded['bytes'], 'sha256': downloaded['sha256'], 'verified': downloaded['verified'], 'error': ''}
+            else:
+                results[obj] = {'ok': False, 'bytes': 0, 'sha256': '', 'verified': False, 'error': str(error)}
+                
+            if progress is not None:
+                progress.finish_file(obj, results[obj]['ok'])
+                
+            if journal is not None:
+                record_transfer_outcome(journal, journal_keys[obj], results[obj]['ok'], cancel_event, error)
+
+            if on_file_done:
+                on_file_done(obj, results[obj]['ok'], results[obj]['error'])
+
+    if hash_cache is not None:
+        hash_cache.save()
+
+    return results
+
+
+def put_loc_object_to_rmt(access_key_id, secret_access_key, filepath, bucket_name, obj, sha256='', transfer_config=None, throttle=None):
+
+    response = None
+
+    try:
+        s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+    
+        extra_args = {
+            "Metadata": {
+                "ChecksumSHA256": sha256
+            }
+        }
+        
+        if constants.S3_USE_NATIVE_CHECKSUMS:
+            extra_args["ChecksumAlgorithm"] = 'SHA256'
+            
+        multipart_threshold = transfer_config.multipart_threshold if transfer_config else constants.TRANSFER_MULTIPART_THRESHOLD
+        
+        if os.path.getsize(filepath) < multipart_threshold:
+            # A single PUT: its response carries the ETag and VersionId, so callers need no HEAD.
+            with open(filepath, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if throttle:
+                    throttle(size)
+                response = s3.put_object(Bucket=bucket_name, Key=obj, Body=f, **extra_args)
+            response['ContentLength'] = size
+        else:
+            s3.upload_file(filepath, bucket_name, obj,
+                ExtraArgs=extra_args,
+                Callback=throttle,
+                Config=transfer_config
+            )
+        
+        RemoteObjectExistenceCache.invalidate(bucket_name, obj)
+    
+    except ClientError as e:
+        print(f"Unexpected error:  {e}")
+        raise e
+
+    return response
+
+
+class HashingFileReader:
+    """Read-only file wrapper that sha256-hashes bytes as the uploader reads them."""
+
+    def __init__(self, filepath):
+        self.f = open(filepath, 'rb')
+        self.size = os.fstat(self.f.fileno()).st_size
+        self.sha256 = hashlib.sha256()
+        self.hashed_upto = 0
+        self.sequential = True
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def read(self, size=-1):
+        position = self.f.tell()
+        data = self.f.read(size)
+
+        # Re-reads (retries, checksum passes) are skipped; only unseen bytes are hashed.
+        if position <= self.hashed_upto < position + len(data):
+            self.sha256.update(memoryview(data)[self.hashed_upto - position:])
+            self.hashed_upto = position + len(data)
+        elif position > self.hashed_upto:
+            self.sequential = False
+
+        return data
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=0):
+        return self.f.seek(offset, whence)
+
+    def tell(self):
+        return self.f.tell()
+
+    def close(self):
+        self.f.close()
+        return None
+
+    def complete(self):
+        return self.sequential and self.hashed_upto == self.size
+
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+
+class CompressingFileReader:
+    """Read-only, non-seekable file wrapper that yields a gzip stream of the file and sha256-hashes the original bytes."""
+
+    def __init__(self, filepath, level=None):
+        self.f = open(filepath, 'rb')
+        self.sha256 = hashlib.sha256()
+        self.compressor = zlib.compressobj(level or constants.COMPRESSION_LEVEL, zlib.DEFLATED, 31)
+        self.buffer = bytearray()
+        self.eof = False
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def read(self, size=-1):
+        while not self.eof and (size is None or size < 0 or len(self.buffer) < size):
+            data = self.f.read(constants.HASH_BUF_SIZE)
+            if data:
+                self.sha256.update(data)
+                self.raw_bytes += len(data)
+                self.buffer += self.compressor.compress(data)
+            else:
+                self.buffer += self.compressor.flush()
+                self.eof = True
+
+        if size is None or size < 0:
+            size = len(self.buffer)
+
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        self.compressed_bytes += len(data)
+
+        return data
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def close(self):
+        self.f.close()
+        return None
+
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+
+def should_compress_file(filepath, obj, st):
+
+    # Large files are never compressed, whatever their extension: they go to delta sync or the
+    # journaled, resumable multipart path, and a gzip stream has no stable chunk boundaries and
+    # can't be resumed part way. Below that, known text/mesh formats are compressed,
+    # already-compressed formats never are, and anything else is probed.
+    if not constants.COMPRESSION_ENABLED or st.st_size < constants.COMPRESSION_MIN_FILE_SIZE:
+        return False
+
+    if st.st_size >= constants.TRANSFER_RESUMABLE_MIN_SIZE or (constants.DELTA_SYNC_ENABLED and st.st_size >= constants.DELTA_SYNC_MIN_FILE_SIZE):
+        return False
+
+    if not constants.COMPRESSION_PROJECT_OVERRIDES.get(obj.split('/')[0], True):
+        return False
+
+    extension = os.path.splitext(filepath)[1].lower()
+
+    if extension in constants.COMPRESSION_EXTENSIONS:
+        return True
+
+    if extension in constants.COMPRESSION_SKIP_EXTENSIONS:
+        return False
+
+    with open(filepath, 'rb') as f:
+        sample = f.read(constants.COMPRESSION_PROBE_SIZE)
+
+    return len(zlib.compress(sample, 1)) <= len(sample) * constants.COMPRESSION_PROBE_MAX_RATIO
+
+
+def put_loc_object_to_rmt_compressed(access_key_id, secret_access_key, filepath, bucket_name, obj, sha256=None, transfer_config=None, throttle=None):
+
+    # The file is streamed through gzip into upload_fileobj, so the compressed copy never
+    # touches disk. The sha256 covers the original bytes and goes in the upload's metadata,
+    # so no tag has to be attached to a version afterwards; compressed files are below
+    # TRANSFER_RESUMABLE_MIN_SIZE, so hashing them first is cheap. The digest of the bytes
+    # actually streamed catches a file that changed in between.
+    # No native S3 checksum is requested: it would describe the compressed bytes.
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+
+    if not sha256:
+        sha256 = create_sha256_hash_for_file(filepath)
+
+    metadata = {constants.COMPRESSION_ENCODING_METADATA: 'gzip', "ChecksumSHA256": sha256}
+
+    with CompressingFileReader(filepath) as reader:
+        s3.upload_fileobj(reader, bucket_name, obj,
+            ExtraArgs={"Metadata": metadata},
+            Callback=throttle,
+            Config=transfer_config
+        )
+        
+        raw_bytes = reader.raw_bytes
+        streamed_sha256 = reader.hexdigest()
+
+    RemoteObjectExistenceCache.invalidate(bucket_name, obj)
+
+    if streamed_sha256 != sha256:
+        raise ValueError(f'{filepath} changed while it was uploading')
+
+    head = s3.head_object(
+        Bucket = bucket_name,
+        Key = obj
+    )
+
+    # The HEAD can see a version someone else wrote since; its entry is described by its own metadata.
+    if head.get('Metadata', {}).get('checksumsha256', '') != sha256:
+        print(f'Upload {obj}: overwritten on REMOTE since, recording the newer version')
+        return get_rmt_manifest_entry(access_key_id, secret_access_key, bucket_name, obj, get_rmt_object_sha256(s3, bucket_name, obj, head), head)
+
+    print(f'Upload {obj}: {raw_bytes} bytes sent as {head["ContentLength"]} ({raw_bytes / max(head["ContentLength"], 1):.1f}x gzip)')
+
+    return {
+                'size': head['ContentLength'],
+                'sha256': sha256,
+                'mtime': int(head['LastModified'].timestamp()),
+                'etag': head['ETag'],
+                'encoding': 'gzip',
+                'original_size': raw_bytes
+           }
+
+
+def get_rmt_object_sha256(s3, bucket_name, object_name, head_response):
+
+    # Checksum from user metadata, or from the tag written by put_loc_object_to_rmt_streaming.
+    sha256 = head_response.get('Metadata', {}).get('checksumsha256', '')
+    
+    if sha256:
+        return sha256
+
+    tagging_args = {'Bucket': bucket_name, 'Key': object_name}
+    if head_response.get('VersionId'):
+        tagging_args['VersionId'] = head_response['VersionId']
+
+    for tag in s3.get_object_tagging(**tagging_args)['TagSet']:
+        if tag['Key'] == constants.S3_CHECKSUM_TAG:
+            return tag['Value']
+
+    return ''
+
+
+def get_rmt_object_checksums(access_key_id, secret_access_key, bucket_name, objects, max_workers=None):
+
+    # objects: ListObjectsV2 records. Returns {object key: sha256 hex, or None if it no longer exists}.
+    # Single-part uploads made with S3_USE_NATIVE_CHECKSUMS carry a full-object SHA256 that
+    # GetObjectAttributes returns without a HEAD; it is only asked about objects the listing
+    # shows a SHA256 checksum for. Multipart (composite) checksums, older objects and keys
+    # GetObjectAttributes is refused for fall back to the metadata/tag lookup.
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+    attributes_denied = threading.Event()
+
+    def _get_checksum(obj):
+        # None if the object was deleted since it was listed.
+        try:
+            return _lookup_checksum(obj)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                return None
+            raise e
+
+    def _get_native_checksum(object_name):
+        try:
+            attributes = s3.get_object_attributes(
+                Bucket = bucket_name,
+                Key = object_name,
+                ObjectAttributes = ['Checksum', 'ObjectParts']
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                raise e
+            # Most likely a policy without s3:GetObjectAttributes; don't ask again this run.
+            if e.response['Error']['Code'] == 'AccessDenied':
+                attributes_denied.set()
+            return ''
+            
+        native_sha256 = attributes.get('Checksum', {}).get('ChecksumSHA256', '')
+        
+        if native_sha256 and '-' not in native_sha256 and not attributes.get('ObjectParts'):
+            return base64.b64decode(native_sha256).hex()
+            
+        return ''
+
+    def _lookup_checksum(obj):
+        object_name = obj['Key']
+        
+        if constants.S3_USE_NATIVE_CHECKSUMS and 'SHA256' in obj.get('ChecksumAlgorithm', []) and not attributes_denied.is_set():
+            native_sha256 = _get_native_checksum(object_name)
+            if native_sha256:
+                return native_sha256
+
+        # With ChecksumMode a HEAD returns the native checksum too; it only needs s3:GetObject.
+        response = s3.head_object(
+            Bucket = bucket_name,
+            Key = object_name,
+            **({'ChecksumMode': 'ENABLED'} if constants.S3_USE_NATIVE_CHECKSUMS else {})
+        )
+        
+        native_sha256 = response.get('ChecksumSHA256', '')
+        
+        if native_sha256 and '-' not in native_sha256 and not response.get('Metadata', {}).get('checksumsha256'):
+            return base64.b64decode(native_sha256).hex()
+
+        return get_rmt_object_sha256(s3, bucket_name, object_name, response)
+
+    checksums = dict()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or constants.TRANSFER_MAX_WORKERS) as executor:
+        for obj, sha256 in zip(objects, executor.map(_get_checksum, objects)):
+            checksums[obj['Key']] = sha256
+
+    return checksums
+
+
+def put_loc_object_to_rmt_streaming(access_key_id, secret_access_key, filepath, bucket_name, obj, transfer_config=None, throttle=None):
+
+    # The file is read from disk once: the sha256 comes from the same bytes the upload sends,
+    # and the whole-file digest is attached as a tag on exactly the version the upload created,
+    # as reported by PutObject or CompleteMultipartUpload.
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+
+    multipart_threshold = transfer_config.multipart_threshold if transfer_config else constants.TRANSFER_MULTIPART_THRESHOLD
+
+    if os.path.getsize(filepath) >= multipart_threshold:
+        put_response, sha256 = put_loc_object_to_rmt_multipart_hashing(s3, filepath, bucket_name, obj, transfer_config, throttle)
+        
+    else:
+        put_response, sha256 = put_loc_object_to_rmt_single_hashing(s3, filepath, bucket_name, obj, throttle)
+
+    RemoteObjectExistenceCache.invalidate(bucket_name, obj)
+
+    tagging_args = {'Bucket': bucket_name, 'Key': obj}
+    if put_response.get('VersionId'):
+        tagging_args['VersionId'] = put_response['VersionId']
+
+    s3.put_object_tagging(
+        Tagging = {'TagSet': [{'Key': constants.S3_CHECKSUM_TAG, 'Value': sha256}]},
+        **tagging_args
+    )
+
+    return get_rmt_manifest_entry(access_key_id, secret_access_key, bucket_name, obj, sha256, put_response)
+
+
+def put_loc_object_to_rmt_single_hashing(s3, filepath, bucket_name, obj, throttle=None):
+
+    # One PutObject, hashing the bytes as it reads them. Returns (response with the size added, sha256).
+    extra_args = {"ChecksumAlgorithm": 'SHA256'} if constants.S3_USE_NATIVE_CHECKSUMS else {}
+
+    with HashingFileReader(filepath) as reader:
+        if throttle:
+            throttle(reader.size)
+        put_response = s3.put_object(Bucket=bucket_name, Key=obj, Body=reader, **extra_args)
+        put_response['ContentLength'] = reader.size
+        
+        sha256 = reader.hexdigest() if reader.complete() else None
+
+    if sha256 is None:
+        sha256 = create_sha256_hash_for_file(filepath)
+
+    return put_response, sha256
+
+
+def put_loc_object_to_rmt_multipart_hashing(s3, filepath, bucket_name, obj, transfer_config=None, throttle=None):
+
+    # Multipart upload run by us, so each part is read once: the worker that reads a part feeds
+    # it to the whole-file sha256 (in part order, waiting for the parts before it) and then sends
+    # it, with its own SHA256 checksum when S3_USE_NATIVE_CHECKSUMS is on. Workers take parts in
+    # order, so at most one part per worker is held. Returns (CompleteMultipartUpload response
+    # with the size added, sha256).
+    st = os.stat(filepath)
+    chunksize = transfer_config.multipart_chunksize if transfer_config else constants.TRANSFER_MULTIPART_CHUNKSIZE
+    part_size = max(chunksize, -(-st.st_size // constants.DELTA_MAX_PARTS))
+    parts = [(offset, min(part_size, st.st_size - offset)) for offset in range(0, st.st_size, part_size)]
+
+    sha256 = hashlib.sha256()
+    hashed = threading.Condition()
+    next_part = 1
+
+    def _send_part(upload_id, part_number, part):
+        nonlocal next_part
+        offset, length = part
+        
+        with open(filepath, 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+            
+        with hashed:
+            while next_part < part_number:
+                hashed.wait()
+            sha256.update(data)
+            next_part += 1
+            hashed.notify_all()
+            
+        if throttle:
+            throttle(len(data))
+            
+        part_args = {"ChecksumAlgorithm": 'SHA256'} if constants.S3_USE_NATIVE_CHECKSUMS else {}
+        
+        response = s3.upload_part(
+            Bucket = bucket_name,
+            Key = obj,
+            UploadId = upload_id,
+            PartNumber = part_number,
+            Body = data,
+            **part_args
+        )
+        
+        if constants.S3_USE_NATIVE_CHECKSUMS:
+            return {'ETag': response['ETag'], 'ChecksumSHA256': response['ChecksumSHA256']}
+        return response['ETag']
+
+    def _check_unchanged():
+        st_after = os.stat(filepath)
+        if st_after.st_size != st.st_size or st_after.st_mtime_ns != st.st_mtime_ns:
+            raise RuntimeError(f'{filepath} changed during upload')
+
+    create_args = {"ChecksumAlgorithm": 'SHA256'} if constants.S3_USE_NATIVE_CHECKSUMS else {}
+    
+    complete_response = run_journaled_multipart_upload(s3, bucket_name, obj, parts, _send_part, create_args, before_complete=_check_unchanged)
+    complete_response['ContentLength'] = st.st_size
+
+    return complete_response, sha256.hexdigest()
+
+
+def get_transfer_config():
+
+    return TransferConfig(multipart_threshold=constants.TRANSFER_MULTIPART_THRESHOLD,
+                          multipart_chunksize=constants.TRANSFER_MULTIPART_CHUNKSIZE,
+                          max_concurrency=constants.TRANSFER_MAX_CONCURRENCY,
+                          use_threads=True)
+
+
+def get_rmt_blob_key(sha256):
+
+    # Blobs are shared by every project in the bucket; the two-character fan-out keeps listings manageable.
+    return constants.CAS_BLOBS_PREFIX + '/' + sha256[:2] + '/' + sha256
+
+
+def put_loc_object_to_rmt_blob(access_key_id, secret_access_key, filepath, bucket_name, obj, transfer_config=None, hash_cache=None, throttle=None):
+
+    # Content-addressed upload: the bytes go to the shared blob store once per sha256 and obj
+    # becomes a reference in its project manifest. A blob that is already there (same part in
+    # another project, or a version being re-uploaded) costs one HEAD and no transfer.
+    st = os.stat(filepath)
+    sha256 = hash_cache.get_sha256(filepath, st) if hash_cache is not None else create_sha256_hash_for_file(filepath)
+    blob_key = get_rmt_blob_key(sha256)
+
+    put_response = None
+
+    if does_object_exist_in_s3_bucket(access_key_id, secret_access_key, bucket_name, blob_key):
+        print(f'Blob upload {obj}: already stored as {blob_key}')
+        # Reusing a blob doesn't change its LastModified; the tag tells collect_rmt_blob_garbage
+        # it is wanted again, even if no manifest referenced it when the collection started.
+        s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+        put_response = s3.head_object(Bucket = bucket_name, Key = blob_key)
+        s3.put_object_tagging(
+            Bucket = bucket_name,
+            Key = blob_key,
+            VersionId = put_response['VersionId'],
+            Tagging = {'TagSet': [{'Key': constants.CAS_BLOB_REUSED_TAG, 'Value': str(int(time.time()))}]}
+        )
+    else:
+        put_response = put_loc_object_to_rmt(access_key_id, secret_access_key, filepath, bucket_name, blob_key, sha256, transfer_config, throttle)
+
+    manifest_entry = get_rmt_manifest_entry(access_key_id, secret_access_key, bucket_name, blob_key, sha256, put_response)
+    
+    # The reference is what changed, so it carries its own modification time rather than the blob's.
+    manifest_entry['mtime'] = int(time.time())
+    manifest_entry['blob'] = blob_key
+
+    return manifest_entry
+
+
+def get_rmt_manifest_entries(access_key_id, secret_access_key, bucket_name, objects):
+
+    # Returns {object key: manifest entry} for the objects their project manifests know about
+    # (sizes for scheduling, 'blob' for blob references). One manifest GET per project.
+    manifest_entries = dict()
+
+    for project in sorted(set(obj.split('/')[0] for obj in objects)):
+        manifest, _ = get_rmt_project_manifest(access_key_id, secret_access_key, bucket_name, project)
+        
+        for obj in objects:
+            if obj in manifest['entries']:
+                manifest_entries[obj] = manifest['entries'][obj]
+
+    return manifest_entries
+
+
+def get_rmt_chunk_list_key(obj):
+
+    project, _, relative_key = obj.partition('/')
+
+    return project + '/' + constants.MANIFEST_DIR + '/' + constants.DELTA_CHUNKS_DIR + '/' + relative_key + '.json'
+
+
+def get_rmt_chunk_list(s3, bucket_name, obj, head_response):
+
+    # The chunk list is only trusted while it describes the exact object version in head_response.
+    try:
+        response = s3.get_object(
+            Bucket = bucket_name,
+            Key = get_rmt_chunk_list_key(obj)
+        )
+        chunk_list = json.loads(response['Body'].read())
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+            return None
+        raise e
+    except ValueError:
+        return None
+
+    if (chunk_list.get('format') != constants.DELTA_CHUNK_LIST_FORMAT_VERSION
+            or chunk_list.get('etag') != head_response['ETag']
+            or chunk_list.get('size') != head_response['ContentLength']):
+        return None
+
+    return chunk_list
+
+
+def put_rmt_chunk_list(s3, bucket_name, obj, sha256, chunks):
+
+    head = s3.head_object(
+        Bucket = bucket_name,
+        Key = obj
+    )
+
+    # Someone else overwrote the object in the meantime: their version gets no chunk list.
+    if head.get('Metadata', {}).get('checksumsha256', '') != sha256:
+        return head
+
+    chunk_list = {
+                    'format': constants.DELTA_CHUNK_LIST_FORMAT_VERSION,
+                    'version_id': head.get('VersionId', ''),
+                    'etag': head['ETag'],
+                    'size': head['ContentLength'],
+                    'sha256': sha256,
+                    'chunks': chunks
+                 }
+
+    s3.put_object(
+        Bucket = bucket_name,
+        Key = get_rmt_chunk_list_key(obj),
+        Body = json.dumps(chunk_list, separators=(',', ':')).encode(),
+        ContentType = 'application/json'
+    )
+
+    return head
+
+
+def plan_delta_upload_parts(chunks, previous_chunks):
+
+    # Returns multipart parts as [kind, offset, length, previous offset] where kind is 'copy'
+    # (UploadPartCopy from the previous version) or 'upload' (bytes read from the local file).
+    # S3 requires every part but the last to be at least DELTA_MIN_PART_SIZE, so short reusable
+    # runs are uploaded anyway and short new runs borrow bytes from the run that follows them.
+    previous_offsets = {sha256: offset for offset, length, sha256 in previous_chunks}
+    min_part_size = constants.DELTA_MIN_PART_SIZE
+
+    runs = []
+    for offset, length, sha256 in chunks:
+        previous_offset = previous_offsets.get(sha256)
+        kind = 'upload' if previous_offset is None else 'copy'
+        
+        if runs and runs[-1][0] == kind and (kind == 'upload' or runs[-1][3] + runs[-1][2] == previous_offset):
+            runs[-1][2] += length
+        else:
+            runs.append([kind, offset, length, previous_offset])
+
+    segments = []
+    for run in runs:
+        if run[0] == 'copy' and run[2] < min_part_size:
+            run[0], run[3] = 'upload', None
+            
+        if segments and segments[-1][0] == 'upload' and run[0] == 'upload':
+            segments[-1][2] += run[2]
+        else:
+            segments.append(run)
+
+    i = 0
+    while i < len(segments) - 1:
+        segment, following = segments[i], segments[i + 1]
+        
+        if segment[0] == 'upload' and segment[2] < min_part_size:
+            needed = min_part_size - segment[2]
+            
+            if following[2] - needed >= min_part_size:
+                segment[2] += needed
+                following[1] += needed
+                following[2] -= needed
+                following[3] += needed
+            else:
+                segment[2] += following[2]
+                del segments[i + 1]
+                if i + 1 < len(segments) and segments[i + 1][0] == 'upload':
+                    segment[2] += segments[i + 1][2]
+                    del segments[i + 1]
+            continue
+            
+        i += 1
+
+    parts = []
+    for kind, offset, length, previous_offset in segments:
+        part_size = constants.DELTA_MAX_COPY_PART_SIZE if kind == 'copy' else constants.TRANSFER_MULTIPART_CHUNKSIZE
+        pieces = [[kind, offset + start, min(part_size, length - start), None if previous_offset is None else previous_offset + start]
+                  for start in range(0, length, part_size)]
+        
+        if len(pieces) > 1 and pieces[-1][2] < min_part_size:
+            pieces[-2][2] += pieces.pop()[2]
+            
+        parts.extend(pieces)
+
+    return parts
+
+
+def abort_multipart_upload_quietly(s3, bucket_name, obj, upload_id):
+
+    try:
+        s3.abort_multipart_upload(
+            Bucket = bucket_name,
+            Key = obj,
+            UploadId = upload_id
+        )
+    except ClientError as e:
+        print(f"Unexpected error:  {e}")
+
+    return None
+
+
+def run_journaled_multipart_upload(s3, bucket_name, obj, parts, send_part, create_args, journal=None, journal_key=None, plan_id='', cancel_event=None, before_complete=None):
+
+    # parts: [part descriptor, ...], numbered from 1; send_part(upload_id, part_number, part) returns
+    # the part's ETag, or its CompleteMultipartUpload fields ({'ETag', 'ChecksumSHA256'}) when the
+    # upload has a checksum algorithm. With a journal, the upload ID and each completed part are recorded, and a
+    # later call with the same plan_id (same file signature, same part layout) continues the same
+    # multipart upload, skipping every part ListParts confirms S3 already has.
+    state = journal.get(journal_key) if journal is not None else None
+    upload_id = None
+    completed = dict()
+
+    if state and state.get('upload_id'):
+        if state.get('plan_id') == plan_id:
+            try:
+                listed = dict()
+                for page in s3.get_paginator('list_parts').paginate(Bucket = bucket_name, Key = obj, UploadId = state['upload_id']):
+                    for part in page.get('Parts', []):
+                        listed[part['PartNumber']] = part['ETag']
+                upload_id = state['upload_id']
+                completed = {int(part_number): etag for part_number, etag in state['parts'].items() if listed.get(int(part_number)) == etag}
+            except ClientError as e:
+                print(f"Unexpected error:  {e}")
+        else:
+            abort_multipart_upload_quietly(s3, bucket_name, obj, state['upload_id'])
+
+    if upload_id is None:
+        upload_id = s3.create_multipart_upload(Bucket = bucket_name, Key = obj, **create_args)['UploadId']
+        if journal is not None:
+            journal.record('mpu', journal_key, upload_id=upload_id, plan_id=plan_id)
+    elif completed:
+        print(f'Resuming upload {obj}: {len(completed)}/{len(parts)} parts already stored')
+
+    def _send_part(part_number, part):
+        if part_number in completed:
+            return {'PartNumber': part_number, 'ETag': completed[part_number]}
+            
+        if cancel_event is not None and cancel_event.is_set():
+            raise RuntimeError('Upload cancelled')
+            
+        sent = send_part(upload_id, part_number, part)
+        part_fields = sent if isinstance(sent, dict) else {'ETag': sent}
+        
+        if journal is not None:
+            journal.record('part', journal_key, part=part_number, etag=part_fields['ETag'])
+            
+        return dict(part_fields, PartNumber=part_number)
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=constants.TRANSFER_MAX_CONCURRENCY) as executor:
+            completed_parts = list(executor.map(_send_part, range(1, len(parts) + 1), parts))
+
+        if before_complete:
+            before_complete()
+
+        response = s3.complete_multipart_upload(
+            Bucket = bucket_name,
+            Key = obj,
+            UploadId = upload_id,
+            MultipartUpload = {'Parts': completed_parts}
+        )
+        
+    except BaseException as e:
+        # Unjournaled uploads can never be resumed, and cancelled or hopeless ones shouldn't be.
+        if journal is None or (cancel_event is not None and cancel_event.is_set()) or not is_retryable_transfer_error(e):
+            abort_multipart_upload_quietly(s3, bucket_name, obj, upload_id)
+        raise
+
+    if journal is not None:
+        journal.record('mpu_forgotten', journal_key, durable=False, upload_id=upload_id)
+
+    return response
+
+
+def get_transfer_plan_id(*plan):
+
+    return hashlib.sha256(json.dumps(plan, separators=(',', ':')).encode()).hexdigest()
+
+
+def put_loc_object_to_rmt_resumable(access_key_id, secret_access_key, filepath, bucket_name, obj, sha256, journal=None, journal_key=None, throttle=None, cancel_event=None):
+
+    # Plain multipart upload run by us rather than boto3, so the upload ID and completed parts
+    # can be journaled and an interrupted upload picked up where it stopped.
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+
+    st = os.stat(filepath)
+    part_size = max(constants.TRANSFER_MULTIPART_CHUNKSIZE, -(-st.st_size // constants.DELTA_MAX_PARTS))
+    parts = [(offset, min(part_size, st.st_size - offset)) for offset in range(0, st.st_size, part_size)]
+
+    def _send_part(upload_id, part_number, part):
+        offset, length = part
+        
+        with open(filepath, 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+            
+        if throttle:
+            throttle(len(data))
+            
+        return s3.upload_part(
+            Bucket = bucket_name,
+            Key = obj,
+            UploadId = upload_id,
+            PartNumber = part_number,
+            Body = data
+        )['ETag']
+
+    def _check_unchanged():
+        st_after = os.stat(filepath)
+        if st_after.st_size != st.st_size or st_after.st_mtime_ns != st.st_mtime_ns:
+            raise RuntimeError(f'{filepath} changed during upload')
+
+    run_journaled_multipart_upload(s3, bucket_name, obj, parts, _send_part, {'Metadata': {"ChecksumSHA256": sha256}},
+                                   journal, journal_key, get_transfer_plan_id(st.st_size, st.st_mtime_ns, sha256, part_size),
+                                   cancel_event, _check_unchanged)
+
+    RemoteObjectExistenceCache.invalidate(bucket_name, obj)
+
+    return get_rmt_manifest_entry(access_key_id, secret_access_key, bucket_name, obj, sha256)
+
+
+def put_loc_object_to_rmt_delta(access_key_id, secret_access_key, filepath, bucket_name, obj, transfer_config=None, hash_cache=None, cancel_event=None, throttle=None,
+                                journal=None, journal_key=None):
+
+    # Uploads only the content-defined chunks the previous version of obj doesn't already have:
+    # unchanged runs are copied server-side with UploadPartCopy, the rest is read from disk.
+    # Falls back to a whole-file upload when there is no chunk list for the current version.
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+
+    def _check_cancelled():
+        if cancel_event is not None and cancel_event.is_set():
+            raise RuntimeError('Upload cancelled')
+
+    st = os.stat(filepath)
+    sha256, chunks = get_file_chunk_list(filepath, st, hash_cache)
+    _check_cancelled()
+
+    try:
+        head = s3.head_object(
+            Bucket = bucket_name,
+            Key = obj
+        )
+        previous = get_rmt_chunk_list(s3, bucket_name, obj, head)
+    except ClientError as e:
+        if e.response['Error']['Code'] not in ('404', 'NoSuchKey'):
+            raise e
+        head, previous = None, None
+
+    if previous and previous['sha256'] == sha256:
+        print(f'Delta upload {obj}: unchanged')
+        return {
+                    'size': head['ContentLength'],
+                    'sha256': sha256,
+                    'mtime': int(head['LastModified'].timestamp()),
+                    'etag': head['ETag']
+               }
+
+    parts = plan_delta_upload_parts(chunks, previous['chunks']) if previous else []
+
+    if not any(kind == 'copy' for kind, offset, length, previous_offset in parts) or len(parts) > constants.DELTA_MAX_PARTS:
+        if journal is not None:
+            manifest_entry = put_loc_object_to_rmt_resumable(access_key_id, secret_access_key, filepath, bucket_name, obj, sha256,
+                                                             journal, journal_key, throttle, cancel_event)
+        else:
+            put_response = put_loc_object_to_rmt(access_key_id, secret_access_key, filepath, bucket_name, obj, sha256, transfer_config, throttle)
+            manifest_entry = get_rmt_manifest_entry(access_key_id, secret_access_key, bucket_name, obj, sha256, put_response)
+            
+        put_rmt_chunk_list(s3, bucket_name, obj, sha256, chunks)
+        return manifest_entry
+
+    copy_source = {'Bucket': bucket_name, 'Key': obj}
+    if previous.get('version_id'):
+        copy_source['VersionId'] = previous['version_id']
+
+    def _send_part(upload_id, part_number, part):
+        kind, offset, length, previous_offset = part
+        
+        if kind == 'copy':
+            response = s3.upload_part_copy(
+                Bucket = bucket_name,
+                Key = obj,
+                UploadId = upload_id,
+                PartNumber = part_number,
+                CopySource = copy_source,
+                CopySourceRange = f'bytes={previous_offset}-{previous_offset + length - 1}',
+                # Without versioning the copy source is just the key; never splice in bytes of an overwrite.
+                CopySourceIfMatch = previous['etag']
+            )
+            return response['CopyPartResult']['ETag']
+
+        with open(filepath, 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+            
+        if throttle:
+            throttle(len(data))
+            
+        response = s3.upload_part(
+            Bucket = bucket_name,
+            Key = obj,
+            UploadId = upload_id,
+            PartNumber = part_number,
+            Body = data
+        )
+        return response['ETag']
+
+    def _check_unchanged():
+        # The parts were read from disk after chunking; if the file moved on, the sha256 is stale.
+        st_after = os.stat(filepath)
+        if st_after.st_size != st.st_size or st_after.st_mtime_ns != st.st_mtime_ns:
+            raise RuntimeError(f'{filepath} changed during upload')
+
+    plan_id = get_transfer_plan_id(st.st_size, st.st_mtime_ns, sha256, previous.get('version_id', ''), parts)
+    
+    run_journaled_multipart_upload(s3, bucket_name, obj, parts, _send_part, {'Metadata': {"ChecksumSHA256": sha256}},
+                                   journal, journal_key, plan_id, cancel_event, _check_unchanged)
+
+    RemoteObjectExistenceCache.invalidate(bucket_name, obj)
+    head = put_rmt_chunk_list(s3, bucket_name, obj, sha256, chunks)
+
+    uploaded = sum(length for kind, offset, length, previous_offset in parts if kind == 'upload')
+    print(f'Delta upload {obj}: {uploaded} bytes sent, {st.st_size - uploaded} bytes reused')
+
+    return {
+                'size': head['ContentLength'],
+                'sha256': sha256,
+                'mtime': int(head['LastModified'].timestamp()),
+                'etag': head['ETag']
+           }
+
+
+def get_rmt_object_to_loc_delta(access_key_id, secret_access_key, bucket_name, obj, filepath, hash_cache=None, cancel_event=None, throttle=None):
+
+    # Rebuilds filepath from the chunks it already has plus ranged GETs for the missing ones.
+    # Falls back to a whole-object download when there is no local copy or no chunk list.
+    if not os.path.isfile(filepath):
+        return get_rmt_object_to_loc_verified(access_key_id, secret_access_key, bucket_name, obj, filepath, cancel_event, throttle)
+
+    def _check_cancelled():
+        if cancel_event is not None and cancel_event.is_set():
+            raise RuntimeError('Download cancelled')
+
+    _check_cancelled()
+
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+
+    head = s3.head_object(
+        Bucket = bucket_name,
+        Key = obj
+    )
+    
+    chunk_list = get_rmt_chunk_list(s3, bucket_name, obj, head)
+    
+    if not chunk_list:
+        return get_rmt_object_to_loc_verified(access_key_id, secret_access_key, bucket_name, obj, filepath, cancel_event, throttle)
+
+    local_sha256, local_chunks = get_file_chunk_list(filepath, None, hash_cache)
+    
+    if local_sha256 == chunk_list['sha256']:
+        return {'bytes': 0, 'sha256': local_sha256, 'verified': True}
+
+    local_offsets = {sha256: offset for offset, length, sha256 in local_chunks}
+
+    # Missing chunks close to each other are fetched with one GET, split into DOWNLOAD_PART_SIZE ranges.
+    missing = []
+    for offset, length, sha256 in chunk_list['chunks']:
+        if sha256 in local_offsets:
+            continue
+        if missing and offset - missing[-1][1] <= constants.DELTA_RANGE_MERGE_GAP:
+            missing[-1][1] = offset + length
+        else:
+            missing.append([offset, offset + length])
+            
+    ranges = [(start, min(start + constants.DOWNLOAD_PART_SIZE, end))
+              for range_start, end in missing for start in range(range_start, end, constants.DOWNLOAD_PART_SIZE)]
+
+    get_args = {'Bucket': bucket_name, 'Key': obj}
+    if head.get('VersionId'):
+        get_args['VersionId'] = head['VersionId']
+
+    tmp_filepath = get_download_temp_filepath(filepath)
+    write_lock = threading.Lock()
+
+    try:
+        with open(filepath, 'rb') as src, open(tmp_filepath, 'wb') as dst:
+            dst.truncate(chunk_list['size'])
+            
+            for offset, length, sha256 in chunk_list['chunks']:
+                if sha256 in local_offsets:
+                    _check_cancelled()
+                    src.seek(local_offsets[sha256])
+                    dst.seek(offset)
+                    dst.write(src.read(length))
+
+            def _get_range(start, end):
+                _check_cancelled()
+                data = s3.get_object(Range = f'bytes={start}-{end - 1}', **get_args)['Body'].read()
+                if throttle:
+                    throttle(len(data))
+                with write_lock:
+                    dst.seek(start)
+                    dst.write(data)
+                return len(data)
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=constants.TRANSFER_MAX_CONCURRENCY) as executor:
+                downloaded = sum(executor.map(lambda byte_range: _get_range(*byte_range), ranges))
+
+        sha256 = create_sha256_hash_for_file(tmp_filepath)
+        
+        if sha256 != chunk_list['sha256']:
+            raise ValueError(f'Checksum mismatch for {obj}')
+            
+        os.replace(tmp_filepath, filepath)
+        
+    except BaseException:
+        try:
+            os.remove(tmp_filepath)
+        except OSError:
+            pass
+        raise
+
+    print(f'Delta download {obj}: {downloaded} bytes fetched, {chunk_list["size"] - downloaded} bytes reused')
+
+    return {'bytes': downloaded, 'sha256': sha256, 'verified': True}
+
+
+def upload_files_to_rmt(access_key_id, secret_access_key, bucket_name, file_pairs, on_file_done=None, cancel_event=None, hash_cache=None, priority=None, journal=None,
+                        progress=None, activity_entry=None):
+
+    # file_pairs: [(local filepath, object key), ...]. Returns {object key: result}.
+    # Jobs go through the TransferScheduler; uploads are bulk unless told otherwise.
+    # activity_entry is written to the project's activity log once every file is on REMOTE;
+    # with a journal it is kept until then, so a resumed batch can still log it.
+    transfer_config = get_transfer_config()
+    results = dict()
+    scheduler = TransferScheduler.get()
+    
+    if priority is None:
+        priority = TransferScheduler.PRIORITY_BULK
+        
+    journal_keys = {obj: TransferJournal.get_key('upload', bucket_name, obj) for filepath, obj in file_pairs}
+    
+    batch_key = None
+    
+    if journal is not None:
+        queued = {'direction': 'upload', 'bucket': bucket_name}
+        batch_records = []
+        if activity_entry is not None:
+            batch_key = TransferJournal.get_key('batch', bucket_name, uuid.uuid4().hex)
+            batch_records.append(('batch', batch_key, {'bucket': bucket_name, 'project': file_pairs[0][1].split('/')[0], 'activity': activity_entry}))
+            queued['batch'] = batch_key
+        journal.record_many(batch_records + [('queued', journal_keys[obj], dict(queued, obj=obj, filepath=str(filepath)))
+                                             for filepath, obj in file_pairs])
+
+    def _upload_one(filepath, obj):
+        if cancel_event is not None and cancel_event.is_set():
+            raise RuntimeError('Upload cancelled')
+
+        st = os.stat(filepath)
+        throttle = scheduler.get_throttle(obj.split('/')[0], priority)
+        if progress is not None:
+            throttle = progress.get_callback(obj, throttle)
+        
+        if constants.CAS_ENABLED:
+            return put_loc_object_to_rmt_blob(access_key_id, secret_access_key, filepath, bucket_name, obj, transfer_config, hash_cache, throttle)
+        
+        if should_compress_file(filepath, obj, st):
+            sha256 = hash_cache.get_sha256(filepath, st) if hash_cache is not None else None
+            return put_loc_object_to_rmt_compressed(access_key_id, secret_access_key, filepath, bucket_name, obj, sha256, transfer_config, throttle)
+        
+        if constants.DELTA_SYNC_ENABLED and st.st_size >= constants.DELTA_SYNC_MIN_FILE_SIZE:
+            return put_loc_object_to_rmt_delta(access_key_id, secret_access_key, filepath, bucket_name, obj,
+                                               transfer_config, hash_cache, cancel_event, throttle, journal, journal_keys[obj])
+        
+        sha256 = hash_cache.lookup(filepath, st) if hash_cache is not None else None
+        
+        # Big uploads need their sha256 up front so an interrupted one can be resumed.
+        if journal is not None and st.st_size >= constants.TRANSFER_RESUMABLE_MIN_SIZE:
+            if not sha256:
+                sha256 = hash_cache.get_sha256(filepath, st) if hash_cache is not None else create_sha256_hash_for_file(filepath)
+            return put_loc_object_to_rmt_resumable(access_key_id, secret_access_key, filepath, bucket_name, obj, sha256,
+                                                   journal, journal_keys[obj], throttle, cancel_event)
+
+        # Without a cached checksum, hash while uploading rather than reading the file twice.
+        if not sha256 and constants.UPLOAD_HASH_WHILE_STREAMING:
+            hash_started_ns = time.time_ns()
+            manifest_entry = put_loc_object_to_rmt_streaming(access_key_id, secret_access_key, filepath, bucket_name, obj, transfer_config, throttle)
+            if hash_cache is not None:
+                hash_cache.store(filepath, st, manifest_entry['sha256'], hash_started_ns)
+            return manifest_entry
+
+        if not sha256:
+            sha256 = hash_cache.get_sha256(filepath, st) if hash_cache is not None else create_sha256_hash_for_file(filepath)
+            
+        put_response = put_loc_object_to_rmt(access_key_id, secret_access_key, filepath, bucket_name, obj, sha256, transfer_config, throttle)
+
+        return get_rmt_manifest_entry(access_key_id, secret_access_key, bucket_name, obj, sha256, put_response)
+
+    def _upload_pack(pack):
+        outcomes = []
+        for filepath, obj in pack:
+            try:
+                outcomes.append((obj, _upload_one(filepath, obj), None))
+            except (BotoCoreError, ClientError, S3UploadFailedError, OSError, RuntimeError, ValueError, zlib.error) as e:
+                outcomes.append((obj, None, e))
+        return outcomes
+
+    sized_pairs = []
+    for filepath, obj in file_pairs:
+        try:
+            sized_pairs.append((os.path.getsize(filepath), (filepath, obj)))
+        except OSError:
+            sized_pairs.append((0, (filepath, obj)))
+            
+    if progress is not None:
+        progress.add_files({obj: size for size, (filepath, obj) in sized_pairs})
+            
+    futures = [scheduler.submit(_upload_pack, pack, priority=priority, size=size) for size, pack in plan_transfer_jobs(sized_pairs)]
+
+    def _finish_file(obj, error):
+        if progress is not None:
+            progress.finish_file(obj, results[obj]['ok'])
+            
+        if journal is not None:
+            record_transfer_outcome(journal, journal_keys[obj], results[obj]['ok'], cancel_event, error)
+
+        if on_file_done:
+            on_file_done(obj, results[obj]['ok'], results[obj]['error'])
+
+    # A blob reference exists only in the manifest, so those files aren't done until it is written.
+    blob_uploads = []
+
+    for future in concurrent.futures.as_completed(futures):
+        for obj, manifest_entry, error in future.result():
+            if error is None:
+                results[obj] = {'ok': True, 'sha256': manifest_entry['sha256'], 'manifest_entry': manifest_entry, 'error': ''}
+            else:
+                results[obj] = {'ok': False, 'sha256': '', 'error': str(error)}
+                
+            if error is None and manifest_entry.get('blob'):
+                blob_uploads.append(obj)
+            else:
+                _finish_file(obj, error)
+
+    if hash_cache is not None:
+        hash_cache.save()
+
+    # One manifest write per project per batch.
+    manifest_updates = dict()
+    for obj, result in results.items():
+        if result['ok']:
+            manifest_updates.setdefault(obj.split('/')[0], dict())[obj] = result['manifest_entry']
+
+    for project, entries in manifest_updates.items():
+        try:
+            manifest = update_rmt_project_manifest(access_key_id, secret_access_key, bucket_name, project, entries)
+            manifest_error = '' if manifest is not None else 'manifest update conflicted'
+        except (BotoCoreError, ClientError) as e:
+            print(f"Unexpected error:  {e}")
+            manifest_error = str(e)
+            
+        # Plain objects are found again by the next listing; blob references would be lost, so
+        # those files fail and stay journaled, and the batch isn't logged.
+        if manifest_error:
+            for obj in entries:
+                if obj in blob_uploads:
+                    results[obj] = {'ok': False, 'sha256': '', 'error': f'Blob uploaded but not recorded: {manifest_error}'}
+
+    for obj in blob_uploads:
+        _finish_file(obj, None)
+
+    # The activity log only records batches that made it to REMOTE in full.
+    if activity_entry is not None and file_pairs and all(result['ok'] for result in results.values()):
+        put_activity_log_entry(access_key_id, secret_access_key, bucket_name, file_pairs[0][1].split('/')[0], activity_entry)
+        if batch_key is not None:
+            journal.record('batch_done', batch_key)
+
+    return results
+
+
+def is_retryable_transfer_error(error):
+
+    # False for failures another attempt can't fix: missing or forbidden objects, bad
+    # credentials, local files that are gone or unreadable.
+    if isinstance(error, S3UploadFailedError) and isinstance(error.__context__, ClientError):
+        error = error.__context__
+        
+    if isinstance(error, ClientError):
+        return error.response['Error']['Code'] not in constants.TRANSFER_PERMANENT_ERRORS
+        
+    return not isinstance(error, (FileNotFoundError, PermissionError, IsADirectoryError, NotADirectoryError))
+
+
+def record_transfer_outcome(journal, journal_key, ok, cancel_event=None, error=None):
+
+    # Failed files stay in the journal to be resumed; cancelled ones and ones that can never
+    # succeed are dropped with their leftovers.
+    if ok:
+        journal.record('done', journal_key, durable=False)
+        
+    elif (cancel_event is not None and cancel_event.is_set()) or (error is not None and not is_retryable_transfer_error(error)):
+        abandon_journaled_transfer(journal, journal_key)
+
+    return None
+
+
+def abandon_journaled_transfer(journal, journal_key, s3=None):
+
+    # Drops a transfer from the journal with its partial download and, given a client, its multipart upload.
+    entry = journal.get(journal_key) or dict()
+    
+    if s3 is not None and entry.get('upload_id'):
+        abort_multipart_upload_quietly(s3, entry['bucket'], entry['obj'], entry['upload_id'])
+        
+    if entry.get('direction') == 'download':
+        try:
+            os.remove(get_download_temp_filepath(entry['filepath']))
+        except OSError:
+            pass
+            
+    journal.record('abandoned', journal_key, durable=False)
+
+    return None
+
+
+def abort_orphaned_multipart_uploads(access_key_id, secret_access_key, bucket_name, journal):
+
+    # Multipart uploads nobody will complete: started by this client (the journal keeps every
+    # upload ID it created) and no longer held by a pending transfer. Other clients' uploads
+    # are never touched. Returns how many were aborted.
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+
+    active_upload_ids = set(entry.get('upload_id') for key, entry in journal.pending(bucket_name))
+    orphaned = {upload_id: obj for upload_id, obj in journal.created_uploads(bucket_name).items() if upload_id not in active_upload_ids}
+    aborted = 0
+
+    if not orphaned:
+        return aborted
+
+    for page in s3.get_paginator('list_multipart_uploads').paginate(Bucket = bucket_name):
+        for upload in page.get('Uploads', []):
+            if upload['UploadId'] in orphaned:
+                abort_multipart_upload_quietly(s3, bucket_name, upload['Key'], upload['UploadId'])
+                aborted += 1
+
+    # Whatever wasn't listed was completed or aborted already.
+    journal.record_many([('mpu_forgotten', '', {'upload_id': upload_id}) for upload_id in orphaned], durable=False)
+
+    return aborted
+
+
+def resume_interrupted_transfers(access_key_id, secret_access_key, bucket_name, projects_directory, on_file_done=None, cancel_event=None, progress=None):
+
+    # Re-runs every upload and download the journal says was left unfinished, continuing
+    # multipart uploads and partial downloads from their last completed part, logs the upload
+    # batches that are now on REMOTE in full, then aborts this client's orphaned multipart
+    # uploads. Returns the combined {object key: result}.
+    journal = TransferJournal.for_directory(projects_directory)
+    hash_cache = LocalHashCache.for_directory(projects_directory)
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+    
+    # Batches started after this point belong to uploads running now, which log themselves.
+    batches = journal.pending_batches(bucket_name)
+    upload_pairs, download_pairs, version_ids = [], [], dict()
+
+    for key, entry in journal.pending(bucket_name):
+        if entry['attempts'] >= constants.TRANSFER_RESUME_MAX_ATTEMPTS or (entry['direction'] == 'upload' and not os.path.isfile(entry['filepath'])):
+            abandon_journaled_transfer(journal, key, s3)
+        elif entry['direction'] == 'upload':
+            upload_pairs.append((entry['filepath'], entry['obj']))
+        else:
+            download_pairs.append((entry['obj'], entry['filepath']))
+            if entry.get('version_id'):
+                version_ids[entry['obj']] = entry['version_id']
+
+    results = dict()
+
+    if upload_pairs:
+        print(f'Resuming {len(upload_pairs)} interrupted uploads')
+        results.update(upload_files_to_rmt(access_key_id, secret_access_key, bucket_name, upload_pairs,
+                                           on_file_done, cancel_event, hash_cache, journal=journal, progress=progress))
+        
+    if download_pairs:
+        print(f'Resuming {len(download_pairs)} interrupted downloads')
+        results.update(download_files_to_loc(access_key_id, secret_access_key, bucket_name, download_pairs,
+                                             on_file_done, cancel_event, hash_cache, journal=journal, progress=progress, version_ids=version_ids))
+
+    unfinished_batches = set(entry.get('batch') for key, entry in journal.pending(bucket_name))
+    
+    for batch_key, batch in batches:
+        if batch_key in unfinished_batches:
+            continue
+        if not batch.get('failed'):
+            put_activity_log_entry(access_key_id, secret_access_key, bucket_name, batch['project'], batch['activity'])
+            print(f"Logged resumed upload batch for {batch['project']}")
+        journal.record('batch_done', batch_key)
+
+    try:
+        aborted = abort_orphaned_multipart_uploads(access_key_id, secret_access_key, bucket_name, journal)
+        if aborted:
+            print(f'Aborted {aborted} orphaned multipart uploads')
+    except ClientError as e:
+        print(f"Unexpected error:  {e}")
+
+    return results
+
+
+def discard_interrupted_transfers(access_key_id, secret_access_key, bucket_name, projects_directory):
+
+    # 'Don't resume': drops every unfinished transfer and upload batch from the journal, with
+    # their partial downloads and multipart uploads. Returns how many transfers were dropped.
+    journal = TransferJournal.for_directory(projects_directory)
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+    pending = journal.pending(bucket_name)
+
+    for key, entry in pending:
+        abandon_journaled_transfer(journal, key, s3)
+
+    journal.record_many([('batch_done', batch_key, {}) for batch_key, batch in journal.pending_batches(bucket_name)])
+
+    return len(pending)
+
+
+def iter_s3_bucket_contents(access_key_id, secret_access_key, bucket_name, prefix='', max_items=None, page_size=1000):
+
+    # Pages through ListObjectsV2 lazily; stop iterating to stop paging.
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+    
+    pagination_config = {'PageSize': page_size}
+    if max_items:
+        pagination_config['MaxItems'] = max_items
+
+    paginator = s3.get_paginator('list_objects_v2')
+
+    for page in paginator.paginate(Bucket = bucket_name, Prefix = prefix, PaginationConfig = pagination_config):
+        for obj in page.get('Contents', []):
+            yield obj
+
+
+def iter_rmt_project_object_versions(access_key_id, secret_access_key, bucket_name, project, latest_only=False, include_delete_markers=False, max_items=None, page_size=1000):
+
+    # Pages through ListObjectVersions lazily; stop iterating to stop paging.
+    # The trailing '/' keeps project 'abc' from also matching 'abc2/...'.
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+    
+    pagination_config = {'PageSize': page_size}
+    if max_items:
+        pagination_config['MaxItems'] = max_items
+
+    paginator = s3.get_paginator('list_object_versions')
+
+    for page in paginator.paginate(Bucket = bucket_name, Prefix = project + '/', PaginationConfig = pagination_config):
+        for obj_version in page.get('Versions', []):
+            if latest_only and not obj_version['IsLatest']:
+                continue
+            yield obj_version
+        
+        if include_delete_markers:
+            for delete_marker in page.get('DeleteMarkers', []):
+                if latest_only and not delete_marker['IsLatest']:
+                    continue
+                yield delete_marker
+
+
+def list_s3_bucket_contents(access_key_id, secret_access_key, bucket_name):
+
+    bucket_contents = {'Contents': []}
+
+    try:
+        bucket_contents['Contents'] = list(iter_s3_bucket_contents(access_key_id, secret_access_key, bucket_name))
+        
+    except ClientError as e:
+        print(f"Unexpected error:  {e}")
+
+    return bucket_contents
+
+
+def list_s3_bucket_contents_with_prefix(access_key_id, secret_access_key, bucket_name, prefix):
+
+    bucket_contents = {'Contents': []}
+
+    try:
+        bucket_contents['Contents'] = list(iter_s3_bucket_contents(access_key_id, secret_access_key, bucket_name, prefix))
+        
+    except ClientError as e:
+        print(f"Unexpected error:  {e}")
+
+    return bucket_contents
+
+
+def delete_rmt_objects(access_key_id, secret_access_key, bucket_name, objects, max_workers=None, on_progress=None, cancel_event=None):
+
+    # objects: any iterable (a listing generator is fine) of {'Key': ..., 'VersionId': ...}
+    # dicts, VersionId optional. It is consumed lazily into DeleteObjects batches of
+    # DELETE_BATCH_SIZE with at most max_workers batches in flight, so memory stays flat
+    # however many versions there are. Keys that fail with a transient error are retried
+    # with backoff; on_progress(deleted, failed) is called after every batch.
+    # Returns {'deleted': int, 'errors': [{'Key', 'VersionId', 'Code', 'Message'}, ...]}.
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+    max_workers = max_workers or constants.DELETE_MAX_WORKERS
+
+    def _delete_batch(batch):
+        # Only the keys still pending are resent, so permanent failures are collected as they
+        # come in and deletions are counted per attempt; whatever is left pending at the end
+        # is reported with its last error.
+        deleted = 0
+        failed = []
+        retry_errors = []
+        
+        for attempt in range(constants.DELETE_MAX_ATTEMPTS):
+            if attempt:
+                time.sleep(constants.DELETE_RETRY_BASE_DELAY_SEC * 2 ** (attempt - 1))
+                
+            try:
+                response = s3.delete_objects(
+                    Bucket = bucket_name,
+                    Delete = {"Objects": batch, "Quiet": True}
+                )
+            except ClientError as e:
+                retry_errors = [{'Key': obj['Key'], 'VersionId': obj.get('VersionId', ''), 'Code': e.response['Error']['Code'],
+                                 'Message': str(e)} for obj in batch]
+                if e.response['Error']['Code'] not in constants.DELETE_RETRYABLE_ERRORS:
+                    break
+                continue
+
+            errors = response.get('Errors', [])
+            deleted += len(batch) - len(errors)
+            retry_errors = [error for error in errors if error['Code'] in constants.DELETE_RETRYABLE_ERRORS]
+            failed.extend(error for error in errors if error['Code'] not in constants.DELETE_RETRYABLE_ERRORS)
+            if not retry_errors:
+                break
+                
+            retry_keys = set((error['Key'], error.get('VersionId', '')) for error in retry_errors)
+            batch = [obj for obj in batch if (obj['Key'], obj.get('VersionId', '')) in retry_keys]
+
+        return deleted, failed + retry_errors
+
+    def _batches():
+        batch = []
+        for obj in objects:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            batch.append({'Key': obj['Key'], 'VersionId': obj['VersionId']} if obj.get('VersionId') else {'Key': obj['Key']})
+            if len(batch) >= constants.DELETE_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    totals = {'deleted': 0, 'errors': []}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        
+        for batch in _batches():
+            pending.add(executor.submit(_delete_batch, batch))
+            
+            # Listing runs ahead of deletion by at most two batches per worker.
+            if len(pending) >= max_workers * 2:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    deleted, errors = future.result()
+                    totals['deleted'] += deleted
+                    totals['errors'].extend(errors)
+                if on_progress:
+                    on_progress(totals['deleted'], len(totals['errors']))
+
+        for future in concurrent.futures.as_completed(pending):
+            deleted, errors = future.result()
+            totals['deleted'] += deleted
+            totals['errors'].extend(errors)
+            if on_progress:
+                on_progress(totals['deleted'], len(totals['errors']))
+
+    for error in totals['errors'][:10]:
+        print(f"Unexpected error:  {error['Code']} deleting {error['Key']} ({error.get('VersionId', '')}): {error['Message']}")
+
+    return totals
+
+
+def delete_rmt_project(access_key_id, secret_access_key, bucket_name, project, max_workers=None, on_progress=None, cancel_event=None):
+
+    # Every version and delete marker under '<project>/', BigFoot bookkeeping included. Shared
+    # blobs (CAS_ENABLED) are left to collect_rmt_blob_garbage, other projects may reference them.
+    object_versions = iter_rmt_project_object_versions(access_key_id, secret_access_key, bucket_name, project, include_delete_markers=True)
+
+    return delete_rmt_objects(access_key_id, secret_access_key, bucket_name, object_versions, max_workers, on_progress, cancel_event)
+
+
+def collect_rmt_blob_garbage(access_key_id, secret_access_key, bucket_name, min_age_sec=None):
+
+    # Mark and sweep over the shared blob store, for the administrator (root credentials, it
+    # lists every project; see bigfoot_collect_blob_garbage.py). The manifests of every project
+    # mark the blobs still referenced, and every version of an unreferenced blob that was neither
+    # stored nor reused (CAS_BLOB_REUSED_TAG) within min_age_sec is deleted. The grace period
+    # covers uploads that have a blob but haven't written its reference yet. One collection
+    # runs at a time, under a lease object. Nothing is deleted if any manifest can't be read.
+    # Returns delete_rmt_objects' totals, or None if the collection was skipped.
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+    
+    if not acquire_rmt_blob_gc_lease(s3, bucket_name):
+        print(f"Unexpected error:  another blob collection holds {constants.CAS_BLOB_GC_LEASE_KEY}, skipped")
+        return None
+
+    try:
+        return sweep_rmt_blobs(s3, access_key_id, secret_access_key, bucket_name, min_age_sec)
+    finally:
+        s3.delete_object(Bucket = bucket_name, Key = constants.CAS_BLOB_GC_LEASE_KEY)
+
+
+def acquire_rmt_blob_gc_lease(s3, bucket_name):
+
+    # Create-only PUT of the lease object; a lease older than CAS_BLOB_GC_LEASE_SEC belongs to a
+    # collection that died and is taken over. Returns True if this process holds the lease.
+    for attempt in range(2):
+        try:
+            s3.put_object(Bucket = bucket_name, Key = constants.CAS_BLOB_GC_LEASE_KEY, Body = platform.node().encode('utf-8'), IfNoneMatch = '*')
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] not in constants.MANIFEST_CONFLICT_ERRORS:
+                raise e
+                
+        lease = s3.head_object(Bucket = bucket_name, Key = constants.CAS_BLOB_GC_LEASE_KEY)
+        if time.time() - lease['LastModified'].timestamp() < constants.CAS_BLOB_GC_LEASE_SEC:
+            return False
+        s3.delete_object(Bucket = bucket_name, Key = constants.CAS_BLOB_GC_LEASE_KEY)
+
+    return False
+
+
+def sweep_rmt_blobs(s3, access_key_id, secret_access_key, bucket_name, min_age_sec=None):
+
+    referenced = set()
+
+    for page in s3.get_paginator('list_objects_v2').paginate(Bucket = bucket_name, Delimiter = '/'):
+        for common_prefix in page.get('CommonPrefixes', []):
+            project = common_prefix['Prefix'].rstrip('/')
+            if project == constants.CAS_BLOBS_PREFIX:
+                continue
+                
+            manifest, manifest_etag = get_rmt_project_manifest(access_key_id, secret_access_key, bucket_name, project)
+            
+            # A stored manifest always has a revision; revision 0 with an ETag means it was unreadable.
+            if manifest_etag and not manifest['revision']:
+                print(f"Unexpected error:  unreadable manifest for {project}, blob collection skipped")
+                return None
+                
+            referenced.update(entry['blob'] for entry in manifest['entries'].values() if entry.get('blob'))
+
+    cutoff = time.time() - (min_age_sec if min_age_sec is not None else constants.CAS_BLOB_GC_MIN_AGE_SEC)
+    blob_versions = list(iter_rmt_project_object_versions(access_key_id, secret_access_key, bucket_name, constants.CAS_BLOBS_PREFIX, include_delete_markers=True))
+    
+    newest = dict()
+    for blob_version in blob_versions:
+        newest[blob_version['Key']] = max(newest.get(blob_version['Key'], 0), blob_version['LastModified'].timestamp())
+
+    # Checked last, as close to the delete as possible: a reuse tag written after this is the
+    # remaining (short) window in which an upload can lose its blob.
+    reused = set()
+    for blob_key in set(newest) - referenced:
+        if newest[blob_key] >= cutoff:
+            continue
+        try:
+            tags = s3.get_object_tagging(Bucket = bucket_name, Key = blob_key)['TagSet']
+        except ClientError as e:
+            # The newest version is a delete marker.
+            if e.response['Error']['Code'] not in ('404', 'NoSuchKey', 'MethodNotAllowed'):
+                raise e
+            continue
+        if any(tag['Key'] == constants.CAS_BLOB_REUSED_TAG and int(tag['Value']) >= cutoff for tag in tags):
+            reused.add(blob_key)
+
+    garbage = [{'Key': blob_version['Key'], 'VersionId': blob_version['VersionId']} for blob_version in blob_versions
+               if blob_version['Key'] not in referenced and blob_version['Key'] not in reused and newest[blob_version['Key']] < cutoff]
+
+    for blob_version in garbage:
+        RemoteObjectExistenceCache.mark_missing(bucket_name, blob_version['Key'])
+
+    return delete_rmt_objects(access_key_id, secret_access_key, bucket_name, garbage)
+
+
+def delete_user_project(access_key_id, secret_access_key, bucket_name, project, projects_directory, owner_email, on_progress=None):
+
+    # Everything 'Delete Project' removes: REMOTE versions, activity log, LOCAL folder, cached
+    # hashes and activity history, and the owner's project entry. REMOTE goes first, and the rest
+    # only once every version is gone, so a partial delete stays visible and can be retried.
+    # Returns delete_rmt_objects' totals; if it has errors, nothing else was removed.
+    # Blocking; the GUI runs it on a BackgroundCallWorker.
+    delete_result = delete_rmt_project(access_key_id, secret_access_key, bucket_name, project, on_progress=on_progress)
+    
+    if delete_result['errors']:
+        return delete_result
+    
+    delete_activity_log(bucket_name, project)
+    
+    shutil.rmtree(projects_directory + '/' + project, ignore_errors=True)
+    
+    hash_cache = LocalHashCache.for_directory(projects_directory)
+    hash_cache.prune(project, [])
+    hash_cache.save()
+    
+    ActivityHistoryCache.discard(projects_directory, bucket_name, project)
+    
+    remove_user_project_from_DynamoDB_table(constants.AWS_DYNAMODB_TABLE, owner_email, project)
+    
+    return delete_result
+
+
+def delete_s3_bucket_content_list(access_key_id, secret_access_key, bucket_name, content_list=None):
+
+    try:
+        delete_rmt_objects(access_key_id, secret_access_key, bucket_name, ({'Key': key} for key in content_list or []))
+        
+    except ClientError as e:
+        print(f"Unexpected error:  {e}")
+
+    return None
+
+
+class RemoteObjectExistenceCache:
+    """Remembers (bucket, key) pairs that were recently found missing, so repeated checks skip the HEAD."""
+
+    missing = dict()
+    lock = threading.Lock()
+
+    @classmethod
+    def is_known_missing(cls, bucket_name, object_name):
+        with cls.lock:
+            expires_at = cls.missing.get((bucket_name, str(object_name)))
+            if expires_at is None:
+                return False
+            if expires_at < time.monotonic():
+                cls.missing.pop((bucket_name, str(object_name)), None)
+                return False
+            return True
+
+    @classmethod
+    def mark_missing(cls, bucket_name, object_name):
+        with cls.lock:
+            cls.missing[(bucket_name, str(object_name))] = time.monotonic() + constants.S3_NEGATIVE_EXISTENCE_TTL_SEC
+        return None
+
+    @classmethod
+    def invalidate(cls, bucket_name, object_name):
+        with cls.lock:
+            cls.missing.pop((bucket_name, str(object_name)), None)
+        return None
+
+
+def does_object_exist_in_s3_bucket(access_key_id, secret_access_key, bucket_name, object_name):
+
+    if RemoteObjectExistenceCache.is_known_missing(bucket_name, object_name):
+        return False
+
+    try:
+        s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+
+        s3.head_object(
+            Bucket = bucket_name,
+            Key = str(object_name)
+        )
+
+    except ClientError as err:
+        if err.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+            RemoteObjectExistenceCache.mark_missing(bucket_name, object_name)
+            return False
+        # Denied or throttled: can't tell, so report it absent without remembering that.
+        print(f"Unexpected error:  {err}")
+        return False
+    
+    return True
+
+
+def get_rmt_project_object_versions(access_key_id, secret_access_key, bucket_name, project):
+
+    obj_versions = []
+
+    try:
+        obj_versions = list(iter_rmt_project_object_versions(access_key_id, secret_access_key, bucket_name, project))
+        
+    except ClientError as e:
+        print(f"Unexpected error:  {e}")
+
+    return obj_versions
+
+
+def get_last_modified_time_for_remote_project(access_key_id, secret_access_key, bucket_name, project):
+
+    # Only the project's own files count: the trailing '/' keeps 'foo' from matching 'foobar/...',
+    # and manifest, chunk-list and other bookkeeping writes don't change "Last updated". Blob
+    # references (CAS_ENABLED) only exist in the manifest, so their times come from there.
+    try:
+        latest_modified = None
+        
+        project_files = iter_s3_bucket_contents(access_key_id, secret_access_key, bucket_name, project + '/')
+        if constants.CAS_ENABLED:
+            project_files = itertools.chain(project_files, iter_rmt_project_blob_references(access_key_id, secret_access_key, bucket_name, project))
+        
+        for obj in project_files:
+            if is_bigfoot_internal_key(project, obj['Key']):
+                continue
+            if latest_modified is None or int(obj['LastModified'].timestamp()) > latest_modified:
+                latest_modified = int(obj['LastModified'].timestamp())
+
+        if latest_modified is not None:
+            return str(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(latest_modified)))
       
         else:
             return 'NO DATA'
@@ -365,7 +3661,20 @@ def get_last_modified_time_for_remote_project(access_key_id, secret_access_key,
 
 def get_last_modified_time_for_local_project(local_project_path):
 
-    latest_modified = int(max(os.stat(root).st_mtime for root,_,_ in os.walk(local_project_path)))
+    # Folders the ignore files exclude (build output, caches) are pruned like iter_local_files
+    # prunes them, so churn inside them doesn't count as a change to the project.
+    projects_directory, project = os.path.split(local_project_path)
+    ignore_rules = IgnoreRules.for_project(projects_directory, project)
+    latest_modified = 0
+
+    for root, dirnames, _ in os.walk(local_project_path):
+        latest_modified = max(latest_modified, os.stat(root).st_mtime)
+        if ignore_rules:
+            root_rel = os.path.relpath(root, local_project_path).replace(os.sep, '/')
+            root_rel = '' if root_rel == '.' else root_rel + '/'
+            dirnames[:] = [dirname for dirname in dirnames if not ignore_rules.matches(root_rel + dirname, is_dir=True)]
+
+    latest_modified = int(latest_modified)
 
     return str(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(latest_modified)))
 
@@ -373,15 +3682,14 @@ def get_last_modified_time_for_local_project(local_project_path):
 def get_remote_object_metadata(access_key_id, secret_access_key, bucket_name, object_name):
 
     try:
-        s3 = boto3.client('s3', aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key)
+        s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
     
         response = s3.head_object(
             Bucket = bucket_name,
             Key = object_name
         )
         
-        return response['ResponseMetadata']['HTTPHeaders']['x-amz-meta-checksumsha256']
+        return get_rmt_object_sha256(s3, bucket_name, object_name, response)
 
     except ClientError as err:
         # logger.error(
@@ -390,43 +3698,490 @@ def get_remote_object_metadata(access_key_id, secret_access_key, bucket_name, ob
         raise err
 
 
-def run_fast_scandir(folder):
+def get_rmt_project_manifest_key(project):
 
-    subfolders, files, file_objects = [], [], []
+    return project + '/' + constants.MANIFEST_DIR + '/' + constants.MANIFEST_NAME
 
-    for f in os.scandir(folder):
-        if f.name[0] == '.':
-            pass
-        elif f.is_dir():
-            subfolders.append(f.path)
-        elif f.is_file():
-            # print(f.path, f.stat().st_size, time.ctime(os.path.getmtime(f.path)))
-            files.append(f.path)
-            file_objects.append(f)
+
+def is_bigfoot_internal_key(project, object_name):
+
+    # Manifests and other BigFoot bookkeeping live under '<project>/.bigfoot/'.
+    return object_name.startswith(project + '/' + constants.MANIFEST_DIR + '/')
+
+
+def get_rmt_manifest_entry(access_key_id, secret_access_key, bucket_name, object_name, sha256=None, put_response=None):
+
+    # put_response: a PutObject response with the size added (what put_loc_object_to_rmt returns
+    # for a single PUT), or a HeadObject response. Either is enough when the sha256 is known;
+    # multipart uploads return None and need a HEAD.
+    if put_response and sha256:
+        if 'LastModified' in put_response:
+            mtime = int(put_response['LastModified'].timestamp())
         else:
-            pass
+            server_date = put_response.get('ResponseMetadata', {}).get('HTTPHeaders', {}).get('date')
+            mtime = int(email.utils.parsedate_to_datetime(server_date).timestamp()) if server_date else int(time.time())
+        return {
+                    'size': put_response['ContentLength'],
+                    'sha256': sha256,
+                    'mtime': mtime,
+                    'etag': put_response['ETag']
+               }
+
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+
+    response = s3.head_object(
+        Bucket = bucket_name,
+        Key = object_name
+    )
+
+    if sha256 is None:
+        sha256 = get_rmt_object_sha256(s3, bucket_name, object_name, response)
+
+    return {
+                'size': response['ContentLength'],
+                'sha256': sha256,
+                'mtime': int(response['LastModified'].timestamp()),
+                'etag': response['ETag']
+           }
+
+
+def get_rmt_project_manifest(access_key_id, secret_access_key, bucket_name, project):
+
+    manifest = {
+                    'format': constants.MANIFEST_FORMAT_VERSION,
+                    'project': project,
+                    'revision': 0,
+                    'updated_at': '',
+                    'entries': dict()
+               }
+    manifest_etag = None
+
+    try:
+        s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+
+        response = s3.get_object(
+            Bucket = bucket_name,
+            Key = get_rmt_project_manifest_key(project)
+        )
 
-    for subfolder in list(subfolders):
-        sf, f, fo = run_fast_scandir(subfolder)
-        subfolders.extend(sf)
-        files.extend(f)
-        file_objects.extend(fo)
+        # Kept even if the body turns out unreadable, so the next conditional write can replace it.
+        manifest_etag = response['ETag']
+        stored_manifest = json.loads(gzip.decompress(response['Body'].read()))
         
-    return subfolders, files, file_objects
+        if stored_manifest.get('format') == constants.MANIFEST_FORMAT_VERSION:
+            manifest = stored_manifest
+
+    except ClientError as err:
+        if err.response['Error']['Code'] not in ('404', 'NoSuchKey'):
+            raise err
+            
+    except (OSError, ValueError) as e:
+        # Corrupt manifest: start from an empty one and let the next rebuild replace it.
+        print(f"Unexpected error:  {e}")
 
+    return manifest, manifest_etag
 
-def get_local_project_info(user_folder, project):
 
-    local_project_files = []
+class RemoteManifestLocks:
+
+    locks = dict()
+    lock = threading.Lock()
+
+    @classmethod
+    def get(cls, bucket_name, project):
+        with cls.lock:
+            return cls.locks.setdefault((bucket_name, project), threading.Lock())
+
+
+def update_rmt_project_manifest(access_key_id, secret_access_key, bucket_name, project, entries=None, removed=()):
+
+    # Read-merge-write as a compare-and-swap: the PUT only succeeds if the manifest is still the
+    # one we read (IfMatch), or still absent (IfNoneMatch), so concurrent updates from other
+    # workstations are merged, never overwritten. Returns None if every attempt lost the race;
+    # build_remote_project_index picks the missed entries up again on the next compare.
+    # The lock only saves this process from racing itself.
+    s3 = AWSClientRegistry.get_client('s3', access_key_id, secret_access_key)
+
+    with RemoteManifestLocks.get(bucket_name, project):
+        for attempt in range(constants.MANIFEST_UPDATE_ATTEMPTS):
+            manifest, manifest_etag = get_rmt_project_manifest(access_key_id, secret_access_key, bucket_name, project)
+
+            manifest['entries'].update(entries or {})
+            for object_name in removed:
+                manifest['entries'].pop(object_name, None)
+                
+            manifest['revision'] += 1
+            manifest['updated_at'] = datetime.now(timezone.utc).isoformat()
+
+            condition = {'IfMatch': manifest_etag} if manifest_etag else {'IfNoneMatch': '*'}
+
+            try:
+                s3.put_object(
+                    Bucket = bucket_name,
+                    Key = get_rmt_project_manifest_key(project),
+                    Body = gzip.compress(json.dumps(manifest, separators=(',', ':')).encode('utf-8')),
+                    ContentType = 'application/gzip',
+                    **condition
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] not in constants.MANIFEST_CONFLICT_ERRORS:
+                    raise e
+                continue
+            
+            return manifest
 
-    abs_project_path = user_folder + '/' + project
-    _, _, project_file_objects = run_fast_scandir(abs_project_path)
+    print(f"Unexpected error:  manifest update for {project} conflicted {constants.MANIFEST_UPDATE_ATTEMPTS} times, not written")
+
+    return None
+
+
+def build_remote_project_index(access_key_id, secret_access_key, bucket_name, project, rebuild_in_background=True):
+
+    # One manifest GET plus the (paginated) listing; only objects whose ETag/size
+    # disagree with the manifest fall back to a HEAD each.
+    manifest, _ = get_rmt_project_manifest(access_key_id, secret_access_key, bucket_name, project)
+    manifest_entries = manifest['entries']
     
-    for obj in project_file_objects:
+    remote_index = dict()
+    listed_keys = set()
+    stale_objects = []
+
+    try:
+        for obj in iter_s3_bucket_contents(access_key_id, secret_access_key, bucket_name, project + '/'):
+            if obj['Key'] == project + '/' or is_bigfoot_internal_key(project, obj['Key']):
+                continue
+            
+            listed_keys.add(obj['Key'])
+            entry = manifest_entries.get(obj['Key'])
+        
+            # A blob reference written after this object was uploaded supersedes it.
+            if entry and entry.get('blob'):
+                continue
+        
+            if entry and entry['etag'] == obj['ETag'] and entry['size'] == obj['Size']:
+                remote_index[obj['Key']] = {
+                                            "last_modified_at": entry['mtime'],
+                                            "sha256": entry['sha256']
+                                           }
+            else:
+                stale_objects.append(obj)
+                
+    except ClientError as e:
+        # A listing that failed part way would make every unlisted key look deleted: fall back
+        # to the manifest as last recorded and leave it untouched.
+        print(f"Unexpected error:  {e}")
+        return {object_name: {"last_modified_at": entry['mtime'], "sha256": entry['sha256']} for object_name, entry in manifest_entries.items()}
+
+    fresh_entries = dict()
+
+    if stale_objects:
+        # Size, mtime and ETag come straight from the listing; only the checksum needs a request.
+        checksums = get_rmt_object_checksums(access_key_id, secret_access_key, bucket_name, stale_objects)
+
+        for obj in stale_objects:
+            # Deleted between the listing and the lookup: absent, like it was never listed.
+            if checksums[obj['Key']] is None:
+                listed_keys.discard(obj['Key'])
+                continue
+            fresh_entries[obj['Key']] = {
+                                            'size': obj['Size'],
+                                            'sha256': checksums[obj['Key']],
+                                            'mtime': int(obj['LastModified'].timestamp()),
+                                            'etag': obj['ETag']
+                                        }
+            remote_index[obj['Key']] = {
+                                        "last_modified_at": fresh_entries[obj['Key']]['mtime'],
+                                        "sha256": fresh_entries[obj['Key']]['sha256']
+                                       }
+
+    for object_name, entry in manifest_entries.items():
+        if entry.get('blob'):
+            remote_index[object_name] = {
+                                            "last_modified_at": entry['mtime'],
+                                            "sha256": entry['sha256']
+                                        }
+
+    removed = [object_name for object_name, entry in manifest_entries.items() if object_name not in listed_keys and not entry.get('blob')]
+
+    if fresh_entries or removed:
+        update_args = (access_key_id, secret_access_key, bucket_name, project, fresh_entries, removed)
+        if rebuild_in_background:
+            threading.Thread(target=update_rmt_project_manifest, args=update_args, daemon=True).start()
+        else:
+            update_rmt_project_manifest(*update_args)
+
+    return remote_index
+
+
+def iter_rmt_project_blob_references(access_key_id, secret_access_key, bucket_name, project):
+
+    # Blob references as listing-style records, so the REMOTE tree can show them next to real objects.
+    manifest, _ = get_rmt_project_manifest(access_key_id, secret_access_key, bucket_name, project)
+
+    for object_name, entry in sorted(manifest['entries'].items()):
+        if entry.get('blob'):
+            yield {
+                    'Key': object_name,
+                    'Size': entry['size'],
+                    'LastModified': datetime.fromtimestamp(entry['mtime'], timezone.utc),
+                    'ETag': entry['etag']
+                  }
+
+
+class LocalFileRecord(collections.namedtuple('LocalFileRecord', ['key', 'size', 'mtime_ns', 'ino'])):
+    """One file found by iter_local_files. The st_* aliases let it stand in for an os.stat_result."""
+
+    __slots__ = ()
+
+    @property
+    def st_size(self):
+        return self.size
+
+    @property
+    def st_mtime_ns(self):
+        return self.mtime_ns
+
+    @property
+    def st_ino(self):
+        return self.ino
+
+
+class IgnoreRules:
+    """gitignore-style rules for one project, compiled from the per-user and per-project ignore files."""
+
+    rules = dict()
+    rules_lock = threading.Lock()
+
+    @classmethod
+    def for_project(cls, projects_directory, project):
+        # Recompiled only when either ignore file changes, so the 1 s LOCAL monitor pays two stats.
+        filepaths = (os.path.join(projects_directory, constants.IGNORE_FILENAME),
+                     os.path.join(projects_directory, project, constants.IGNORE_FILENAME))
+        signature = tuple(cls.get_file_signature(filepath) for filepath in filepaths)
+
+        with cls.rules_lock:
+            rules = cls.rules.get((projects_directory, project))
+            if rules is None or rules.signature != signature:
+                rules = cls(filepaths, signature)
+                cls.rules[(projects_directory, project)] = rules
+            return rules
+
+    @staticmethod
+    def get_file_signature(filepath):
+        try:
+            st = os.stat(filepath)
+            return (st.st_size, st.st_mtime_ns)
+        except OSError:
+            return None
+
+    def __init__(self, filepaths=(), signature=None):
+        self.signature = signature
+        patterns = []
+
+        for filepath in filepaths:
+            try:
+                with open(filepath, 'r', encoding='utf-8') as ignore_file:
+                    patterns.extend(ignore_file.read().splitlines())
+            except OSError:
+                pass
+
+        self.file_matchers = self.compile_patterns(patterns, is_dir=False)
+        self.dir_matchers = self.compile_patterns(patterns, is_dir=True)
+        return None
+
+    @classmethod
+    def compile_patterns(cls, patterns, is_dir):
+        # Runs of patterns with the same sign are joined into one regex, so the usual
+        # all-excludes file is a single match call. Checked last run first: like git,
+        # the last pattern that matches decides.
+        matchers = []
+
+        for pattern in patterns:
+            parsed = cls.parse_pattern(pattern)
+            if parsed is None:
+                continue
+            negated, regex, dir_only = parsed
+            if dir_only and not is_dir:
+                continue
+            if matchers and matchers[-1][0] == negated:
+                matchers[-1][1].append(regex)
+            else:
+                matchers.append((negated, [regex]))
+
+        return [(negated, re.compile('|'.join(regexes))) for negated, regexes in reversed(matchers)]
+
+    @staticmethod
+    def parse_pattern(pattern):
+        # Returns (negated, regex, dir_only) for one line of an ignore file, None for blanks/comments.
+        if pattern.endswith('\\ '):
+            pattern = pattern.rstrip(' ') + ' '
+        else:
+            pattern = pattern.rstrip(' ')
+        if not pattern or pattern[0] == '#':
+            return None
+
+        negated = pattern[0] == '!'
+        if negated:
+            pattern = pattern[1:]
+        elif pattern[:2] in ('\\#', '\\!'):
+            pattern = pattern[1:]
+
+        dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        if not pattern:
+            return None
+
+        # A slash anywhere but the end anchors the pattern to the project root.
+        anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+
+        regex = []
+        i = 0
+        while i < len(pattern):
+            c = pattern[i]
+            if pattern.startswith('**/', i) and (i == 0 or pattern[i - 1] == '/'):
+                regex.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern.startswith('**', i) and i + 2 == len(pattern) and (i == 0 or pattern[i - 1] == '/'):
+                regex.append('.*')
+                i += 2
+                continue
+            if c == '*':
+                regex.append('[^/]*')
+            elif c == '?':
+                regex.append('[^/]')
+            elif c == '[' and pattern.find(']', i + 2) != -1:
+                end = pattern.find(']', i + 2)
+                body = pattern[i + 1:end]
+                if body[0] in '!^':
+                    body = '^' + body[1:]
+                regex.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+            elif c == '\\' and i + 1 < len(pattern):
+                i += 1
+                regex.append(re.escape(pattern[i]))
+            else:
+                regex.append(re.escape(c))
+            i += 1
+
+        prefix = '' if anchored else '(?:.*/)?'
+        return negated, '(?:' + prefix + ''.join(regex) + r')\Z', dir_only
+
+    def __bool__(self):
+        return bool(self.dir_matchers)
+
+    def matches(self, rel_path, is_dir=False):
+        # rel_path is '/'-separated and relative to the project folder. Parent directories aren't
+        # checked here; iter_local_files never descends into an ignored one, is_ignored() checks them.
+        for negated, regex in (self.dir_matchers if is_dir else self.file_matchers):
+            if regex.match(rel_path):
+                return not negated
+        return False
+
+    def is_ignored(self, rel_path):
+        # For paths that didn't come from the scanner, e.g. REMOTE keys.
+        if not self:
+            return False
+
+        parts = rel_path.split('/')
+        for i in range(1, len(parts)):
+            if self.matches('/'.join(parts[:i]), is_dir=True):
+                return True
+
+        return self.matches(rel_path)
+
+    def is_ignored_key(self, project, object_name):
+        # Same check for a '<project>/...' S3 key or index key.
+        project_prefix = project + '/'
+        return object_name.startswith(project_prefix) and self.is_ignored(object_name[len(project_prefix):])
+
+
+def iter_local_files(root, key_prefix='', cancel_event=None, ignore_rules=None):
+
+    # Walks root iteratively, yielding a LocalFileRecord per regular file as soon as it is seen,
+    # with keys relative to root and prefixed by key_prefix. One stat per file, no recursion,
+    # and only the paths of directories still to visit are held in memory. Dot-prefixed
+    # entries (download temp files, BigFoot bookkeeping) are skipped, except the project's own
+    # ignore file at the top of root, which syncs like any other file. Symlinks aren't followed.
+    # Directories matched by ignore_rules are pruned without being opened.
+    if not ignore_rules:
+        ignore_rules = None
+    pending = [(root, '')]
+
+    while pending:
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+            
+        folder, folder_rel = pending.pop()
+        
+        subfolders = []
+        
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.name[0] == '.' and (folder_rel or entry.name != constants.IGNORE_FILENAME):
+                        continue
+                    rel_path = folder_rel + entry.name
+                    # An entry can vanish between listing and stat (CAD temp files do); skip just that one.
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if ignore_rules is None or not ignore_rules.matches(rel_path, is_dir=True):
+                                subfolders.append((entry.path, rel_path + '/'))
+                            continue
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        if ignore_rules is not None and ignore_rules.matches(rel_path):
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                        # DirEntry.stat() leaves st_ino at 0 on Windows; inode() fills it in.
+                        record = LocalFileRecord(key_prefix + rel_path, st.st_size, st.st_mtime_ns, st.st_ino or entry.inode())
+                    except OSError:
+                        continue
+                    yield record
+        except OSError as e:
+            print(f"Unexpected error:  {e}")
+            
+        # Reversed so directories are visited in the order scandir listed them.
+        pending.extend(reversed(subfolders))
+
+    return None
+
+
+def build_local_project_index(projects_directory, project_path, max_workers=None, io_concurrency=None, cancel_event=None):
+
+    hash_cache = LocalHashCache.for_directory(projects_directory)
+    project = project_path.split('/')[-1]
+    ignore_rules = IgnoreRules.for_project(projects_directory, project)
+    local_files = [(projects_directory + '/' + record.key, record)
+                   for record in iter_local_files(project_path, project + '/', cancel_event, ignore_rules)]
+
+    hashes = hash_files_parallel(local_files, hash_cache, max_workers, io_concurrency)
+    local_index = dict()
+
+    for filepath, record in local_files:
+        local_index[record.key] = {
+                                    "last_modified_at": record.mtime_ns // 1000000000,
+                                    "sha256": hashes[filepath]
+                                    }
+
+    hash_cache.prune(project, local_index.keys())
+    hash_cache.save()
+
+    return local_index
+
+
+def get_local_project_info(user_folder, project, cancel_event=None):
+
+    local_project_files = []
+
+    ignore_rules = IgnoreRules.for_project(user_folder, project)
+
+    for record in iter_local_files(user_folder + '/' + project, project + '/', cancel_event, ignore_rules):
         local_file_data = {
-                            'Key': obj.path.replace(user_folder + '/', ''),
-                            'Size': obj.stat().st_size,
-                            'LastModified': time.ctime(os.path.getmtime(obj.path))
+                            'Key': record.key,
+                            'Size': record.size,
+                            'LastModified': time.ctime(record.mtime_ns / 1e9)
                          }
         local_project_files.append(local_file_data)
     
@@ -445,6 +4200,95 @@ class AllObjectAccess:
         return None
 
 
+class TransferBatchWorker(QObject):
+    """Runs a transfer engine function on a background thread and reports back through Qt signals."""
+
+    file_done = pyqtSignal(str, bool, str)
+    batch_done = pyqtSignal(object)
+
+    def __init__(self, engine, *args, **kwargs):
+        super().__init__()
+        self.engine = engine
+        self.args = args
+        self.kwargs = kwargs
+        self.cancel_event = threading.Event()
+        self.progress = TransferProgress()
+        self.thread = None
+        self.elapsed = 0.0
+        self.finished_results = dict()
+        self.error = ''
+        return None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, args=(), daemon=True)
+        self.thread.start()
+        return None
+
+    def run(self):
+        started_at = time.monotonic()
+        results = None
+        
+        # batch_done always fires, so the window gets its buttons back and stops polling progress.
+        # If the engine dies part way, it carries the files that finished and error is set.
+        try:
+            results = self.engine(*self.args, on_file_done=self.record_file_done, cancel_event=self.cancel_event, progress=self.progress, **self.kwargs)
+        finally:
+            self.elapsed = time.monotonic() - started_at
+            if results is None:
+                self.error = 'Transfer stopped unexpectedly'
+                results = dict(self.finished_results)
+            self.batch_done.emit(results)
+            
+        return None
+
+    def record_file_done(self, obj, ok, error):
+        self.finished_results[obj] = {'ok': ok, 'bytes': 0, 'sha256': '', 'error': error}
+        self.file_done.emit(obj, ok, error)
+        return None
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def cancel(self):
+        self.cancel_event.set()
+        return None
+
+
+class BackgroundCallWorker(QObject):
+    """Runs one blocking call on a background thread and hands its result back through a Qt signal."""
+
+    done = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.thread = None
+        return None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, args=(), daemon=True)
+        self.thread.start()
+        return None
+
+    def run(self):
+        # Either done or failed always fires, or the window waiting on it would stay disabled;
+        # connection errors (BotoCoreError) and anything unforeseen end up in failed too.
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            print(f"Unexpected error:  {e}")
+            self.failed.emit(str(e) or type(e).__name__)
+            return None
+        self.done.emit(result)
+        return None
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+
 class LoginWidget(QWidget, AllObjectAccess):
     
     def __init__(self):
@@ -630,6 +4474,51 @@ class AppMainWindow(QWidget, AllObjectAccess):
         self.layout.addStretch()
         self.setLayout(self.layout)
         self.resize(constants.MAIN_WINDOW_W, constants.MAIN_WINDOW_H)
+        self.resume_worker = None
+        self.resume_interrupted_transfers()
+        return None
+
+    def resume_interrupted_transfers(self):
+        # Picks up whatever the transfer journal says was still in flight when the app last exited.
+        try:
+            with open('./config.json', 'r') as config_file:
+                cfg_data = json.load(config_file)
+        except (OSError, ValueError):
+            return None
+
+        if not cfg_data.get('projects_directory'):
+            return None
+
+        pending = TransferJournal.for_directory(cfg_data['projects_directory']).pending(AllObjectAccess.user_info['user_AWS_BUCKET_NAME'])
+        
+        if pending:
+            answer = QMessageBox.question(self, 'BigFoot', f'{len(pending)} transfers were interrupted when BigFoot last closed.\n\nResume them now?')
+            if answer != QMessageBox.StandardButton.Yes:
+                self.resume_worker = BackgroundCallWorker(discard_interrupted_transfers,
+                                                          AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
+                                                          AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'],
+                                                          AllObjectAccess.user_info['user_AWS_BUCKET_NAME'],
+                                                          cfg_data['projects_directory'])
+                self.resume_worker.done.connect(lambda dropped: print(f'Dropped {dropped} interrupted transfers'))
+                self.resume_worker.failed.connect(lambda error: print('Dropping interrupted transfers failed ->', error))
+                self.resume_worker.start()
+                return None
+
+        self.resume_worker = TransferBatchWorker(resume_interrupted_transfers,
+                                                 AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
+                                                 AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'],
+                                                 AllObjectAccess.user_info['user_AWS_BUCKET_NAME'],
+                                                 cfg_data['projects_directory'])
+        self.resume_worker.batch_done.connect(self.resume_batch_done)
+        self.resume_worker.start()
+        return None
+
+    def resume_batch_done(self, results):
+        if results:
+            failed = [obj for obj, result in results.items() if not result['ok']]
+            print(f'Resumed {len(results) - len(failed)}/{len(results)} interrupted transfers')
+        if self.resume_worker.error:
+            print('Resuming interrupted transfers failed ->', self.resume_worker.error)
         return None
 
 
@@ -782,9 +4671,13 @@ class LeftPanelLine2(QWidget, AllObjectAccess):
 
 class CreateNewProject(QWidget, AllObjectAccess):
 
+    delete_progress = pyqtSignal(int, int)
+
     def __init__(self):
         super().__init__()
         self.class_name = 'CreateNewProject'
+        self.delete_worker = None
+        self.delete_progress.connect(self.show_delete_progress)
         self.setWindowTitle(constants.CREATE_NEW_PROJECT_WINDOW_TTL)
         self.setWindowIcon(QIcon(constants.CREATE_NEW_PROJECT_WINDOW_ICON))
         self.setFixedSize(constants.CREATE_NEW_PROJECT_WINDOW_W, constants.CREATE_NEW_PROJECT_WINDOW_H)
@@ -887,15 +4780,49 @@ class CreateNewProject(QWidget, AllObjectAccess):
 
             return None
         
+        self.status.setText('Creating new project on LOCAL and REMOTE...')
+        self.status.repaint()
+        
         try:
-            self.status.setText('Creating new project on LOCAL and REMOTE...')
-            self.status.repaint()
-                             
             cfg_data = dict()
             with open('./config.json', 'r') as config_file:
                 cfg_data = json.load(config_file)
+        except (OSError, ValueError) as e:
+            print(f"Unexpected error:  {e}")
+            return self.create_project_failed('Cannot read config.json')
 
-            new_project_local = cfg_data['projects_directory'] + '/' + self.new_project_name
+        new_project_local = cfg_data['projects_directory'] + '/' + self.new_project_name
+        
+        if constants.ACTIVITY_LOG_SHARED_TABLE_ENABLED:
+            upload_comment_dynamo_db = constants.ACTIVITY_LOG_TABLE
+        else:
+            upload_comment_dynamo_db = get_legacy_activity_log_table(self.user_AWS_BUCKET_NAME, self.new_project_name)
+        
+        new_owner_project = {
+                                'bucket': self.user_AWS_BUCKET_NAME,
+                                'folder': self.new_project_name,
+                                'status': 'owner',
+                                'project_owner': AllObjectAccess.user_info['first_name'] + ' ' + AllObjectAccess.user_info['last_name'],
+                                'project_owner_email': AllObjectAccess.user_info['email'],
+                                'upload_comments_db': upload_comment_dynamo_db
+                            }
+        
+        # Claim the name before creating anything: the conditional write fails if the project
+        # is already there, and a failure past this point only has to undo what this call made.
+        try:
+            set_user_project_in_DynamoDB_table(constants.AWS_DYNAMODB_TABLE, AllObjectAccess.user_info['email'], self.new_project_name, new_owner_project)
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return self.create_project_failed('Project already exists')
+            return self.create_project_failed(e.response['Error']['Code'])
+        
+        # What this call created, so a rollback never touches anything that was already there.
+        # versions: (key, VersionId), VersionId None when the upload didn't report one.
+        created = {'local': None, 'versions': [], 'manifest': False, 'legacy_table': None}
+        
+        try:
+            Path(new_project_local).mkdir(parents=False, exist_ok=False)
+            created['local'] = new_project_local
             
             empty_file_for_S3_folder_creation = '.empty_file'
             empty_file_filepath = Path(cfg_data['projects_directory'] + '/' + empty_file_for_S3_folder_creation)
@@ -903,19 +4830,31 @@ class CreateNewProject(QWidget, AllObjectAccess):
             if not empty_file_filepath.is_file():            
                 open(empty_file_filepath, 'a').close()
             
-            put_loc_object_to_rmt(self.user_AWS_ACCESS_KEY_ID, self.user_AWS_SECRET_ACCESS_KEY, empty_file_filepath, self.user_AWS_BUCKET_NAME, self.new_project_name + '/')
+            put_response = TransferScheduler.get().submit(put_loc_object_to_rmt, self.user_AWS_ACCESS_KEY_ID, self.user_AWS_SECRET_ACCESS_KEY, empty_file_filepath, self.user_AWS_BUCKET_NAME, self.new_project_name + '/',
+                                                          priority=TransferScheduler.PRIORITY_INTERACTIVE).result()
+            created['versions'].append((self.new_project_name + '/', (put_response or {}).get('VersionId')))
             
             if self.project_image_path:
-                put_loc_object_to_rmt(self.user_AWS_ACCESS_KEY_ID, self.user_AWS_SECRET_ACCESS_KEY, self.project_image_path, self.user_AWS_BUCKET_NAME, self.new_project_name + '/project_image.jpg')
-            
-            Path(new_project_local).mkdir(parents=False, exist_ok=False)
+                # The manifest entry comes from the PUT response; no HEAD after our own upload.
+                project_image_sha256 = create_sha256_hash_for_file(self.project_image_path)
+                put_response = TransferScheduler.get().submit(put_loc_object_to_rmt, self.user_AWS_ACCESS_KEY_ID, self.user_AWS_SECRET_ACCESS_KEY, self.project_image_path, self.user_AWS_BUCKET_NAME, self.new_project_name + '/project_image.jpg',
+                                                              project_image_sha256, priority=TransferScheduler.PRIORITY_INTERACTIVE).result()
+                created['versions'].append((self.new_project_name + '/project_image.jpg', (put_response or {}).get('VersionId')))
+                project_image_entry = get_rmt_manifest_entry(self.user_AWS_ACCESS_KEY_ID, self.user_AWS_SECRET_ACCESS_KEY, self.user_AWS_BUCKET_NAME, self.new_project_name + '/project_image.jpg',
+                                                             project_image_sha256, put_response)
+                _, manifest_etag = get_rmt_project_manifest(self.user_AWS_ACCESS_KEY_ID, self.user_AWS_SECRET_ACCESS_KEY, self.user_AWS_BUCKET_NAME, self.new_project_name)
+                if update_rmt_project_manifest(self.user_AWS_ACCESS_KEY_ID, self.user_AWS_SECRET_ACCESS_KEY, self.user_AWS_BUCKET_NAME, self.new_project_name, 
+                                               {self.new_project_name + '/project_image.jpg': project_image_entry}) is None:
+                    raise ValueError('project manifest update conflicted')
+                created['manifest'] = not manifest_etag
             
-            upload_comment_dynamo_db = self.user_AWS_BUCKET_NAME + '_' + self.new_project_name
-            attribute_name = 'utc_time'  # <-- This will need to change!!!
-            create_DynamoDB_table(constants.AWS_ROOT_ACCESS_KEY_ID,
-                                  constants.AWS_ROOT_SECRET_ACCESS_KEY, 
-                                  upload_comment_dynamo_db, 
-                                  attribute_name)
+            if not constants.ACTIVITY_LOG_SHARED_TABLE_ENABLED:
+                attribute_name = 'utc_time'  # <-- This will need to change!!!
+                create_DynamoDB_table(constants.AWS_ROOT_ACCESS_KEY_ID,
+                                      constants.AWS_ROOT_SECRET_ACCESS_KEY, 
+                                      upload_comment_dynamo_db, 
+                                      attribute_name)
+                created['legacy_table'] = upload_comment_dynamo_db
             
             current_utc = int(time.time())
             user_name = AllObjectAccess.user_info['first_name'] + ' ' + AllObjectAccess.user_info['last_name']
@@ -930,45 +4869,21 @@ class CreateNewProject(QWidget, AllObjectAccess):
                         "files_uploaded": []
                        }  
             
-            put_item_to_DynamoDB_table(upload_comment_dynamo_db, new_project_creation_entry)
+            # Last, and a single put: if it fails nothing was logged, so the log never needs undoing.
+            put_activity_log_entry(self.user_AWS_ACCESS_KEY_ID, self.user_AWS_SECRET_ACCESS_KEY, self.user_AWS_BUCKET_NAME, self.new_project_name, new_project_creation_entry)
 
             # print(json.dumps(new_project_creation_entry, sort_keys=False, indent=4))
             
-            new_owner_project = {
-                                    'bucket': self.user_AWS_BUCKET_NAME,
-                                    'folder': self.new_project_name,
-                                    'status': 'owner',
-                                    'project_owner': AllObjectAccess.user_info['first_name'] + ' ' + AllObjectAccess.user_info['last_name'],
-                                    'project_owner_email': AllObjectAccess.user_info['email'],
-                                    'upload_comments_db': upload_comment_dynamo_db
-                                }
-                                
-            update_dict = get_item_from_DynamoDB_table(constants.AWS_DYNAMODB_TABLE, AllObjectAccess.user_info['email'])
-            
-            update_dict['projects'][self.new_project_name] = new_owner_project
-            
-            put_item_to_DynamoDB_table(constants.AWS_DYNAMODB_TABLE, update_dict)
+        except (BotoCoreError, ClientError, S3UploadFailedError, OSError, ValueError) as e:
+            print(f"Unexpected error:  {e}")
+            self.roll_back_project_creation(created)
+            return self.create_project_failed(e.response['Error']['Code'] if isinstance(e, ClientError) else 'Project not created: ' + str(e))
                           
-            self.status.setText('New project created')
-            self.status.repaint()
-            
-            time.sleep(3)
-            
-            self.status.setText('')
-            self.status.repaint()
-            
-        except ClientError as e:   
-            self.status.setText(e.response['Error']['Code'])
-            self.status.repaint()
-            time.sleep(3)
-            
-            self.status.setText('')
-            self.status.repaint()
-            self.lineEdits['New Project Name'].clear()
-            
-            self.close()
-            return None
-                       
+        self.status.setText('New project created')
+        self.status.repaint()
+        
+        time.sleep(3)
+        
         self.status.setText('')
         self.status.repaint()
         self.lineEdits['New Project Name'].clear()
@@ -977,55 +4892,104 @@ class CreateNewProject(QWidget, AllObjectAccess):
         
         return None
 
-    def delete_project(self):
-        self.status.setText('Deleting project on LOCAL and REMOTE if it exists...')
+    def create_project_failed(self, message):
+        
+        self.status.setText(message)
         self.status.repaint()
+        time.sleep(3)
         
-        self.new_project_name = self.lineEdits['New Project Name'].text()
+        self.status.setText('')
+        self.status.repaint()
+        self.lineEdits['New Project Name'].clear()
         
-        delete_DynamoDB_table(constants.AWS_ROOT_ACCESS_KEY_ID,
-                              constants.AWS_ROOT_SECRET_ACCESS_KEY,  
-                              self.user_AWS_BUCKET_NAME + '_' + self.new_project_name)
+        self.close()
+        
+        return None
+
+    def roll_back_project_creation(self, created):
         
-        project_contents = list_s3_bucket_contents_with_prefix(self.user_AWS_ACCESS_KEY_ID,
-                                                              self.user_AWS_SECRET_ACCESS_KEY, 
-                                                              self.user_AWS_BUCKET_NAME, 
-                                                              self.new_project_name)
+        # Undoes a half-created project: only what this create_project call made (see created
+        # there), then the claim itself. A manifest that didn't exist before goes with all its
+        # versions; an upload that reported no VersionId takes every version of its key.
+        try:
+            created_versions = [{'Key': key, 'VersionId': version_id} for key, version_id in created['versions'] if version_id]
+            whole_keys = set(key for key, version_id in created['versions'] if not version_id)
+            if created['manifest']:
+                whole_keys.add(get_rmt_project_manifest_key(self.new_project_name))
+                
+            if whole_keys:
+                created_versions.extend(obj_version for obj_version in iter_rmt_project_object_versions(self.user_AWS_ACCESS_KEY_ID, self.user_AWS_SECRET_ACCESS_KEY,
+                                                                                                        self.user_AWS_BUCKET_NAME, self.new_project_name,
+                                                                                                        include_delete_markers=True)
+                                        if obj_version['Key'] in whole_keys)
+                
+            delete_rmt_objects(self.user_AWS_ACCESS_KEY_ID, self.user_AWS_SECRET_ACCESS_KEY, self.user_AWS_BUCKET_NAME, created_versions)
+        except ClientError as e:
+            print(f"Unexpected error:  {e}")
+            
+        if created['legacy_table']:
+            try:
+                delete_DynamoDB_table(constants.AWS_ROOT_ACCESS_KEY_ID, constants.AWS_ROOT_SECRET_ACCESS_KEY, created['legacy_table'])
+            except ClientError as e:
+                print(f"Unexpected error:  {e}")
+            
+        if created['local']:
+            shutil.rmtree(created['local'], ignore_errors=True)
+            
+        try:
+            remove_user_project_from_DynamoDB_table(constants.AWS_DYNAMODB_TABLE, AllObjectAccess.user_info['email'], self.new_project_name)
+        except ClientError as e:
+            print(f"Unexpected error:  {e}")
         
-        delete_these_objects_in_S3 = []
+        return None
+
+    def delete_project(self):
+    
+        if self.delete_worker and self.delete_worker.is_running():
+            return None
+            
+        self.new_project_name = self.lineEdits['New Project Name'].text()
         
-        for obj in project_contents['Contents']:
-            delete_these_objects_in_S3.append(obj['Key'])
+        if not self.new_project_name:
+            self.status.setText('Enter valid project name')
+            return None
         
-        delete_s3_bucket_content_list(self.user_AWS_ACCESS_KEY_ID,
-                                      self.user_AWS_SECRET_ACCESS_KEY, 
-                                      self.user_AWS_BUCKET_NAME, 
-                                      delete_these_objects_in_S3)
+        self.status.setText('Deleting project on LOCAL and REMOTE if it exists...')
         
         cfg_data = dict()
         with open('./config.json', 'r') as config_file:
             cfg_data = json.load(config_file)
-
-        delete_this_dir = cfg_data['projects_directory'] + '/' + self.new_project_name
         
-        shutil.rmtree(delete_this_dir, ignore_errors=True)
+        # Paginated REMOTE deletes can take minutes; the window stays responsive meanwhile.
+        self.delete_worker = BackgroundCallWorker(delete_user_project,
+                                                  self.user_AWS_ACCESS_KEY_ID,
+                                                  self.user_AWS_SECRET_ACCESS_KEY, 
+                                                  self.user_AWS_BUCKET_NAME, 
+                                                  self.new_project_name,
+                                                  cfg_data['projects_directory'],
+                                                  AllObjectAccess.user_info['email'],
+                                                  on_progress=self.delete_progress.emit)
+        self.delete_worker.done.connect(self.project_deleted)
+        self.delete_worker.failed.connect(lambda error: self.status.setText('Project not deleted: ' + error))
+        self.delete_worker.start()
         
-        update_dict = get_item_from_DynamoDB_table(constants.AWS_DYNAMODB_TABLE, AllObjectAccess.user_info['email'])
-            
-        update_dict['projects'].pop(self.new_project_name, None)
+        return None
+
+    def show_delete_progress(self, deleted, failed):
+        self.status.setText(f'Deleting project on REMOTE... {deleted} versions deleted, {failed} failed')
+        return None
+
+    def project_deleted(self, delete_result):
+    
+        # The project is left in place on a partial delete; deleting it again retries the rest.
+        if delete_result['errors']:
+            self.status.setText(f"Project not deleted: {len(delete_result['errors'])} REMOTE versions could not be deleted, try again")
+            return None
             
-        put_item_to_DynamoDB_table(constants.AWS_DYNAMODB_TABLE, update_dict)
-        
         self.status.setText('Project deleted')
-        self.status.repaint()
-            
-        time.sleep(3)
         
-        self.status.setText('')
-        self.status.repaint()
         self.lineEdits['New Project Name'].clear()
-        
-        self.close()
+        QTimer.singleShot(3000, self.close)
         
         return None
 
@@ -1211,47 +5175,21 @@ class RightPanel(QWidget, AllObjectAccess):
         with open('./config.json', 'r') as config_file:
             self.cfg_data = json.load(config_file)
         
-        local_index = dict()
-        
-        for path, subdirs, files in os.walk(self.current_project_path):
-            for name in files:
-                filepath = os.path.join(path, name)
-                sha256 = create_sha256_hash_for_file(filepath)
-                object_name = filepath.replace(self.cfg_data['projects_directory'] + '/', '')
-                local_index[object_name] = {
-                                            "last_modified_at": int(os.path.getmtime(filepath)),
-                                            "sha256": sha256
-                                            }
+        local_index = build_local_project_index(self.cfg_data['projects_directory'], self.current_project_path)
         
         # print('LOCAL')
         # print(json.dumps(local_index, sort_keys=True, indent=4))
         # print()
         
-        remote_index = dict()
-        
-        all_remote_prj_files = get_rmt_project_object_versions(AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
-                                           AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'], 
-                                           AllObjectAccess.user_info['user_AWS_BUCKET_NAME'],
-                                           self.project_name)
+        remote_index = build_remote_project_index(AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
+                                                  AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'], 
+                                                  AllObjectAccess.user_info['user_AWS_BUCKET_NAME'],
+                                                  self.project_name)
         
-        object_list = []
-        
-        for remote_file in all_remote_prj_files:
-            if remote_file['Key'] == self.project_name + '/':
-                pass
-            else:
-                if remote_file['IsLatest'] == True:
-                    object_list.append(remote_file)
-                
-        for obj in object_list:
-            sha256 = get_remote_object_metadata(AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
-                                       AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'],
-                                       AllObjectAccess.user_info['user_AWS_BUCKET_NAME'], 
-                                       obj['Key'])
-            remote_index[obj['Key']] = {
-                                       "last_modified_at": int(parser.parse(str(obj['LastModified'])).timestamp()),
-                                       "sha256": sha256
-                                       }
+        # Ignored files are skipped by the LOCAL scan; drop their REMOTE copies so they aren't offered for download.
+        ignore_rules = IgnoreRules.for_project(self.cfg_data['projects_directory'], self.project_name)
+        remote_index = {object_name: remote_index[object_name] for object_name in remote_index
+                        if not ignore_rules.is_ignored_key(self.project_name, object_name)}
         
         # print('REMOTE')
         # print(json.dumps(remote_index, sort_keys=True, indent=4, default=str))
@@ -1409,15 +5347,28 @@ class RightPanelLine1(QWidget, AllObjectAccess):
         self.add_users_icon = qta.icon(constants.ADD_USERS_ICON, color='#000000')
         self.add_users.setIcon(self.add_users_icon)
         self.add_users.setIconSize(QSize(40, 40))
+        self.history = QPushButton('History', clicked=self.show_project_history)
+        self.history.setStyleSheet("QPushButton { font-size: 14px; background-color: transparent; border: 0px }")
+        self.history.setFixedSize(QSize(125, 50))
+        self.history_icon = qta.icon(constants.PROJECT_HISTORY_ICON, color='#000000')
+        self.history.setIcon(self.history_icon)
+        self.history.setIconSize(QSize(40, 40))
+        self.history_panel = None
         self.layout.addWidget(self.user_image, 0, 0, 2, 1, alignment=(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignAbsolute | Qt.AlignmentFlag.AlignTop))
         self.layout.addWidget(self.project_name_label, 0, 1, alignment=(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignAbsolute | Qt.AlignmentFlag.AlignTop))
         self.layout.addWidget(self.user_name, 1, 1, alignment=(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignAbsolute | Qt.AlignmentFlag.AlignTop))
         self.layout.addWidget(self.project_users_info, 0, 2, alignment=(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop))
         self.layout.addWidget(self.add_users, 1, 2, alignment=(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop))
+        self.layout.addWidget(self.history, 0, 3, alignment=(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop))
         self.layout.setRowStretch(1, 1)
         self.layout.setColumnStretch(1, 1)
         self.setLayout(self.layout)
         return None
+
+    def show_project_history(self):
+        self.history_panel = ProjectHistoryPanel(self.project_name)
+        self.history_panel.show()
+        return None
     
     def get_project_info(self):
     
@@ -1679,12 +5630,14 @@ class _FileSystemModelLiteItem(object):
         data: List[Any],
         icon=QFileIconProvider.IconType.Computer,
         parent: FSMItemOrNone = None,
+        version_id: str = "",
     ):
         self._data: List[Any] = data
         self._icon = icon
         self._parent: _FileSystemModelLiteItem = parent
         self.child_items: List[_FileSystemModelLiteItem] = []
         self.is_checkable = True
+        self.version_id = version_id
 
     def append_child(self, child: "_FileSystemModelLiteItem"):
         self.child_items.append(child)
@@ -1726,8 +5679,9 @@ class FileSystemModelLiteLocal(QAbstractItemModel, AllObjectAccess):
         self._icon_provider = QFileIconProvider()
 
         self._root_item = _FileSystemModelLiteItem(
-            ["Filename", "Relative Path", "Size (bytes)", "Modified (local time)"]
+            ["Filename", "Relative Path", "Size (bytes)", "Modified (local time)", "Transfer"]
         )
+        self.transfer_progress = {}
         self._setup_model_data(file_list, self._root_item)
         self.checks = {}
         self.upload_files = []
@@ -1736,12 +5690,24 @@ class FileSystemModelLiteLocal(QAbstractItemModel, AllObjectAccess):
         self.beginResetModel()
         del self._root_item
         self._root_item = _FileSystemModelLiteItem(
-            ["Filename", "Relative Path", "Size (bytes)", "Modified (local time)"]
+            ["Filename", "Relative Path", "Size (bytes)", "Modified (local time)", "Transfer"]
         )
         self._setup_model_data(file_list, self._root_item)
         self.endResetModel()
         return None
 
+    def set_transfer_progress(self, file_progress):
+        # file_progress: {relative path: text} for the rows whose Transfer column changed.
+        self.transfer_progress.update(file_progress)
+        
+        for path in file_progress:
+            for item in self._path_items.get(path, []):
+                item._data[4] = self.transfer_progress[path]
+                index = self.createIndex(item.row(), 4, item)
+                self.dataChanged.emit(index, index)
+                
+        return None
+
     def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
         if not index.isValid():
             return None
@@ -1842,6 +5808,8 @@ class FileSystemModelLiteLocal(QAbstractItemModel, AllObjectAccess):
     def _setup_model_data(
         self, file_list: List[str], parent: "_FileSystemModelLiteItem"
     ):
+        self._path_items = {}
+        
         def _add_to_tree(_file_record, _parent: "_FileSystemModelLiteItem", root=False):
             item_name = _file_record["bits"].pop(0)
             for child in _parent.child_items:
@@ -1849,7 +5817,7 @@ class FileSystemModelLiteLocal(QAbstractItemModel, AllObjectAccess):
                     item = child
                     break
             else:
-                data = [item_name, "", "", ""]
+                data = [item_name, "", "", "", ""]
                 if root:
                     icon = QFileIconProvider.IconType.Desktop  # IconType.File was Computer
                 elif len(_file_record["bits"]) == 0:
@@ -1858,13 +5826,17 @@ class FileSystemModelLiteLocal(QAbstractItemModel, AllObjectAccess):
                         item_name,
                         _file_record["path"],
                         _file_record["size"],
-                        _file_record["modified_at"]
+                        _file_record["modified_at"],
+                        self.transfer_progress.get(_file_record["path"], "")
                     ]
                 else:
                     icon = QFileIconProvider.IconType.Folder
 
                 item = _FileSystemModelLiteItem(data, icon=icon, parent=_parent)
                 _parent.append_child(item)
+                
+                if icon == QFileIconProvider.IconType.File:
+                    self._path_items.setdefault(_file_record["path"], []).append(item)
 
             if len(_file_record["bits"]):
                 _add_to_tree(_file_record, item)
@@ -1895,8 +5867,9 @@ class FileSystemModelLiteRemote(QAbstractItemModel, AllObjectAccess):
         self._icon_provider = QFileIconProvider()
 
         self._root_item = _FileSystemModelLiteItem(
-            ["Filename", "Relative Path", "Size (bytes)", "Modified (utc time)"]
+            ["Filename", "Relative Path", "Size (bytes)", "Modified (utc time)", "Transfer"]
         )
+        self.transfer_progress = {}
         self._setup_model_data(file_list, self._root_item)
         self.checks = {}
         self.upload_files = []
@@ -1905,12 +5878,24 @@ class FileSystemModelLiteRemote(QAbstractItemModel, AllObjectAccess):
         self.beginResetModel()
         del self._root_item
         self._root_item = _FileSystemModelLiteItem(
-            ["Filename", "Relative Path", "Size (bytes)", "Modified (utc time)"]
+            ["Filename", "Relative Path", "Size (bytes)", "Modified (utc time)", "Transfer"]
         )
         self._setup_model_data(file_list, self._root_item)
         self.endResetModel()
         return None
 
+    def set_transfer_progress(self, file_progress):
+        # file_progress: {relative path: text} for the rows whose Transfer column changed.
+        self.transfer_progress.update(file_progress)
+        
+        for path in file_progress:
+            for item in self._path_items.get(path, []):
+                item._data[4] = self.transfer_progress[path]
+                index = self.createIndex(item.row(), 4, item)
+                self.dataChanged.emit(index, index)
+                
+        return None
+
     def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
         if not index.isValid():
             return None
@@ -1932,14 +5917,16 @@ class FileSystemModelLiteRemote(QAbstractItemModel, AllObjectAccess):
         if not index.isValid():
             return False
         
+        # Checked rows are (key, VersionId) pairs, VersionId '' for the current version.
         if role == Qt.ItemDataRole.CheckStateRole:
+            selected = (index.data(), index.internalPointer().version_id)
             if value == Qt.CheckState.Unchecked.value:
-                if index.data() in self.upload_files:
-                    self.upload_files = [x for x in self.upload_files if x != index.data()]
+                if selected in self.upload_files:
+                    self.upload_files = [x for x in self.upload_files if x != selected]
                     self.upload_files.sort()
             elif value == Qt.CheckState.Checked.value:
-                if index.data() not in self.upload_files:
-                    self.upload_files.append(index.data())
+                if selected not in self.upload_files:
+                    self.upload_files.append(selected)
                     self.upload_files.sort()
             else:
                 pass
@@ -2011,14 +5998,18 @@ class FileSystemModelLiteRemote(QAbstractItemModel, AllObjectAccess):
     def _setup_model_data(
         self, file_list: List[str], parent: "_FileSystemModelLiteItem"
     ):
+        self._path_items = {}
+        
         def _add_to_tree(_file_record, _parent: "_FileSystemModelLiteItem", root=False):
             item_name = _file_record["bits"].pop(0)
+            # Each version of a file gets its own row; folders are shared.
+            version_id = "" if _file_record["bits"] else _file_record["version_id"]
             for child in _parent.child_items:
-                if item_name == child.data(0):
+                if item_name == child.data(0) and version_id == child.version_id:
                     item = child
                     break
             else:
-                data = [item_name, "", "", ""]
+                data = [item_name, "", "", "", ""]
                 if root:
                     icon = QFileIconProvider.IconType.Desktop  # IconType.File was Computer
                 elif len(_file_record["bits"]) == 0:
@@ -2027,22 +6018,28 @@ class FileSystemModelLiteRemote(QAbstractItemModel, AllObjectAccess):
                         item_name,
                         _file_record["path"],
                         _file_record["size"],
-                        _file_record["modified_at"]
+                        _file_record["modified_at"],
+                        self.transfer_progress.get(_file_record["path"], "")
                     ]
                 else:
                     icon = QFileIconProvider.IconType.Folder
 
-                item = _FileSystemModelLiteItem(data, icon=icon, parent=_parent)
+                item = _FileSystemModelLiteItem(data, icon=icon, parent=_parent, version_id=version_id)
                 _parent.append_child(item)
+                
+                if icon == QFileIconProvider.IconType.File:
+                    self._path_items.setdefault(_file_record["path"], []).append(item)
 
             if len(_file_record["bits"]):
                 _add_to_tree(_file_record, item)
 
         for file in file_list:
+            # Only older versions are pinned; the current one downloads through the manifest.
             file_record = {
                 "path": file["Key"],
                 "size": file['Size'],
                 "modified_at": str(file['LastModified']),
+                "version_id": file.get('VersionId', '') if not file.get('IsLatest', True) else "",
             }
 
             drive = True
@@ -2057,6 +6054,156 @@ class FileSystemModelLiteRemote(QAbstractItemModel, AllObjectAccess):
             _add_to_tree(file_record, parent, drive)
 
 
+class ProjectHistoryPanel(QWidget, AllObjectAccess):
+    def __init__(self, project_name):
+        super(ProjectHistoryPanel, self).__init__()
+        self.class_name = 'ProjectHistoryPanel'
+        self.project_name = project_name
+        self.setWindowTitle('BigFoot Workbench Project HISTORY: ' + self.project_name)
+        self.layout = QVBoxLayout(self)
+        
+        self.cfg_data = dict()
+        with open('./config.json', 'r') as config_file:
+            self.cfg_data = json.load(config_file)
+            
+        self.history_cache = ActivityHistoryCache.for_project(self.cfg_data['projects_directory'],
+                                                              AllObjectAccess.user_info['user_AWS_BUCKET_NAME'],
+                                                              self.project_name)
+        self.shown_entries = 0
+        self.worker = None
+        
+        self.history_tree = QTreeWidget()
+        self.history_tree.setStyleSheet(constants.RIGHT_PANEL_FILE_DIR_STYLE)
+        self.history_tree.setHeaderLabels(['Time (local time)', 'Action', 'User', 'Comment', 'Files'])
+        self.history_tree.header().setSectionResizeMode(QHeaderView.Stretch)
+        self.history_tree.verticalScrollBar().valueChanged.connect(self.history_scrolled)
+        self.history_tree.itemExpanded.connect(self.history_item_expanded)
+        self.file_workers = []
+        self.layout.addWidget(self.history_tree, stretch=2)
+        
+        self.sublayout_1 = QHBoxLayout()
+        
+        self.refresh_button = QPushButton('Refresh', clicked=self.refresh_history)
+        self.refresh_button.setStyleSheet('background-color: #FFFFFF; font-family: Courier New; font-size: 14px; font-weight: 900;')
+        self.sublayout_1.addWidget(self.refresh_button, alignment=(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom))
+        
+        self.older_button = QPushButton('Load Older', clicked=self.show_older)
+        self.older_button.setStyleSheet('background-color: #FFFFFF; font-family: Courier New; font-size: 14px; font-weight: 900;')
+        self.sublayout_1.addWidget(self.older_button, alignment=(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignBottom))
+        
+        self.layout.addLayout(self.sublayout_1)
+        
+        self.history_status = QStatusBar()
+        self.history_status.setStyleSheet('background-color: #FFFFFF; font-family: Courier New; font-size: 12px; font-weight: 900;')
+        self.layout.addWidget(self.history_status)
+        
+        # Whatever is cached shows up immediately; the newest events are fetched behind it.
+        self.append_entries(self.history_cache.cached_entries(0, constants.ACTIVITY_HISTORY_PAGE_SIZE))
+        self.refresh_history()
+        
+        self.setWindowFlag(Qt.WindowType.WindowCloseButtonHint, True)
+        self.resize(constants.PROJECT_HISTORY_WINDOW_W, constants.PROJECT_HISTORY_WINDOW_H)
+        return None
+        
+    def make_history_item(self, entry):
+        try:
+            when = datetime.fromtimestamp(int(entry.get('utc_time', 0))).strftime('%Y-%m-%d %H:%M:%S')
+        except (TypeError, ValueError):
+            when = str(entry.get('utc_time', ''))
+            
+        files_count = int(entry.get('files_count', len(entry.get('files_uploaded', []))))
+        comment = entry.get('upload_comment', '').replace('\n', ' ')
+        
+        # File lists are only filled in (and, if spilled to S3, fetched) when the event is expanded.
+        item = QTreeWidgetItem([when, entry.get('action', ''), entry.get('user_name', ''), comment, str(files_count)])
+        item.setData(0, Qt.ItemDataRole.UserRole, entry)
+        if files_count:
+            item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
+        
+        return item
+
+    def history_item_expanded(self, item):
+        entry = item.data(0, Qt.ItemDataRole.UserRole)
+        
+        if not entry or item.childCount():
+            return None
+            
+        if 'files_ref' not in entry:
+            self.show_event_files(item, entry.get('files_uploaded', []))
+            return None
+
+        worker = BackgroundCallWorker(get_activity_log_files,
+                                      AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
+                                      AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'],
+                                      AllObjectAccess.user_info['user_AWS_BUCKET_NAME'],
+                                      entry)
+        worker.done.connect(lambda files: self.show_event_files(item, files))
+        worker.failed.connect(lambda error: self.history_status.showMessage('File list unavailable: ' + error))
+        self.file_workers = [w for w in self.file_workers if w.is_running()] + [worker]
+        self.history_status.showMessage(f"Fetching {entry.get('files_count', '')} file names...")
+        worker.start()
+        return None
+
+    def show_event_files(self, item, files):
+        if not item.childCount():
+            item.addChildren([QTreeWidgetItem(['', '', '', f, '']) for f in files])
+        return None
+
+    def append_entries(self, entries):
+        self.history_tree.addTopLevelItems([self.make_history_item(entry) for entry in entries])
+        self.shown_entries += len(entries)
+        return None
+
+    def run_in_background(self, fn, on_done, message):
+        if self.worker and self.worker.is_running():
+            return None
+        self.history_status.showMessage(message)
+        self.worker = BackgroundCallWorker(fn)
+        self.worker.done.connect(on_done)
+        self.worker.failed.connect(lambda error: self.history_status.showMessage('History unavailable: ' + error))
+        self.worker.start()
+        return None
+
+    def refresh_history(self):
+        self.run_in_background(self.history_cache.refresh, self.history_refreshed, 'Checking for new activity...')
+        return None
+        
+    def history_refreshed(self, new_count):
+        # New events go on top; everything already shown stays where it is.
+        new_entries = self.history_cache.cached_entries(0, new_count)
+        self.history_tree.insertTopLevelItems(0, [self.make_history_item(entry) for entry in new_entries])
+        self.shown_entries += len(new_entries)
+        self.history_status.showMessage(f'{new_count} new events, showing {self.shown_entries}')
+        return None
+
+    def show_older(self):
+        # Cached pages are shown first; only past the end of the cache is REMOTE queried.
+        if self.worker and self.worker.is_running():
+            return None
+            
+        cached = self.history_cache.cached_entries(self.shown_entries, constants.ACTIVITY_HISTORY_PAGE_SIZE)
+        
+        if cached:
+            self.append_entries(cached)
+            self.history_status.showMessage(f'Showing {self.shown_entries} events')
+        elif self.history_cache.complete:
+            self.history_status.showMessage(f'Showing all {self.shown_entries} events')
+        else:
+            self.run_in_background(self.history_cache.load_older, self.older_loaded, 'Loading older activity...')
+            
+        return None
+        
+    def older_loaded(self, entries):
+        self.append_entries(entries)
+        self.history_status.showMessage(f'Showing {self.shown_entries} events' + (' (all)' if self.history_cache.complete else ''))
+        return None
+
+    def history_scrolled(self, value):
+        if value and value == self.history_tree.verticalScrollBar().maximum():
+            self.show_older()
+        return None
+
+
 class LocalProjectFolder(QWidget, AllObjectAccess):
     def __init__(self, current_project_path):
         super(LocalProjectFolder, self).__init__()
@@ -2065,7 +6212,12 @@ class LocalProjectFolder(QWidget, AllObjectAccess):
         self.current_project = self.current_project_path.split('/')[-1]
         title = 'BigFoot Workbench Project LOCAL: ' + self.current_project
         self.files_to_download = []
+        self.upload_worker = None
         self.setWindowTitle(title)
+        
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(constants.TRANSFER_PROGRESS_INTERVAL_MS)
+        self.progress_timer.timeout.connect(self.upload_progress_tick)
         self.layout = QVBoxLayout(self)
         
         self.gen_local_file_index = QPushButton('GENERATE LOCAL FILE INDEX', clicked=self.gen_local_index)
@@ -2128,17 +6280,7 @@ class LocalProjectFolder(QWidget, AllObjectAccess):
 
     def gen_local_index(self):
         
-        local_index = dict()
-        
-        for path, subdirs, files in os.walk(self.current_project_path):
-            for name in files:
-                filepath = os.path.join(path, name)
-                sha256 = create_md5_sha1_hashes_for_file(filepath)
-                object_name = filepath.replace(self.cfg_data['projects_directory'] + '/', '')
-                local_index[object_name] = {
-                                            "last_modified_at": os.path.getmtime(filepath),
-                                            "sha256": sha256
-                                            }
+        local_index = build_local_project_index(self.cfg_data['projects_directory'], self.current_project_path)
         
         print(json.dumps(local_index, sort_keys=True, indent=4))
         
@@ -2162,40 +6304,88 @@ class LocalProjectFolder(QWidget, AllObjectAccess):
         return None
 
     def upload_selected_files(self):
+    
+        if not self._fileSystemModel.upload_files:
+            self.file_upload_status.showMessage('No files selected for upload')
+            return None
+            
+        if self.upload_worker and self.upload_worker.is_running():
+            self.file_upload_status.showMessage('An upload is already in progress...')
+            return None
+    
         current_utc = int(time.time())
-        upload_comment_dynamo_db = AllObjectAccess.user_info['user_AWS_BUCKET_NAME'] + '_' + self.current_project
         user_name = AllObjectAccess.user_info['first_name'] + ' ' + AllObjectAccess.user_info['last_name']
         user_email = AllObjectAccess.user_info['email']
         upload_comment = self.upload_comment.toPlainText()
         
-        upload_entry = {
+        self.upload_entry = {
                         "action": 'UPLOAD',
                         "utc_time": str(current_utc),
                         "user_name": user_name,
                         "user_email": user_email,
                         "upload_comment": upload_comment,
-                        "files_uploaded": self._fileSystemModel.upload_files
+                        "files_uploaded": list(self._fileSystemModel.upload_files)
                        }
         
-        print(json.dumps(upload_entry, sort_keys=False, indent=4))
+        print(json.dumps(self.upload_entry, sort_keys=False, indent=4))
         
-        time.sleep(3)
         self.upload_comment.clear()
-    
-        for f in self._fileSystemModel.upload_files:
-            sha256 = create_sha256_hash_for_file(self.cfg_data['projects_directory'] + '/' + f)
-            
-            put_loc_object_to_rmt(AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
-                                  AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'], 
-                                  self.cfg_data['projects_directory'] + '/' + f, 
-                                  AllObjectAccess.user_info['user_AWS_BUCKET_NAME'],
-                                  f, sha256)
-
-        put_item_to_DynamoDB_table(upload_comment_dynamo_db, upload_entry)
         
-        print('Upload done.')
+        file_pairs = [(self.cfg_data['projects_directory'] + '/' + f, f) for f in self.upload_entry['files_uploaded']]
+        self.upload_files_done = 0
+        
+        self.upload_worker = TransferBatchWorker(upload_files_to_rmt,
+                                                 AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
+                                                 AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'],
+                                                 AllObjectAccess.user_info['user_AWS_BUCKET_NAME'],
+                                                 file_pairs,
+                                                 hash_cache=LocalHashCache.for_directory(self.cfg_data['projects_directory']),
+                                                 journal=TransferJournal.for_directory(self.cfg_data['projects_directory']),
+                                                 activity_entry=self.upload_entry)
+        self.upload_worker.file_done.connect(self.upload_file_done)
+        self.upload_worker.batch_done.connect(self.upload_batch_done)
+        
+        self.upload_button_2.setEnabled(False)
+        self.file_upload_status.showMessage(f'Uploading {len(file_pairs)} files...')
+        self.upload_worker.start()
+        self.progress_timer.start()
 
         return None
+        
+    def upload_file_done(self, obj, ok, error):
+        # The status bar is repainted by upload_progress_tick; failures are logged here.
+        self.upload_files_done += 1
+        
+        if not ok:
+            print(f'Upload FAILED: {obj} ({error})')
+            
+        return None
+        
+    def upload_progress_tick(self):
+        snapshot = self.upload_worker.progress.snapshot()
+        self.file_upload_status.showMessage('Uploading: ' + format_transfer_progress(snapshot))
+        self._fileSystemModel.set_transfer_progress(snapshot['files'])
+        return None
+        
+    def upload_batch_done(self, results):
+        self.progress_timer.stop()
+        self._fileSystemModel.set_transfer_progress(self.upload_worker.progress.snapshot()['files'])
+        failed = [obj for obj, result in results.items() if not result['ok']]
+        
+        if self.upload_worker.error:
+            self.file_upload_status.showMessage(f'Upload incomplete: {self.upload_worker.error} after {len(results) - len(failed)} files, activity log not updated.')
+            print('Upload failed ->', self.upload_worker.error)
+        elif not failed:
+            # upload_files_to_rmt has logged the batch.
+            self.file_upload_status.showMessage(f'Upload done. {len(results)} files uploaded.')
+            print('Upload done.')
+        else:
+            self.file_upload_status.showMessage(f'Upload incomplete: {len(failed)} of {len(results)} files failed, activity log not updated.')
+            print('Upload failed ->', failed)
+            
+        self.upload_button_2.setEnabled(True)
+        
+        return None
 
     def closeEvent(self, event):
             event.accept()
@@ -2210,7 +6400,12 @@ class RemoteProjectFolder(QWidget, AllObjectAccess):
         self.current_project = self.current_project_path.split('/')[-1]
         title = 'BigFoot Workbench Project REMOTE: ' + self.current_project
         self.files_to_download = []
+        self.download_worker = None
         self.setWindowTitle(title)
+        
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(constants.TRANSFER_PROGRESS_INTERVAL_MS)
+        self.progress_timer.timeout.connect(self.download_progress_tick)
         self.layout = QVBoxLayout(self)
         
         self.gen_remote_file_index = QPushButton('GENERATE REMOTE FILE INDEX', clicked=self.gen_remote_index)
@@ -2231,23 +6426,50 @@ class RemoteProjectFolder(QWidget, AllObjectAccess):
         self.select_all_button_1.setStyleSheet('background-color: #FFFFFF; font-family: Courier New; font-size: 14px; font-weight: 900;')
         self.sublayout_1.addWidget(self.select_all_button_1, alignment=(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom))
         
+        self.cancel_download_button = QPushButton('Cancel Download', clicked=self.cancel_download)
+        self.cancel_download_button.setStyleSheet('background-color: #FFFFFF; font-family: Courier New; font-size: 14px; font-weight: 900;')
+        self.cancel_download_button.setEnabled(False)
+        self.sublayout_1.addWidget(self.cancel_download_button, alignment=(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignBottom))
+        
         self.upload_button_2 = QPushButton('Download Selected Files', clicked=self.download_selected_files)
         self.upload_button_2.setStyleSheet('background-color: #FFFFFF; font-family: Courier New; font-size: 14px; font-weight: 900;')
         self.sublayout_1.addWidget(self.upload_button_2, alignment=(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignBottom))
         
         self.layout.addLayout(self.sublayout_1)
         
-        all_remote_prj_files = get_rmt_project_object_versions(AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
+        self.cfg_data = dict()
+        with open('./config.json', 'r') as config_file:
+            self.cfg_data = json.load(config_file)
+        
+        all_remote_prj_files = iter_rmt_project_object_versions(AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
                                            AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'], 
                                            AllObjectAccess.user_info['user_AWS_BUCKET_NAME'],
                                            self.current_project)
         
         file_list = []
+        listing_error = ''
+        ignore_rules = IgnoreRules.for_project(self.cfg_data['projects_directory'], self.current_project)
         
-        for remote_file in all_remote_prj_files:
-            if remote_file['Key'] == self.current_project + '/':
-                pass
-            else:
+        # The listing pages in as it is iterated, so errors surface here rather than at the call.
+        try:
+            for remote_file in all_remote_prj_files:
+                if remote_file['Key'] == self.current_project + '/':
+                    pass
+                elif is_bigfoot_internal_key(self.current_project, remote_file['Key']):
+                    pass
+                elif ignore_rules.is_ignored_key(self.current_project, remote_file['Key']):
+                    pass
+                else:
+                    file_list.append(remote_file)
+        except ClientError as e:
+            print(f"Unexpected error:  {e}")
+            listing_error = e.response['Error']['Code']
+                
+        for remote_file in iter_rmt_project_blob_references(AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
+                                                            AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'], 
+                                                            AllObjectAccess.user_info['user_AWS_BUCKET_NAME'],
+                                                            self.current_project):
+            if not ignore_rules.is_ignored_key(self.current_project, remote_file['Key']):
                 file_list.append(remote_file)
                                      
         self._fileSystemModel = FileSystemModelLiteRemote(file_list, self)
@@ -2262,6 +6484,8 @@ class RemoteProjectFolder(QWidget, AllObjectAccess):
         self.file_upload_status.setStyleSheet('background-color: #FFFFFF; font-family: Courier New; font-size: 12px; font-weight: 900;')
         self.layout.addWidget(self.file_upload_status, stretch=2)
         self.file_upload_status.showMessage('This section can/will be used for file upload status info...') 
+        if listing_error:
+            self.file_upload_status.showMessage(f'REMOTE listing incomplete ({listing_error}), some versions are not shown')
         
         self.setWindowFlag(Qt.WindowType.WindowCloseButtonHint, True)
         self.resize(1280, 700)
@@ -2269,36 +6493,105 @@ class RemoteProjectFolder(QWidget, AllObjectAccess):
 
     def gen_remote_index(self):
         
-        remote_index = dict()
+        remote_index = build_remote_project_index(AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
+                                                  AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'], 
+                                                  AllObjectAccess.user_info['user_AWS_BUCKET_NAME'],
+                                                  self.current_project)
         
-        all_remote_prj_files = get_rmt_project_object_versions(AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
-                                           AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'], 
-                                           AllObjectAccess.user_info['user_AWS_BUCKET_NAME'],
-                                           self.current_project)
-        
-        object_list = []
-        
-        for remote_file in all_remote_prj_files:
-            if remote_file['Key'] == self.current_project + '/':
-                pass
-            else:
-                if remote_file['IsLatest'] == True:
-                    object_list.append(remote_file)
-                
-        for obj in object_list:
-            sha256 = get_remote_object_metadata(AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
-                                       AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'],
-                                       AllObjectAccess.user_info['user_AWS_BUCKET_NAME'], 
-                                       obj['Key'])
-            remote_index[obj['Key']] = {
-                                        "last_modified_at": obj['LastModified'],
-                                        "sha256": sha256
-                                       }
+        print(json.dumps(remote_index, sort_keys=True, indent=4))
         
         return None
 
     def download_selected_files(self):
-        print('Download selected files...')
+    
+        # The REMOTE tree lists every version; older ones are downloaded at the version checked.
+        selected = sorted(set(self._fileSystemModel.upload_files))
+        self.download_objects = sorted(set(obj for obj, version_id in selected))
+        
+        if not self.download_objects:
+            self.file_upload_status.showMessage('No files selected for download')
+            return None
+            
+        if len(self.download_objects) != len(selected):
+            self.file_upload_status.showMessage('Select only one version of each file for download')
+            return None
+            
+        if self.download_worker and self.download_worker.is_running():
+            self.file_upload_status.showMessage('A download is already in progress...')
+            return None
+            
+        file_pairs = [(obj, self.cfg_data['projects_directory'] + '/' + obj) for obj in self.download_objects]
+        version_ids = {obj: version_id for obj, version_id in selected if version_id}
+        self.download_files_done = 0
+        
+        self.download_worker = TransferBatchWorker(download_files_to_loc,
+                                                   AllObjectAccess.user_info['user_AWS_ACCESS_KEY_ID'],
+                                                   AllObjectAccess.user_info['user_AWS_SECRET_ACCESS_KEY'],
+                                                   AllObjectAccess.user_info['user_AWS_BUCKET_NAME'],
+                                                   file_pairs,
+                                                   hash_cache=LocalHashCache.for_directory(self.cfg_data['projects_directory']),
+                                                   journal=TransferJournal.for_directory(self.cfg_data['projects_directory']),
+                                                   version_ids=version_ids)
+        self.download_worker.file_done.connect(self.download_file_done)
+        self.download_worker.batch_done.connect(self.download_batch_done)
+        
+        self.upload_button_2.setEnabled(False)
+        self.cancel_download_button.setEnabled(True)
+        self.file_upload_status.showMessage(f'Downloading {len(file_pairs)} files...')
+        self.download_worker.start()
+        self.progress_timer.start()
+        
+        return None
+        
+    def download_file_done(self, obj, ok, error):
+        # The status bar is repainted by download_progress_tick; failures are logged here.
+        self.download_files_done += 1
+        
+        if not ok:
+            print(f'Download FAILED: {obj} ({error})')
+            
+        return None
+        
+    def download_progress_tick(self):
+        snapshot = self.download_worker.progress.snapshot()
+        self.file_upload_status.showMessage('Downloading: ' + format_transfer_progress(snapshot))
+        self._fileSystemModel.set_transfer_progress(snapshot['files'])
+        return None
+        
+    def download_batch_done(self, results):
+        self.progress_timer.stop()
+        self._fileSystemModel.set_transfer_progress(self.download_worker.progress.snapshot()['files'])
+        failed = [obj for obj, result in results.items() if not result['ok']]
+        total_bytes = sum(result['bytes'] for result in results.values())
+        elapsed = max(self.download_worker.elapsed, 0.001)
+        throughput = total_bytes / elapsed / (1024 * 1024)
+        
+        msg = f'{len(results) - len(failed)}/{len(results)} files, {total_bytes} bytes in {elapsed:.1f}s ({throughput:.2f} MB/s)'
+        
+        unverified = [obj for obj, result in results.items() if result['ok'] and not result.get('verified')]
+        if unverified:
+            msg += f', {len(unverified)} unverified (no checksum on REMOTE)'
+            print('Downloaded without a checksum to verify ->', unverified)
+        
+        if self.download_worker.error:
+            self.file_upload_status.showMessage(f'Download incomplete, {self.download_worker.error}. ' + msg)
+            print('Download failed ->', self.download_worker.error)
+        elif not failed:
+            self.file_upload_status.showMessage('Download done. ' + msg)
+            print('Download done.', msg)
+        else:
+            self.file_upload_status.showMessage(f'Download incomplete, {len(failed)} failed. ' + msg)
+            print('Download failed ->', failed)
+        
+        self.upload_button_2.setEnabled(True)
+        self.cancel_download_button.setEnabled(False)
+        
+        return None
+        
+    def cancel_download(self):
+        if self.download_worker and self.download_worker.is_running():
+            self.download_worker.cancel()
+            self.file_upload_status.showMessage('Cancelling download...')
         return None
         
         
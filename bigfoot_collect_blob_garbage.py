@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+# Administrator job: deletes shared CAS blobs that no project manifest references any more.
+# Lists every project in the bucket, so it runs with the root credentials, never from a
+# workstation. Exits non-zero if the collection was skipped or some deletes failed.
+# Usage: python bigfoot_collect_blob_garbage.py <bucket> [minimum age in days]
+
+import sys
+
+import bigfoot_constants as constants
+from bigfoot_classes import collect_rmt_blob_garbage
+
+
+if __name__ == '__main__':
+
+    if not sys.argv[1:]:
+        print('Usage: python bigfoot_collect_blob_garbage.py <bucket> [minimum age in days]')
+        sys.exit(2)
+
+    bucket_name = sys.argv[1]
+    min_age_sec = float(sys.argv[2]) * 24 * 60 * 60 if sys.argv[2:] else None
+
+    totals = collect_rmt_blob_garbage(constants.AWS_ROOT_ACCESS_KEY_ID, constants.AWS_ROOT_SECRET_ACCESS_KEY, bucket_name, min_age_sec)
+
+    if totals is None:
+        sys.exit(1)
+
+    print(f"{totals['deleted']} blob versions deleted, {len(totals['errors'])} failed")
+
+    sys.exit(1 if totals['errors'] else 0)
@@ -12,6 +12,125 @@ AWS_ROOT_ACCESS_KEY_ID = ''
 AWS_ROOT_SECRET_ACCESS_KEY = ''
 AWS_DYNAMODB_TABLE = 'CAD_user_table'
 
+# <AWSClientRegistry> class constants
+AWS_MAX_POOL_CONNECTIONS = 64  # <--- per client; keep >= upload/download workers x multipart concurrency
+AWS_TCP_KEEPALIVE = True
+AWS_CONNECT_TIMEOUT_SEC = 10
+AWS_READ_TIMEOUT_SEC = 60
+AWS_MAX_RETRY_ATTEMPTS = 5
+
+# <DynamoDBItemCache> class constants
+DYNAMODB_ITEM_CACHE_TTL_SEC = 30  # <--- 0 disables caching; our own writes always invalidate
+
+# Project activity log constants
+ACTIVITY_LOG_SHARED_TABLE_ENABLED = True  # <--- False keeps the legacy on-create '<bucket>_<project>' table per project
+ACTIVITY_LOG_TABLE = 'BigFoot_activity_log'  # <--- on-demand; partition 'project_key' = '<bucket>#<project>', sort 'event_key'
+ACTIVITY_LOG_BATCH_WRITE_SIZE = 25  # <--- BatchWriteItem maximum
+ACTIVITY_LOG_MIGRATION_MARKER_SUFFIX = '#legacy-migration'  # <--- marker partition '<bucket>#<project>#legacy-migration': legacy table already copied (or absent)
+ACTIVITY_FILES_INLINE_MAX_BYTES = 32 * 1024  # <--- larger files_uploaded lists (as JSON) are spilled to S3; items cap at 400 KB
+ACTIVITY_FILES_DIR = 'activity'  # <--- '<project>/.bigfoot/activity/<sha256>.json.gz'
+ACTIVITY_HISTORY_PAGE_SIZE = 100  # <--- events per Query page and per 'Load Older' step in the history panel
+ACTIVITY_HISTORY_CACHE_DIR = '.bigfoot_activity_cache'  # <--- '<projects_directory>/.bigfoot_activity_cache/<bucket>#<project>.json.gz'
+ACTIVITY_HISTORY_CACHE_FORMAT_VERSION = 1
+ACTIVITY_HISTORY_REFRESH_OVERLAP_SEC = 300  # <--- a refresh re-reads this far behind the newest cached event, for events logged with a lagging clock
+
+# <RemoteObjectExistenceCache> class constants
+S3_NEGATIVE_EXISTENCE_TTL_SEC = 60
+
+# Transfer engine constants
+TRANSFER_MAX_WORKERS = 16  # <--- files in flight at once
+TRANSFER_MULTIPART_THRESHOLD = 16 * 1024 * 1024
+TRANSFER_MULTIPART_CHUNKSIZE = 16 * 1024 * 1024
+TRANSFER_MAX_CONCURRENCY = 4  # <--- parts in flight per multipart file
+UPLOAD_HASH_WHILE_STREAMING = True  # <--- hash cache misses are hashed from the bytes being uploaded
+S3_USE_NATIVE_CHECKSUMS = True  # <--- ask S3 to verify SHA256 additional checksums on upload
+S3_CHECKSUM_TAG = 'ChecksumSHA256'  # <--- object tag carrying the sha256 of streamed uploads
+TRANSFER_INTERACTIVE_WORKERS = 2  # <--- reserved for single-file fetches so they never queue behind bulk sync
+TRANSFER_GLOBAL_MAX_BYTES_PER_SEC = None  # <--- None = unthrottled; e.g. 4 * 1024 * 1024 on a 50 Mbit/s uplink
+TRANSFER_PROJECT_MAX_BYTES_PER_SEC = dict()  # <--- {'project name': bytes/s}, bulk transfers only
+TRANSFER_DEFAULT_PROJECT_MAX_BYTES_PER_SEC = None
+TRANSFER_SMALL_FILE_SIZE = 1024 * 1024  # <--- files below this are packed into one scheduler job
+TRANSFER_SMALL_PACK_FILES = 32
+TRANSFER_SMALL_PACK_BYTES = 8 * 1024 * 1024
+TRANSFER_RESUMABLE_MIN_SIZE = 32 * 1024 * 1024  # <--- uploads this size and up are journaled, resumable multipart uploads
+TRANSFER_PROGRESS_INTERVAL_MS = 250  # <--- how often the status bars and tree columns repaint transfer progress
+TRANSFER_PROGRESS_RATE_WINDOW_SEC = 5.0  # <--- MB/s and ETA are averaged over this sliding window
+DOWNLOAD_PART_SIZE = 8 * 1024 * 1024  # <--- byte-range GET size for large objects
+DOWNLOAD_STREAM_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TEMP_SUFFIX = '.bigfoot-download'
+
+# <TransferJournal> class constants ('<projects_directory>/.bigfoot_transfer_journal.jsonl')
+TRANSFER_JOURNAL_FILENAME = '.bigfoot_transfer_journal.jsonl'
+TRANSFER_RESUME_MAX_ATTEMPTS = 5  # <--- a file still failing after this many batches is dropped from the journal
+TRANSFER_PERMANENT_ERRORS = ('AccessDenied', 'AllAccessDisabled', 'InvalidAccessKeyId', 'SignatureDoesNotMatch', 'NoSuchBucket', 'NoSuchKey', '403', '404',
+                             'InvalidObjectState', 'EntityTooLarge', 'KeyTooLongError')  # <--- transfers failing with these are dropped from the journal, not resumed
+
+# Remote project manifest constants ('<project>/.bigfoot/manifest.json.gz')
+MANIFEST_DIR = '.bigfoot'
+MANIFEST_NAME = 'manifest.json.gz'
+MANIFEST_FORMAT_VERSION = 1
+MANIFEST_UPDATE_ATTEMPTS = 5
+MANIFEST_CONFLICT_ERRORS = ('PreconditionFailed', 'ConditionalRequestConflict')  # <--- conditional PUT lost the race; re-read and retry
+
+# <LocalHashCache> class constants ('<projects_directory>/.bigfoot_hash_cache.json')
+HASH_CACHE_FILENAME = '.bigfoot_hash_cache.json'
+HASH_CACHE_FORMAT_VERSION = 1
+HASH_CACHE_MTIME_GRANULARITY_NS = 2 * 1000 * 1000 * 1000  # <--- 2 s covers FAT/exFAT and SMB shares
+
+# <IgnoreRules> class constants
+IGNORE_FILENAME = '.bigfootignore'  # <--- gitignore syntax; '<projects_directory>/.bigfootignore' (per user) then '<project>/.bigfootignore'
+
+# Hashing pipeline constants
+HASH_BUF_SIZE = 1024 * 1024
+HASH_MMAP_THRESHOLD = 64 * 1024 * 1024  # <--- files this size and up are hashed through mmap
+HASH_MAX_WORKERS = None  # <--- None = os.cpu_count()
+HASH_IO_CONCURRENCY = None  # <--- None = HASH_MAX_WORKERS; use 1-2 for spinning disks
+HASH_SMALL_FILE_SIZE = 1024 * 1024  # <--- files below this are hashed in batches
+HASH_SMALL_BATCH_FILES = 64
+
+# Delta sync constants (chunk lists live at '<project>/.bigfoot/chunks/<path>.json')
+DELTA_SYNC_ENABLED = True
+DELTA_SYNC_MIN_FILE_SIZE = 64 * 1024 * 1024  # <--- smaller files always transfer whole
+DELTA_CHUNKS_DIR = 'chunks'
+DELTA_CHUNK_LIST_FORMAT_VERSION = 2  # <--- bump whenever the chunker's cut points change
+DELTA_MIN_PART_SIZE = 5 * 1024 * 1024  # <--- S3 minimum for every multipart part but the last
+DELTA_MAX_COPY_PART_SIZE = 1024 * 1024 * 1024  # <--- UploadPartCopy limit is 5 GB
+DELTA_MAX_PARTS = 10000
+DELTA_RANGE_MERGE_GAP = 256 * 1024  # <--- missing chunks closer than this are fetched in one GET
+CDC_MIN_CHUNK_SIZE = 256 * 1024
+CDC_AVG_CHUNK_SIZE = 1024 * 1024  # <--- must be a power of two
+CDC_MAX_CHUNK_SIZE = 4 * 1024 * 1024
+CDC_WINDOW_SIZE = 64  # <--- bytes fingerprinted at each candidate cut point; must be < CDC_MIN_CHUNK_SIZE
+CDC_CANDIDATE_BITS = 6  # <--- 1 in 64 positions is fingerprinted
+CDC_READ_SIZE = 16 * 1024 * 1024
+
+# Content-addressed blob store constants ('.bigfoot-blobs/<sha256[:2]>/<sha256>')
+CAS_ENABLED = False  # <--- upload file contents once per sha256 and reference them from the project manifest
+CAS_BLOBS_PREFIX = '.bigfoot-blobs'
+CAS_BLOB_GC_MIN_AGE_SEC = 7 * 24 * 60 * 60  # <--- unreferenced blobs younger than this are kept, an upload may not have written its reference yet
+CAS_BLOB_REUSED_TAG = 'bigfoot-reused-at'  # <--- epoch seconds; written when an upload reuses a stored blob, counts as its age for collection
+CAS_BLOB_GC_LEASE_KEY = '.bigfoot-blob-gc-lease'  # <--- one blob collection per bucket at a time
+CAS_BLOB_GC_LEASE_SEC = 6 * 60 * 60  # <--- a lease older than this is from a collection that died and is taken over
+
+# Compression stage constants
+COMPRESSION_ENABLED = True
+COMPRESSION_LEVEL = 6
+COMPRESSION_MIN_FILE_SIZE = 64 * 1024  # <--- smaller files aren't worth the CPU
+COMPRESSION_EXTENSIONS = ('.step', '.stp', '.iges', '.igs', '.dxf', '.stl', '.obj', '.wrl', '.log', '.csv', '.txt', '.json', '.xml', '.svg')
+COMPRESSION_SKIP_EXTENSIONS = ('.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.zst', '.jpg', '.jpeg', '.png', '.gif', '.webp',
+                               '.mp3', '.mp4', '.mov', '.avi', '.mkv', '.pdf', '.docx', '.xlsx', '.pptx', '.3mf', '.f3d', '.sldprt', '.sldasm')
+COMPRESSION_PROBE_SIZE = 256 * 1024  # <--- other extensions are compressed if this much of the file shrinks enough
+COMPRESSION_PROBE_MAX_RATIO = 0.8
+COMPRESSION_PROJECT_OVERRIDES = dict()  # <--- {'project name': False} opts a project out
+COMPRESSION_ENCODING_METADATA = 'bigfoot-encoding'  # <--- 'gzip'; the sha256 always covers the original bytes
+
+# Bulk delete engine constants
+DELETE_BATCH_SIZE = 1000  # <--- DeleteObjects maximum
+DELETE_MAX_WORKERS = 8  # <--- batches in flight at once
+DELETE_MAX_ATTEMPTS = 5
+DELETE_RETRY_BASE_DELAY_SEC = 0.5
+DELETE_RETRYABLE_ERRORS = ('InternalError', 'ServiceUnavailable', 'SlowDown', 'RequestTimeout', 'OperationAborted')
+
 # <LoginWidget> class constants
 LOGIN_WINDOW_TTL = 'BigFoot Login'
 LOGIN_MAIN_STYLE = 'background-color: #3D3C38;'
@@ -89,8 +208,13 @@ RIGHT_PANEL_LINE_1_PROJECT_NAME_STYLE = f'font-size: 26px; font-weight: 900; col
 RIGHT_PANEL_LINE_1_USER_NAME_STYLE = f'font-size: 18px; font-weight: 900; color: {white}; background-color: {blue_green};'
 NUMBER_OF_USERS_ICON = 'fa.users'
 ADD_USERS_ICON = 'fa.user-plus'
+PROJECT_HISTORY_ICON = 'fa.history'
 RIGHT_PANEL_LINE_1_SETTINGS_STYLE = f'background-color: {transparent}; border: 0px'
 
+# <ProjectHistoryPanel> class constants
+PROJECT_HISTORY_WINDOW_W = 1100
+PROJECT_HISTORY_WINDOW_H = 600
+
 # <LocalProjectFolder> class constants
 LEFT_PROJECT_OPEN_UPLOAD_COMMENT_STYLE = f'background-color: {white}; font-family: Courier New; font-size: 12px; font-weight: 700;'
 